@@ -15,7 +15,88 @@ import os
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SENTIMENT_ANALYSIS_URL = 'http://localhost:8000/sentiment_analysis'
+# Trained model: the joblib pipeline, or the .npz file written by `manage.py export_sentiment_model`,
+# which is scored with numpy alone
 MODEL_PATH = os.path.join(BASE_DIR, 'ml_models', 'sentiment_analysis_pipeline.joblib')
+# Load the model when the app starts instead of on the first prediction
+SENTIMENT_MODEL_EAGER_LOAD = False
+# Memory-map the model arrays so forked workers share them (None loads them in memory)
+SENTIMENT_MODEL_MMAP_MODE = 'r'
+# Seconds between checks of the model file for changes (a reload also invalidates cached results)
+SENTIMENT_MODEL_CHECK_INTERVAL = 5.0
+SENTIMENT_BATCH_MAX_SIZE = 1000
+# Maximum number of distinct tokens whose stem is memoized by the preprocessing engine
+SENTIMENT_STEM_CACHE_SIZE = 100000
+# Content-addressed cache of predictions: in-process LRU size (0 disables the cache)
+# and optional Django cache alias shared by all workers
+SENTIMENT_CACHE_SIZE = 10000
+SENTIMENT_CACHE_ALIAS = None
+SENTIMENT_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+# Backend used to score feedback: InProcessBackend, HTTPBackend or LocalStubBackend
+SENTIMENT_BACKEND = 'sentiment_analysis.backends.InProcessBackend'
+# Shared HTTP client used by HTTPBackend: timeouts (seconds), retries with jittered backoff,
+# keep-alive pool size and circuit breaker (consecutive failures before opening, seconds open)
+SENTIMENT_HTTP_CONNECT_TIMEOUT = 2.0
+SENTIMENT_HTTP_READ_TIMEOUT = 5.0
+SENTIMENT_HTTP_RETRIES = 2
+SENTIMENT_HTTP_BACKOFF = 0.2
+SENTIMENT_HTTP_POOL_SIZE = 10
+SENTIMENT_CIRCUIT_FAILURE_THRESHOLD = 5
+SENTIMENT_CIRCUIT_RESET_TIMEOUT = 30.0
+# Micro-batch size, idle polling interval and lease of a claimed batch (seconds) of the
+# score_feedback worker; the lease must outlast a backend call with all its retries
+FEEDBACK_SCORING_BATCH_SIZE = 64
+FEEDBACK_SCORING_POLL_INTERVAL = 2.0
+FEEDBACK_SCORING_LEASE = 300
+# Email outbox drained by the deliver_emails worker: emails per batch (sent over one connection),
+# idle polling interval and lease of a claimed batch (seconds), and retries with exponential
+# backoff (base and maximum delay in seconds) before an email is marked failed
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_POLL_INTERVAL = 5.0
+EMAIL_OUTBOX_LEASE = 300
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_BACKOFF = 30
+EMAIL_OUTBOX_MAX_BACKOFF = 60 * 60
+# Cache of the superuser dashboard widgets, invalidated by model signals (False renders uncached);
+# the timeout only bounds how long superseded entries linger. The alias must name a cache shared by
+# every web worker and management command (see CACHES), or their writes do not invalidate it
+SUPERUSER_DASHBOARD_CACHE_ENABLED = True
+SUPERUSER_DASHBOARD_CACHE_ALIAS = 'dashboard'
+SUPERUSER_DASHBOARD_CACHE_TIMEOUT = 60 * 60
+# Cache the home dashboard of each user, under the versions kept by the dashboard cache above: it
+# is only cached when that cache is enabled and shared between processes (not a LocMemCache)
+USER_DASHBOARD_CACHE_ENABLED = True
+# Number of registrations per page of the superuser registrations listing
+REGISTRATIONS_PAGE_SIZE = 50
+# Number of events per page of the manage events page
+EVENTS_PAGE_SIZE = 20
+# Number of events per page of the browse events page
+BROWSE_EVENTS_PAGE_SIZE = 20
+# Number of attended and of current registrations per page of the my registrations page
+MY_REGISTRATIONS_PAGE_SIZE = 10
+# Event search: results per page, and maximum age (seconds) of the in-process index used without
+# FTS5, which is also rebuilt whenever the dashboard event version changes
+SEARCH_PAGE_SIZE = 20
+SEARCH_INDEX_TTL = 60
+# Number of events inserted per transaction by the bulk event importer
+EVENT_IMPORT_BATCH_SIZE = 500
+# Registrations per day chart of the superuser dashboard: default and maximum number of days,
+# and number of events charted when no event is chosen
+REGISTRATION_ANALYTICS_DAYS = 90
+REGISTRATION_ANALYTICS_MAX_DAYS = 366
+REGISTRATION_ANALYTICS_TOP_EVENTS = 10
+# Number of rows fetched from the database at a time by the registrations export
+REGISTRATIONS_EXPORT_CHUNK_SIZE = 2000
+# Maximum number of suggestions returned by the user and event autocomplete endpoints
+AUTOCOMPLETE_LIMIT = 10
+# Event description suggestions: backend (GeminiBackend or LocalSuggestionBackend), cache size and
+# time to live (seconds), deadline (seconds) of a request and maximum concurrent upstream calls
+SUGGESTION_BACKEND = 'superuser_dashboard.suggestions.GeminiBackend'
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
+SUGGESTION_CACHE_SIZE = 1000
+SUGGESTION_CACHE_TTL = 60 * 60
+SUGGESTION_DEADLINE = 8.0
+SUGGESTION_WORKERS = 4
 
 
 # Quick-start development settings - unsuitable for production
@@ -98,6 +179,22 @@ TEMPLATES = [
 WSGI_APPLICATION = 'event_management.wsgi.application'
 
 
+# Caches
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+# 'dashboard' holds the dashboard caches and their model versions in the database, so that every
+# process sees the same versions; its table is created by a superuser_dashboard migration
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'dashboard': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'dashboard_cache',
+    },
+}
+
+
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
@@ -0,0 +1 @@
+default_app_config = 'sentiment_analysis.apps.SentimentAnalysisConfig'
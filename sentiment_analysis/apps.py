@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class SentimentAnalysisConfig(AppConfig):
     name = 'sentiment_analysis'
+
+    def ready(self):
+        if getattr(settings, 'SENTIMENT_MODEL_EAGER_LOAD', False):
+            from .utils import warm_up
+            warm_up()
@@ -0,0 +1,107 @@
+from functools import lru_cache
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+"""
+This module contains the pluggable backends used to score feedback sentiment.
+The backend in use is chosen with the SENTIMENT_BACKEND setting and returned by get_backend().
+"""
+
+
+class SentimentBackendError(Exception):
+    """Raised when a backend cannot score the given sentences."""
+
+
+class BaseSentimentBackend:
+    """
+    Interface shared by all sentiment backends.
+
+    Subclasses implement analyze_batch; analyze is a convenience wrapper for a single sentence.
+    """
+
+    def analyze(self, sentence):
+        """
+        Score a single sentence.
+
+        Args:
+            sentence: Raw text to score.
+
+        Returns:
+            'positive' or 'negative'.
+        """
+        return self.analyze_batch([sentence])[0]
+
+    def analyze_batch(self, sentences):
+        """
+        Score a list of sentences.
+
+        Args:
+            sentences: List of raw texts to score.
+
+        Returns:
+            A list of sentiment labels, one per input sentence, in the same order.
+        """
+        raise NotImplementedError
+
+
+class InProcessBackend(BaseSentimentBackend):
+    """Score sentences with the model loaded in this process."""
+
+    def analyze_batch(self, sentences):
+        try:
+            from .preprocessing import preprocess
+            from .utils import predict_sentiments
+            return predict_sentiments([preprocess(sentence) for sentence in sentences])
+        except Exception as e:
+            raise SentimentBackendError(str(e)) from e
+
+
+class HTTPBackend(BaseSentimentBackend):
+    """
+    Score sentences through a sentiment analysis service running as a separate process.
+
+    Uses the shared client of the client module, which bounds every call with timeouts, retries
+    and a circuit breaker.
+    """
+
+    @property
+    def client(self):
+        from .client import get_client
+        return get_client()
+
+    def analyze(self, sentence):
+        return self.client.analyze(sentence)
+
+    def analyze_batch(self, sentences):
+        return self.client.analyze_batch(sentences)
+
+
+class LocalStubBackend(BaseSentimentBackend):
+    """
+    Deterministic backend for tests and offline development.
+
+    A sentence is negative when it contains one of a few negative words, positive otherwise.
+    """
+
+    negative_words = {'bad', 'terrible', 'awful', 'boring', 'poor', 'worst', 'not'}
+
+    def analyze_batch(self, sentences):
+        labels = []
+        for sentence in sentences:
+            words = set(str(sentence).lower().replace(',', ' ').replace('.', ' ').split())
+            labels.append('negative' if words & self.negative_words else 'positive')
+        return labels
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path):
+    return import_string(path)()
+
+
+def get_backend():
+    """
+    Return the sentiment backend configured by the SENTIMENT_BACKEND setting.
+
+    Backends are instantiated once per process so that connection pools are reused.
+    """
+    return _load_backend(getattr(settings, 'SENTIMENT_BACKEND', 'sentiment_analysis.backends.InProcessBackend'))
@@ -0,0 +1,164 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache import caches
+
+"""
+This module contains the content-addressed cache placed in front of the sentiment model.
+
+Results are keyed by a hash of the normalized preprocessed sentence and by the fingerprint of the
+model that produced them, so replacing the model file invalidates every cached result. Entries live
+in a bounded in-process LRU tier and, when SENTIMENT_CACHE_ALIAS names a Django cache, in that
+shared tier as well.
+"""
+
+
+def normalize(filtered_sentence):
+    """
+    Collapse whitespace in a preprocessed sentence.
+
+    Stemming already lowercases tokens and strips punctuation, so sentences that only differ in
+    case, punctuation or spacing normalize to the same text and share a cache entry.
+    """
+    return " ".join(filtered_sentence.split())
+
+
+def content_key(filtered_sentence):
+    """
+    Return the content hash of a preprocessed sentence.
+    """
+    return hashlib.sha256(normalize(filtered_sentence).encode('utf-8')).hexdigest()
+
+
+class SentimentCache:
+    """
+    Two-tier cache of sentiment labels with hit and miss counters.
+
+    Args:
+        max_entries: Maximum number of entries kept in the in-process LRU tier.
+        cache_alias: Optional name of a Django cache used as a shared second tier.
+        timeout: Expiry, in seconds, of entries written to the shared tier.
+    """
+
+    def __init__(self, max_entries=10000, cache_alias=None, timeout=None):
+        self.max_entries = max_entries
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def _shared_key(self, fingerprint, digest):
+        return f"sentiment:{fingerprint}:{digest}"
+
+    def _reset_if_model_changed(self, fingerprint):
+        if fingerprint != self._fingerprint:
+            self._entries.clear()
+            self._fingerprint = fingerprint
+
+    def get_many(self, fingerprint, digests):
+        """
+        Look up cached labels.
+
+        Args:
+            fingerprint: Fingerprint of the model the labels must come from.
+            digests: Content keys returned by content_key.
+
+        Returns:
+            A dict mapping each cached digest to its label.
+        """
+        found = {}
+        with self._lock:
+            self._reset_if_model_changed(fingerprint)
+            for digest in digests:
+                if digest in self._entries:
+                    self._entries.move_to_end(digest)
+                    found[digest] = self._entries[digest]
+            self.local_hits += sum(1 for digest in digests if digest in found)
+
+        missing = [digest for digest in digests if digest not in found]
+        if missing and self.cache_alias:
+            keys = {self._shared_key(fingerprint, digest): digest for digest in missing}
+            shared = caches[self.cache_alias].get_many(list(keys))
+            promoted = {keys[key]: label for key, label in shared.items()}
+            found.update(promoted)
+            with self._lock:
+                self._store_local(promoted)
+                self.shared_hits += sum(1 for digest in missing if digest in promoted)
+
+        with self._lock:
+            self.misses += sum(1 for digest in digests if digest not in found)
+        return found
+
+    def set_many(self, fingerprint, labels):
+        """
+        Store freshly predicted labels.
+
+        Args:
+            fingerprint: Fingerprint of the model that produced the labels.
+            labels: Dict mapping content keys to labels.
+        """
+        with self._lock:
+            self._reset_if_model_changed(fingerprint)
+            self._store_local(labels)
+        if self.cache_alias:
+            caches[self.cache_alias].set_many(
+                {self._shared_key(fingerprint, digest): label for digest, label in labels.items()},
+                timeout=self.timeout,
+            )
+
+    def _store_local(self, labels):
+        for digest, label in labels.items():
+            self._entries[digest] = label
+            self._entries.move_to_end(digest)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop the in-process entries and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.local_hits = self.shared_hits = self.misses = 0
+
+    def stats(self):
+        """
+        Return the hit and miss counters of this process.
+        """
+        with self._lock:
+            hits = self.local_hits + self.shared_hits
+            lookups = hits + self.misses
+            return {
+                'hits': hits,
+                'local_hits': self.local_hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_ratio': hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+            }
+
+
+@lru_cache(maxsize=None)
+def _build_cache(max_entries, cache_alias, timeout):
+    return SentimentCache(max_entries=max_entries, cache_alias=cache_alias, timeout=timeout)
+
+
+def get_cache():
+    """
+    Return the sentiment cache configured by the SENTIMENT_CACHE_* settings, or None when disabled.
+    """
+    max_entries = getattr(settings, 'SENTIMENT_CACHE_SIZE', 10000)
+    if not max_entries:
+        return None
+    return _build_cache(
+        max_entries,
+        getattr(settings, 'SENTIMENT_CACHE_ALIAS', None),
+        getattr(settings, 'SENTIMENT_CACHE_TIMEOUT', None),
+    )
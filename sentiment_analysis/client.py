@@ -0,0 +1,250 @@
+import json
+import random
+import threading
+import time
+from collections import deque
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from .backends import SentimentBackendError
+
+"""
+This module contains the shared HTTP client used to reach a sentiment analysis service on another host.
+
+Requests go through one pooled keep-alive session with connect and read timeouts, are retried a
+bounded number of times with jittered exponential backoff, and are guarded by a circuit breaker
+that fails fast while the service is unhealthy. Callers such as the score_feedback worker treat
+those failures as "try again later" and leave feedback pending.
+"""
+
+
+class CircuitOpenError(SentimentBackendError):
+    """Raised without contacting the service while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing service for a while.
+
+    After failure_threshold consecutive failures the circuit opens and calls fail immediately.
+    Once reset_timeout seconds have passed a single trial call is let through (half-open): its
+    success closes the circuit, its failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """
+        Return whether a call may be attempted now.
+        """
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release(self):
+        """
+        Give back a half-open trial that ended without a success or failure being recorded.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+            self._trial_in_flight = False
+
+
+class SentimentClient:
+    """
+    Pooled, timeout-bounded client of the sentiment analysis HTTP API.
+
+    Args:
+        base_url: URL of the sentiment_analysis app, e.g. http://models:8000/sentiment_analysis.
+        connect_timeout: Seconds allowed to open a connection.
+        read_timeout: Seconds allowed between bytes of the response.
+        retries: Number of retries after a failed attempt.
+        backoff: Base delay, in seconds, of the exponential backoff between retries.
+        pool_size: Number of keep-alive connections kept per host.
+        breaker: CircuitBreaker guarding the service.
+    """
+
+    # Status codes worth retrying: the service is overloaded or restarting
+    retry_statuses = {502, 503, 504}
+
+    def __init__(self, base_url, connect_timeout=2.0, read_timeout=5.0, retries=2, backoff=0.2, pool_size=10, breaker=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self.counters = {'requests': 0, 'successes': 0, 'failures': 0, 'retries': 0, 'short_circuited': 0}
+
+    def _count(self, name, latency=None):
+        with self._lock:
+            self.counters[name] += 1
+            if latency is not None:
+                self._latencies.append(latency)
+
+    def post(self, path, payload):
+        """
+        POST a JSON payload to the service.
+
+        Returns:
+            The successful requests.Response.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            SentimentBackendError: If every attempt failed.
+        """
+        if not self.breaker.allow():
+            self._count('short_circuited')
+            raise CircuitOpenError('The sentiment service is unavailable, scoring is deferred.')
+
+        settled = False
+        try:
+            error = None
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self._count('retries')
+                    # Full jitter keeps retrying workers from hitting the service in lockstep
+                    time.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+                start = time.monotonic()
+                try:
+                    self._count('requests')
+                    response = self.session.post(f"{self.base_url}/{path}", json=payload, timeout=self.timeout)
+                except requests.RequestException as e:
+                    self._count('failures', time.monotonic() - start)
+                    error = e
+                    continue
+                latency = time.monotonic() - start
+                if response.status_code in self.retry_statuses:
+                    self._count('failures', latency)
+                    error = SentimentBackendError(f'The sentiment service responded with status {response.status_code}.')
+                    continue
+                if response.status_code >= 500:
+                    # The service failed, e.g. on a missing model file; retrying would fail the same way
+                    self._count('failures', latency)
+                    self.breaker.record_failure()
+                    settled = True
+                    raise SentimentBackendError(f'The sentiment service responded with status {response.status_code}.')
+                if response.status_code >= 400:
+                    # The request itself is wrong; retrying would not help and the service is healthy
+                    self._count('failures', latency)
+                    self.breaker.record_success()
+                    settled = True
+                    raise SentimentBackendError(f'The sentiment service responded with status {response.status_code}.')
+                self._count('successes', latency)
+                self.breaker.record_success()
+                settled = True
+                return response
+
+            self.breaker.record_failure()
+            settled = True
+            raise SentimentBackendError(str(error)) from error
+        finally:
+            if not settled:
+                # An unexpected exception must not keep a half-open trial claimed forever
+                self.breaker.release()
+
+    def analyze(self, sentence):
+        try:
+            return self.post('analyze/', {'sentence': sentence}).json()['sentiment']
+        except (ValueError, KeyError) as e:
+            raise SentimentBackendError(f'Invalid response from the sentiment service: {e}') from e
+
+    def analyze_batch(self, sentences):
+        response = self.post('analyze_batch/', {'sentences': sentences})
+        try:
+            results = sorted((json.loads(line) for line in response.text.splitlines() if line), key=lambda result: result['index'])
+            errors = [result for result in results if 'error' in result]
+            if not errors:
+                return [result['sentiment'] for result in results]
+        except (ValueError, KeyError) as e:
+            raise SentimentBackendError(f'Invalid response from the sentiment service: {e}') from e
+        # No label is made up for a rejected sentence, so its batch stays pending
+        raise SentimentBackendError(f"The sentiment service could not score sentence {errors[0]['index']}: {errors[0]['error']}")
+
+    def stats(self):
+        """
+        Return the request counters, latency percentiles and circuit state of this process.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies)
+            stats = dict(self.counters)
+        for name, fraction in (('p50_ms', 0.50), ('p95_ms', 0.95), ('p99_ms', 0.99)):
+            stats[name] = latencies[int(fraction * (len(latencies) - 1))] * 1000 if latencies else None
+        stats['circuit'] = self.breaker.state
+        return stats
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Return the process-wide client configured by the SENTIMENT_HTTP_* settings.
+    """
+    config = (
+        settings.SENTIMENT_ANALYSIS_URL,
+        getattr(settings, 'SENTIMENT_HTTP_CONNECT_TIMEOUT', 2.0),
+        getattr(settings, 'SENTIMENT_HTTP_READ_TIMEOUT', 5.0),
+        getattr(settings, 'SENTIMENT_HTTP_RETRIES', 2),
+        getattr(settings, 'SENTIMENT_HTTP_BACKOFF', 0.2),
+        getattr(settings, 'SENTIMENT_HTTP_POOL_SIZE', 10),
+        getattr(settings, 'SENTIMENT_CIRCUIT_FAILURE_THRESHOLD', 5),
+        getattr(settings, 'SENTIMENT_CIRCUIT_RESET_TIMEOUT', 30.0),
+    )
+    with _clients_lock:
+        if config not in _clients:
+            url, connect_timeout, read_timeout, retries, backoff, pool_size, failure_threshold, reset_timeout = config
+            breaker = CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout)
+            _clients[config] = SentimentClient(url, connect_timeout, read_timeout, retries, backoff, pool_size, breaker)
+        return _clients[config]
+
+
+def get_client_stats():
+    """
+    Return the stats of the clients created in this process, keyed by service URL.
+    """
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {client.base_url: client.stats() for client in clients}
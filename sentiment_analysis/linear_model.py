@@ -0,0 +1,199 @@
+import re
+from collections import Counter
+import numpy as np
+
+"""
+This module contains the compact format of the sentiment model and its pure-numpy scorer.
+
+The trained pipeline is a TfidfVectorizer followed by a binary LogisticRegression, so inference is
+a vocabulary lookup, tf-idf weighting, normalization and a dot product. export_linear_model turns
+the fitted pipeline into a numpy .npz file holding the vocabulary, idf weights and coefficients;
+LinearSentimentModel loads that file and predicts without scikit-learn.
+"""
+
+FORMAT_VERSION = 1
+
+
+class UnsupportedModelError(ValueError):
+    """Raised when a pipeline cannot be expressed in the compact format."""
+
+
+def _unwrap_pipeline(model):
+    # The notebook saves a GridSearchCV whose best_estimator_ is the fitted pipeline
+    model = getattr(model, 'best_estimator_', model)
+    steps = getattr(model, 'steps', None)
+    if not steps or len(steps) != 2:
+        raise UnsupportedModelError('Expected a two step TfidfVectorizer + LogisticRegression pipeline.')
+    return steps[0][1], steps[1][1]
+
+
+def export_linear_model(model, path):
+    """
+    Write a fitted tf-idf + logistic regression pipeline to the compact format.
+
+    Args:
+        model: The fitted pipeline, or a fitted search object wrapping it.
+        path: Destination .npz file.
+
+    Raises:
+        UnsupportedModelError: If the pipeline uses options the scorer does not implement.
+    """
+    vectorizer, classifier = _unwrap_pipeline(model)
+
+    unsupported = {
+        'analyzer': vectorizer.analyzer != 'word',
+        'preprocessor': vectorizer.preprocessor is not None,
+        'tokenizer': vectorizer.tokenizer is not None,
+        'strip_accents': vectorizer.strip_accents is not None,
+        'stop_words': vectorizer.stop_words is not None,
+        'input': vectorizer.input != 'content',
+        'norm': vectorizer.norm not in ('l1', 'l2', None),
+    }
+    for option, is_unsupported in unsupported.items():
+        if is_unsupported:
+            raise UnsupportedModelError(f'TfidfVectorizer option {option}={getattr(vectorizer, option)!r} is not supported.')
+    coef = np.asarray(classifier.coef_, dtype=np.float64)
+    if coef.shape[0] != 1 or len(classifier.classes_) != 2:
+        raise UnsupportedModelError('Only binary classifiers are supported.')
+
+    classes = np.asarray(classifier.classes_)
+    if classes.dtype == object:
+        classes = classes.astype(str)
+    tokens = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    idf = vectorizer.idf_ if vectorizer.use_idf else np.ones(len(tokens))
+    with open(path, 'wb') as f:
+        np.savez(
+            f,
+            format_version=np.array(FORMAT_VERSION),
+            # Tokens never contain a newline (they are matched by token_pattern and joined with spaces)
+            vocabulary=np.frombuffer('\n'.join(tokens).encode('utf-8'), dtype=np.uint8),
+            idf=np.asarray(idf, dtype=np.float64),
+            coef=coef[0],
+            intercept=np.asarray(classifier.intercept_, dtype=np.float64)[0],
+            classes=classes,
+            ngram_range=np.array(vectorizer.ngram_range),
+            token_pattern=np.array(vectorizer.token_pattern),
+            lowercase=np.array(vectorizer.lowercase),
+            binary=np.array(vectorizer.binary),
+            sublinear_tf=np.array(vectorizer.sublinear_tf),
+            norm=np.array(vectorizer.norm or ''),
+        )
+
+
+class LinearSentimentModel:
+    """
+    Pure-numpy equivalent of the fitted tf-idf + logistic regression pipeline.
+
+    Exposes predict like the scikit-learn pipeline, so it can be used wherever the predictor is.
+    """
+
+    def __init__(self, vocabulary, idf, coef, intercept, classes, ngram_range=(1, 1),
+                 token_pattern=r"(?u)\b\w\w+\b", lowercase=True, binary=False, sublinear_tf=False, norm='l2'):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.coef = coef
+        self.intercept = intercept
+        self.classes = classes
+        self.ngram_range = tuple(ngram_range)
+        self.token_pattern = re.compile(token_pattern)
+        self.lowercase = lowercase
+        self.binary = binary
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a model written by export_linear_model.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data['format_version'])
+            if version != FORMAT_VERSION:
+                raise UnsupportedModelError(f'Unsupported model format version {version}.')
+            tokens = data['vocabulary'].tobytes().decode('utf-8').split('\n')
+            return cls(
+                vocabulary={token: index for index, token in enumerate(tokens)},
+                idf=data['idf'],
+                coef=data['coef'],
+                intercept=float(data['intercept']),
+                classes=data['classes'],
+                ngram_range=tuple(int(n) for n in data['ngram_range']),
+                token_pattern=str(data['token_pattern']),
+                lowercase=bool(data['lowercase']),
+                binary=bool(data['binary']),
+                sublinear_tf=bool(data['sublinear_tf']),
+                norm=str(data['norm']) or None,
+            )
+
+    def analyze(self, sentence):
+        """
+        Split a sentence into the word n-grams used as features, like TfidfVectorizer.
+        """
+        if self.lowercase:
+            sentence = sentence.lower()
+        tokens = self.token_pattern.findall(sentence)
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        ngrams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n + 1, len(tokens) + 1)):
+            for i in range(len(tokens) - n + 1):
+                ngrams.append(" ".join(tokens[i:i + n]))
+        return ngrams
+
+    def vectorize(self, sentence):
+        """
+        Return the feature indexes and normalized tf-idf weights of a sentence.
+        """
+        counts = Counter(index for index in map(self.vocabulary.get, self.analyze(sentence)) if index is not None)
+        # Sorted like the columns of scikit-learn's sparse rows, so sums are accumulated in the same order
+        columns = sorted(counts)
+        indexes = np.array(columns, dtype=np.intp)
+        weights = np.array([counts[column] for column in columns], dtype=np.float64)
+        if self.binary:
+            weights = np.ones_like(weights)
+        if self.sublinear_tf:
+            weights = np.log(weights) + 1
+        weights *= self.idf[indexes]
+        if self.norm == 'l2':
+            norm = np.sqrt(np.dot(weights, weights))
+        elif self.norm == 'l1':
+            norm = np.abs(weights).sum()
+        else:
+            norm = 0
+        if norm:
+            weights /= norm
+        return indexes, weights
+
+    def transform(self, sentences):
+        """
+        Vectorize a list of sentences, returning one (indexes, weights) pair per sentence.
+        """
+        return [self.vectorize(sentence) for sentence in sentences]
+
+    def decision_function(self, sentences):
+        """
+        Return the signed distance of each sentence to the decision boundary.
+        """
+        return self.decision_function_vectors(self.transform(sentences))
+
+    def decision_function_vectors(self, vectors):
+        """
+        Return the decision function of sentences already vectorized by transform.
+        """
+        scores = np.empty(len(vectors))
+        for row, (indexes, weights) in enumerate(vectors):
+            scores[row] = np.dot(weights, self.coef[indexes]) + self.intercept
+        return scores
+
+    def predict(self, sentences):
+        """
+        Predict the class of each preprocessed sentence.
+        """
+        return self.predict_vectors(self.transform(sentences))
+
+    def predict_vectors(self, vectors):
+        """
+        Predict the class of sentences already vectorized by transform.
+        """
+        return self.classes[(self.decision_function_vectors(vectors) > 0).astype(int)]
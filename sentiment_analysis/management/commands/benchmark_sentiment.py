@@ -0,0 +1,178 @@
+import json
+import platform
+import random
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ... import preprocessing
+from ...linear_model import LinearSentimentModel
+from ...utils import get_predictor
+
+STAGES = ['html_strip', 'tokenize', 'stop_words', 'stem', 'vectorize', 'predict']
+
+# Vocabulary of the generated corpus: feedback-like words, stop words, punctuation and markup
+WORDS = [
+    'the', 'event', 'was', 'great', 'terrible', 'amazing', 'food', 'speakers', 'venue', 'organised',
+    'and', 'not', 'really', 'loved', 'boring', 'talks', 'music', 'would', 'come', 'again', 'it',
+    'very', 'crowded', 'friendly', 'staff', 'running', 'late', 'excellent', 'poor', 'sound', 'I',
+    'we', 'enjoyed', 'every', 'minute', 'of', 'a', 'to', 'in', 'for', 'with', 'but', 'too', 'long',
+]
+DECORATIONS = [',', '.', '!', '?', "n't", '<b>', '</b>', '<br/>', '&amp;', '--']
+
+
+def generate_corpus(seed, count, length):
+    """
+    Build a reproducible list of feedback-like sentences of the given length in words.
+    """
+    rng = random.Random(f'{seed}-{length}')
+    corpus = []
+    for _ in range(count):
+        words = []
+        for _ in range(length):
+            word = rng.choice(WORDS)
+            if rng.random() < 0.1:
+                word += rng.choice(DECORATIONS)
+            words.append(word)
+        corpus.append(' '.join(words))
+    return corpus
+
+
+def percentile(samples, fraction):
+    """
+    Nearest-rank percentile of a list of samples.
+    """
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def model_stages(predictor):
+    """
+    Split a predictor into its vectorize and predict stages.
+    """
+    if isinstance(predictor, LinearSentimentModel):
+        return predictor.transform, predictor.predict_vectors
+    pipeline = getattr(predictor, 'best_estimator_', predictor)
+    vectorizer, classifier = pipeline.steps[0][1], pipeline.steps[-1][1]
+    return vectorizer.transform, classifier.predict
+
+
+class Command(BaseCommand):
+    help = 'Measure the throughput and latency of each stage of the sentiment pipeline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lengths', default='10,50,200',
+                            help='Comma separated sentence lengths, in words')
+        parser.add_argument('--batch-sizes', default='1,16,128',
+                            help='Comma separated number of sentences per batch')
+        parser.add_argument('--batches', type=int, default=50,
+                            help='Number of timed batches for each length and batch size')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed of the generated corpus')
+        parser.add_argument('--output',
+                            help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--baseline',
+                            help='JSON report of a previous run to compare against')
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help='Percentage of p50 latency growth reported as a regression')
+
+    def handle(self, *args, **options):
+        try:
+            lengths = [int(value) for value in options['lengths'].split(',')]
+            batch_sizes = [int(value) for value in options['batch_sizes'].split(',')]
+        except ValueError as e:
+            raise CommandError(f'Invalid list of integers: {e}')
+
+        predictor = get_predictor()
+        vectorize, predict = model_stages(predictor)
+        results = []
+        for length in lengths:
+            for batch_size in batch_sizes:
+                corpus = generate_corpus(options['seed'], batch_size * options['batches'], length)
+                batches = [corpus[i:i + batch_size] for i in range(0, len(corpus), batch_size)]
+                results.append({
+                    'length': length,
+                    'batch_size': batch_size,
+                    'stages': self.run(batches, vectorize, predict),
+                })
+
+        report = {
+            'meta': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'model_path': settings.MODEL_PATH,
+                'model_type': type(predictor).__name__,
+                'seed': options['seed'],
+                'batches': options['batches'],
+            },
+            'results': results,
+        }
+        content = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(content + '\n')
+        else:
+            self.stdout.write(content)
+
+        if options['baseline']:
+            self.compare(report, options['baseline'], options['threshold'])
+
+    def run(self, batches, vectorize, predict):
+        """
+        Time every stage of the pipeline on each batch.
+        """
+        # Start from a cold stem cache so every configuration is measured the same way
+        preprocessing.stem.cache_clear()
+        timings = {stage: [] for stage in STAGES}
+        sentence_count = 0
+        for batch in batches:
+            sentence_count += len(batch)
+            texts = self.timed(timings['html_strip'], lambda: [preprocessing.strip_html(text) for text in batch])
+            tokens = self.timed(timings['tokenize'], lambda: [preprocessing.tokenize(text) for text in texts])
+            words = self.timed(timings['stop_words'], lambda: [preprocessing.remove_stop_words(ws) for ws in tokens])
+            filtered = self.timed(timings['stem'], lambda: [" ".join([preprocessing.stem(w) for w in ws]) for ws in words])
+            vectors = self.timed(timings['vectorize'], lambda: vectorize(filtered))
+            self.timed(timings['predict'], lambda: predict(vectors))
+
+        timings['total'] = [sum(samples) for samples in zip(*timings.values())]
+        return {stage: self.summarize(samples, sentence_count) for stage, samples in timings.items()}
+
+    def timed(self, samples, function):
+        start = time.perf_counter()
+        result = function()
+        samples.append(time.perf_counter() - start)
+        return result
+
+    def summarize(self, samples, sentence_count):
+        """
+        Summarize the per batch timings of one stage.
+        """
+        total = sum(samples)
+        return {
+            'throughput': sentence_count / total if total else None,
+            'p50_ms': percentile(samples, 0.50) * 1000,
+            'p95_ms': percentile(samples, 0.95) * 1000,
+            'p99_ms': percentile(samples, 0.99) * 1000,
+        }
+
+    def compare(self, report, baseline_path, threshold):
+        """
+        Report the stages whose p50 latency grew by more than threshold percent.
+        """
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        previous = {(r['length'], r['batch_size']): r['stages'] for r in baseline['results']}
+        regressions = []
+        for result in report['results']:
+            stages = previous.get((result['length'], result['batch_size']), {})
+            for stage, summary in result['stages'].items():
+                before = stages.get(stage, {}).get('p50_ms')
+                if before and summary['p50_ms'] > before * (1 + threshold / 100):
+                    regressions.append(
+                        f"length={result['length']} batch_size={result['batch_size']} {stage}: "
+                        f"p50 {before:.3f}ms -> {summary['p50_ms']:.3f}ms"
+                    )
+        for regression in regressions:
+            self.stderr.write(regression)
+        if regressions:
+            raise CommandError(f'{len(regressions)} stages regressed by more than {threshold}%.')
+        self.stderr.write(self.style.SUCCESS('No regression against the baseline.'))
@@ -0,0 +1,52 @@
+import os
+import random
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from ...linear_model import LinearSentimentModel, UnsupportedModelError, export_linear_model
+from ...utils import load_pipeline
+
+
+class Command(BaseCommand):
+    help = 'Export the joblib sentiment pipeline to the compact numpy format'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--input', default=settings.MODEL_PATH,
+                            help='joblib file of the trained scikit-learn pipeline')
+        parser.add_argument('--output',
+                            help='Destination .npz file (defaults to the input path with a .npz extension)')
+        parser.add_argument('--check-samples', type=int, default=1000,
+                            help='Number of generated sentences used to check the exported model')
+
+    def handle(self, *args, **options):
+        source = options['input']
+        output = options['output'] or os.path.splitext(source)[0] + '.npz'
+        if source.endswith('.npz'):
+            raise CommandError(f'{source} is already in the compact format.')
+
+        pipeline = load_pipeline(source)
+        try:
+            export_linear_model(pipeline, output)
+        except UnsupportedModelError as e:
+            raise CommandError(str(e))
+
+        model = LinearSentimentModel.load(output)
+        samples = self.sample_sentences(model, options['check_samples'])
+        expected = list(pipeline.predict(samples))
+        actual = list(model.predict(samples))
+        mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+        if mismatches:
+            os.remove(output)
+            raise CommandError(f'The exported model disagrees with the pipeline on {mismatches} of {len(samples)} sentences.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully exported {len(model.vocabulary)} features to {output} '
+            f'({os.path.getsize(output) // 1024} KiB, checked on {len(samples)} sentences)'
+        ))
+
+    def sample_sentences(self, model, count):
+        """
+        Build a reproducible set of sentences out of the model vocabulary.
+        """
+        rng = random.Random(0)
+        tokens = sorted(model.vocabulary)
+        return [" ".join(rng.choice(tokens) for _ in range(rng.randint(0, 30))) for _ in range(count)]
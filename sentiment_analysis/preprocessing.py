@@ -0,0 +1,89 @@
+import re
+import string
+from functools import lru_cache
+from bs4 import BeautifulSoup
+from nltk.tokenize import word_tokenize
+from nltk.tokenize.destructive import NLTKWordTokenizer
+from nltk.stem import PorterStemmer
+from django.conf import settings
+from .stop_words import ENGLISH_STOP_WORDS
+
+"""
+This module contains the text preprocessing engine of the sentiment analysis pipeline.
+
+It produces exactly the same filtered sentence as the original BeautifulSoup / word_tokenize /
+PorterStemmer pipeline used to train the model, but skips the expensive steps whenever the
+input makes them a no-op:
+
+- HTML parsing only runs when the text contains markup or character references.
+- Plain alphanumeric text is tokenized with a precompiled pattern and str.split instead of
+  running sentence splitting and the Treebank regex cascade.
+- Stemming and punctuation stripping are memoized per token in a bounded LRU cache.
+"""
+
+stemmer = PorterStemmer()
+stop_words = ENGLISH_STOP_WORDS
+punctuation_chars = string.punctuation + '-'
+table = str.maketrans('', '', punctuation_chars)
+
+# Text made only of ASCII letters, digits and whitespace tokenizes to its whitespace split,
+# unless it contains one of the contractions the Treebank tokenizer breaks apart ("cannot", "gonna").
+_plain_text_re = re.compile(r'[A-Za-z0-9\s]*\Z')
+_contractions_re = re.compile('|'.join(
+    pattern.pattern.replace('(?i)', '')
+    for pattern in NLTKWordTokenizer.CONTRACTIONS2 + NLTKWordTokenizer.CONTRACTIONS3
+), re.IGNORECASE)
+
+STEM_CACHE_SIZE = getattr(settings, 'SENTIMENT_STEM_CACHE_SIZE', 100000)
+
+
+def strip_html(text):
+    """
+    Return the text content of a possibly HTML sentence.
+
+    Text without '<' or '&' is returned unchanged, since html.parser would not alter it.
+    """
+    if '<' not in text and '&' not in text:
+        return text
+    return BeautifulSoup(text, 'html.parser').get_text()
+
+
+def tokenize(text):
+    """
+    Split text into words exactly like nltk's word_tokenize.
+    """
+    # The Treebank tokenizer pads the text with spaces before matching contractions.
+    if _plain_text_re.match(text) and not _contractions_re.search(f' {text} '):
+        return text.split()
+    return word_tokenize(text)
+
+
+def remove_stop_words(words):
+    """
+    Drop English stop words, compared case-insensitively.
+    """
+    return [word for word in words if word.lower() not in stop_words]
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word):
+    """
+    Stem a single token and strip its punctuation.
+    """
+    return stemmer.stem(word).translate(table)
+
+
+def preprocess(sentence):
+    """
+    Clean a raw sentence the same way the training data was cleaned.
+
+    Args:
+        sentence: Raw text, possibly containing HTML.
+
+    Returns:
+        The filtered sentence (stop words removed, tokens stemmed and stripped of punctuation).
+    """
+    if not isinstance(sentence, str):
+        return ""
+    words = remove_stop_words(tokenize(strip_html(sentence)))
+    return " ".join([stem(word) for word in words])
@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .backends import LocalStubBackend
+
+"""
+This module contains a local stub of the sentiment analysis HTTP service for tests.
+
+StubSentimentServer answers the analyze/ and analyze_batch/ endpoints with LocalStubBackend labels
+and can be told to fail or to respond slowly, to exercise the client timeouts, retries and
+circuit breaker without a real model host.
+
+    with StubSentimentServer() as server:
+        server.fail_next(2, status=503)
+        client = SentimentClient(server.url)
+"""
+
+
+class StubSentimentServer:
+    """
+    Threaded HTTP server bound to a free local port, usable as a context manager.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.delay = 0
+        self._failures = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/sentiment_analysis'
+
+    def fail_next(self, count, status=503):
+        """
+        Answer the next count requests with the given error status.
+        """
+        with self._lock:
+            self._failures.extend([status] * count)
+
+    def _next_failure(self):
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler_class(self):
+        stub = self
+        backend = LocalStubBackend()
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                stub.requests.append(self.path)
+                if stub.delay:
+                    time.sleep(stub.delay)
+                status = stub._next_failure()
+                if status:
+                    return self.respond(status, json.dumps({'error': 'Stub failure'}))
+                data = json.loads(body)
+                if self.path.endswith('/analyze/'):
+                    return self.respond(200, json.dumps({'sentiment': backend.analyze(data['sentence'])}))
+                if self.path.endswith('/analyze_batch/'):
+                    # Sentences that are not strings get an error line, as the real analyze_batch view does
+                    lines = ''.join(
+                        json.dumps({'index': i, 'sentiment': backend.analyze(sentence)} if isinstance(sentence, str)
+                                   else {'index': i, 'error': 'The sentence must be a string.'}) + '\n'
+                        for i, sentence in enumerate(data['sentences'])
+                    )
+                    return self.respond(200, lines, 'application/x-ndjson')
+                return self.respond(404, json.dumps({'error': 'Not found'}))
+
+            def respond(self, status, content, content_type='application/json'):
+                payload = content.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                try:
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on a slow response (see delay) and closed the connection
+                    pass
+
+        return Handler
@@ -1,6 +1,33 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 import json
+import os
+import random
+import string
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+import numpy as np
+from bs4 import BeautifulSoup
+from nltk.tokenize import word_tokenize
+from nltk.stem import PorterStemmer
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from django.core.management import call_command
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from unittest import mock
+from . import stop_words, utils
+from .management.commands.benchmark_sentiment import generate_corpus
+from .linear_model import LinearSentimentModel, UnsupportedModelError, export_linear_model
+from .cache import SentimentCache, content_key, get_cache
+from .preprocessing import preprocess, strip_html
+from .backends import HTTPBackend, InProcessBackend, LocalStubBackend, SentimentBackendError, get_backend
+from .client import CircuitBreaker, CircuitOpenError, SentimentClient, get_client, get_client_stats
+from .testing import StubSentimentServer
 
 class SentimentAnalysisAPITest(TestCase):
     """Test case for the sentiment analysis API."""
@@ -32,3 +59,406 @@ class SentimentAnalysisAPITest(TestCase):
         response = self.client.post(self.url, json.dumps(self.invalid_data), content_type='application/json')
         self.assertEqual(response.status_code, 400)
         self.assertIn('error', response.json())
+
+
+class SentimentBatchAnalysisAPITest(TestCase):
+    """Test case for the batch sentiment analysis API."""
+
+    def setUp(self):
+        """Set up the test client for the tests."""
+        self.client = Client()
+        self.url = reverse('sentiment_analysis_batch')
+
+    def read_lines(self, response):
+        """Decode the streamed JSON lines of a response."""
+        body = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_batch_returns_one_label_per_sentence_in_order(self):
+        """Test that each sentence gets its label along with its index."""
+        data = {'sentences': ['Well done that was amazing', 'That was a terrible event, the food was not great']}
+        response = self.client.post(self.url, json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.read_lines(response), [
+            {'index': 0, 'sentiment': 'positive'},
+            {'index': 1, 'sentiment': 'negative'},
+        ])
+
+    def test_batch_scores_empty_sentences_and_reports_invalid_ones_per_index(self):
+        """Test that empty sentences are scored like in process and non-strings reported without failing the batch."""
+        data = {'sentences': ['', 42, 'Well done that was amazing']}
+        response = self.client.post(self.url, json.dumps(data), content_type='application/json')
+        lines = self.read_lines(response)
+        self.assertEqual(lines[0], {'index': 0, 'sentiment': InProcessBackend().analyze('')})
+        self.assertEqual(lines[1]['index'], 1)
+        self.assertIn('error', lines[1])
+        self.assertEqual(lines[2], {'index': 2, 'sentiment': 'positive'})
+
+    def test_batch_with_invalid_data(self):
+        """Test the API with a missing sentences list."""
+        response = self.client.post(self.url, json.dumps({'sentences': []}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+
+
+class SentimentBackendTest(TestCase):
+    """Test case for the pluggable sentiment backends."""
+
+    def test_in_process_backend_scores_batch(self):
+        """Test that the in-process backend uses the loaded model."""
+        backend = InProcessBackend()
+        self.assertEqual(
+            backend.analyze_batch(['Well done that was amazing', 'That was a terrible event, the food was not great']),
+            ['positive', 'negative'],
+        )
+
+    def test_local_stub_backend_is_deterministic(self):
+        """Test the stub backend used by tests and offline development."""
+        backend = LocalStubBackend()
+        self.assertEqual(backend.analyze('Loved it'), 'positive')
+        self.assertEqual(backend.analyze('A terrible, boring event.'), 'negative')
+
+    @override_settings(SENTIMENT_BACKEND='sentiment_analysis.backends.LocalStubBackend')
+    def test_get_backend_follows_settings(self):
+        """Test that get_backend returns a single instance of the configured backend."""
+        self.assertIsInstance(get_backend(), LocalStubBackend)
+        self.assertIs(get_backend(), get_backend())
+
+
+def reference_preprocess(sentence):
+    """The original preprocessing pipeline, kept as the source of truth for parity checks."""
+    stemmer = PorterStemmer()
+    table = str.maketrans('', '', string.punctuation + '-')
+    if isinstance(sentence, str):
+        soup = BeautifulSoup(sentence, 'html.parser')
+        sentence = soup.get_text()
+        words = word_tokenize(sentence)
+        words = [word for word in words if word.lower() not in ENGLISH_STOP_WORDS]
+        return " ".join([stemmer.stem(word).translate(table) for word in words])
+    return ""
+
+
+class PreprocessingParityTest(TestCase):
+    """Test that the preprocessing engine matches the original pipeline exactly."""
+
+    corpus = [
+        'Well done that was amazing',
+        'That was a terrible event, the food was not great',
+        'I cannot believe how good it was. Gonna come back next year!',
+        'wanna',
+        'The <b>speakers</b> were great<br/>and the venue &amp; food too',
+        'Tom &amp; Jerry',
+        "It's the best event I've attended -- 10/10, would've paid $200.",
+        '"Loved it" said Dr. Smith (the organiser)...',
+        'Café naïve résumé',
+        'Running runners ran\n\tquickly   ',
+        '',
+        '   ',
+        None,
+    ]
+
+    def test_corpus_parity(self):
+        """Test a hand picked corpus of tricky inputs."""
+        for sentence in self.corpus:
+            with self.subTest(sentence=sentence):
+                self.assertEqual(preprocess(sentence), reference_preprocess(sentence))
+
+    def test_random_corpus_parity(self):
+        """Test a reproducible random corpus mixing plain words, markup and punctuation."""
+        atoms = ['great', 'event', 'Cannot', 'gonna', 'wanna', 'gimme', 'NOT', 'the', '<i>food</i>', '&lt;3',
+                 '1,000', 'end.', 'why?', 'wow!', "don't", 'co-op', 'naïve', '\n', '  ', 'running', '...']
+        rng = random.Random(42)
+        for _ in range(500):
+            sentence = ''.join(rng.choice(['', ' ']) + rng.choice(atoms) for _ in range(rng.randint(0, 12)))
+            with self.subTest(sentence=sentence):
+                self.assertEqual(preprocess(sentence), reference_preprocess(sentence))
+
+    def test_plain_text_skips_html_parser(self):
+        """Test the fast path for text without markup."""
+        self.assertEqual(strip_html('no markup here'), 'no markup here')
+        self.assertEqual(strip_html('<p>markup</p>'), 'markup')
+
+
+class ModelLoadingTest(TestCase):
+    """Test case for lazy loading and warm-up of the sentiment model."""
+
+    def setUp(self):
+        """Forget the model loaded by previous tests."""
+        self.addCleanup(setattr, utils, '_predictor', utils._predictor)
+        utils._predictor = None
+
+    def test_model_is_loaded_on_first_prediction(self):
+        """Test that the model is only loaded when a prediction is needed."""
+        self.assertFalse(utils.is_model_ready())
+        utils.predict_sentiments([preprocess('Well done that was amazing')])
+        self.assertTrue(utils.is_model_ready())
+
+    def test_readiness_endpoint_reports_warm_model(self):
+        """Test the readiness endpoint before and after warm-up."""
+        url = reverse('sentiment_analysis_ready')
+        self.assertEqual(self.client.get(url).status_code, 503)
+        utils.warm_up()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'ready': True})
+
+    @override_settings(SENTIMENT_MODEL_EAGER_LOAD=True)
+    def test_app_ready_warms_up_when_eager(self):
+        """Test the eager loading hook of the app config."""
+        apps.get_app_config('sentiment_analysis').ready()
+        self.assertTrue(utils.is_model_ready())
+
+    def test_app_ready_warms_up_in_a_fresh_process(self):
+        """Test the eager loading hook in a process where nothing imported scikit-learn before."""
+        script = (
+            'import django\n'
+            'from django.conf import settings\n'
+            'settings.SENTIMENT_MODEL_EAGER_LOAD = True\n'
+            'django.setup()\n'
+            'from sentiment_analysis import utils\n'
+            'print(utils.is_model_ready())\n'
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='event_management.settings')
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), 'True')
+
+    @override_settings(SENTIMENT_MODEL_CHECK_INTERVAL=60)
+    def test_model_file_is_checked_at_most_once_per_interval(self):
+        """Test that predictions do not stat the model file until the check interval has passed."""
+        utils.get_predictor()
+        with mock.patch.object(utils, 'model_fingerprint', wraps=utils.model_fingerprint) as fingerprint:
+            for _ in range(3):
+                utils.get_predictor()
+            self.assertEqual(fingerprint.call_count, 0)
+            with override_settings(SENTIMENT_MODEL_CHECK_INTERVAL=0):
+                utils.get_predictor()
+            self.assertEqual(fingerprint.call_count, 1)
+
+
+class SentimentCacheTest(TestCase):
+    """Test case for the content-addressed sentiment cache."""
+
+    def test_identical_texts_share_a_key(self):
+        """Test that case, punctuation and spacing do not change the cache key."""
+        self.assertEqual(content_key(preprocess('Great event!')), content_key(preprocess('great   event')))
+        self.assertNotEqual(content_key(preprocess('Great event')), content_key(preprocess('Terrible event')))
+
+    def test_lru_eviction_caps_size(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = SentimentCache(max_entries=2)
+        cache.set_many('v1', {'a': 'positive', 'b': 'negative'})
+        cache.get_many('v1', ['a'])
+        cache.set_many('v1', {'c': 'positive'})
+        self.assertEqual(cache.get_many('v1', ['a', 'b', 'c']), {'a': 'positive', 'c': 'positive'})
+        self.assertEqual(cache.stats()['size'], 2)
+
+    def test_model_change_invalidates_entries(self):
+        """Test that entries of a previous model are not returned."""
+        cache = SentimentCache()
+        cache.set_many('v1', {'a': 'positive'})
+        self.assertEqual(cache.get_many('v2', ['a']), {})
+
+    @override_settings(CACHES={'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_shared_tier_is_used_after_local_miss(self):
+        """Test that entries written by another worker are found in the Django cache."""
+        SentimentCache(cache_alias='shared').set_many('v1', {'a': 'negative'})
+        cache = SentimentCache(cache_alias='shared')
+        self.assertEqual(cache.get_many('v1', ['a']), {'a': 'negative'})
+        self.assertEqual(cache.stats()['shared_hits'], 1)
+
+    def test_repeated_predictions_hit_the_cache(self):
+        """Test that the model is skipped for sentences scored before."""
+        cache = get_cache()
+        cache.clear()
+        sentences = [preprocess('Well done that was amazing'), preprocess('Well done, that was amazing!')]
+        self.assertEqual(utils.predict_sentiments(sentences), ['positive', 'positive'])
+        self.assertEqual(utils.predict_sentiments(sentences[:1]), ['positive'])
+        get_user_model().objects.create_superuser(username='admin', email='admin@example.com', password='12345')
+        self.client.login(username='admin', password='12345')
+        stats = self.client.get(reverse('sentiment_analysis_stats')).json()['cache']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+    def test_stats_are_restricted_to_superusers(self):
+        """Test that the stats endpoint sends anonymous users and other users to the login page."""
+        url = reverse('sentiment_analysis_stats')
+        self.assertRedirects(self.client.get(url), f"{reverse('login')}?next={url}", fetch_redirect_response=False)
+        get_user_model().objects.create_user(username='attendee', password='12345')
+        self.client.login(username='attendee', password='12345')
+        self.assertRedirects(self.client.get(url), f"{reverse('login')}?next={url}", fetch_redirect_response=False)
+
+
+class LinearModelExportTest(TestCase):
+    """Test case for the compact model format and its numpy scorer."""
+
+    corpus = ['great event love', 'terribl event food great', 'amaz speaker', 'bore talk terribl food',
+              'love love venu', 'wast time', 'great great great', '']
+
+    def setUp(self):
+        """Create a temporary directory for exported models."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.tmp_dir = tmp_dir.name
+
+    def fit_pipeline(self, **vectorizer_options):
+        """Fit a small pipeline shaped like the one trained in the notebook."""
+        pipeline = make_pipeline(TfidfVectorizer(**vectorizer_options), LogisticRegression(C=10))
+        return pipeline.fit(self.corpus[:6], [1, 0, 1, 0, 1, 0])
+
+    def test_scorer_matches_pipeline(self):
+        """Test that the exported model predicts exactly like the pipeline for several vectorizer options."""
+        for options in [{}, {'ngram_range': (1, 3)}, {'ngram_range': (2, 2), 'sublinear_tf': True}, {'binary': True, 'norm': 'l1'}]:
+            with self.subTest(options=options):
+                pipeline = self.fit_pipeline(**options)
+                path = os.path.join(self.tmp_dir, 'model.npz')
+                export_linear_model(pipeline, path)
+                model = LinearSentimentModel.load(path)
+                sentences = self.corpus + ['Great, GREAT event!', 'unknown words only']
+                self.assertEqual(list(model.predict(sentences)), list(pipeline.predict(sentences)))
+                np.testing.assert_allclose(model.decision_function(sentences), pipeline.decision_function(sentences))
+
+    def test_unsupported_pipeline_is_rejected(self):
+        """Test that options the scorer does not implement are refused."""
+        pipeline = self.fit_pipeline(stop_words='english')
+        with self.assertRaises(UnsupportedModelError):
+            export_linear_model(pipeline, os.path.join(self.tmp_dir, 'model.npz'))
+
+    def test_export_command_and_npz_model_path(self):
+        """Test exporting the configured model and serving predictions from the export."""
+        output = os.path.join(self.tmp_dir, 'sentiment.npz')
+        call_command('export_sentiment_model', '--output', output, '--check-samples', '200', stdout=StringIO())
+        with override_settings(MODEL_PATH=output):
+            self.assertIsInstance(utils.load_model(), LinearSentimentModel)
+            self.assertEqual(
+                InProcessBackend().analyze_batch(['Well done that was amazing', 'That was a terrible event, the food was not great']),
+                ['positive', 'negative'],
+            )
+
+    def test_stop_words_match_scikit_learn(self):
+        """Test that the bundled stop word list is the one the model was trained with."""
+        self.assertEqual(stop_words.ENGLISH_STOP_WORDS, ENGLISH_STOP_WORDS)
+
+
+class BenchmarkCommandTest(TestCase):
+    """Test case for the sentiment pipeline benchmark."""
+
+    def test_benchmark_reports_every_stage_as_json(self):
+        """Test that the report covers each length, batch size and stage."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, 'bench.json')
+            args = ['--lengths', '5,20', '--batch-sizes', '1,4', '--batches', '3', '--output', output]
+            call_command('benchmark_sentiment', *args)
+            with open(output) as f:
+                report = json.load(f)
+            call_command('benchmark_sentiment', *args, '--baseline', output, '--threshold', '100000', stderr=StringIO())
+
+        self.assertEqual([(r['length'], r['batch_size']) for r in report['results']], [(5, 1), (5, 4), (20, 1), (20, 4)])
+        stages = report['results'][0]['stages']
+        self.assertEqual(set(stages), {'html_strip', 'tokenize', 'stop_words', 'stem', 'vectorize', 'predict', 'total'})
+        self.assertEqual(set(stages['total']), {'throughput', 'p50_ms', 'p95_ms', 'p99_ms'})
+
+    def test_corpus_is_reproducible(self):
+        """Test that the same seed always generates the same corpus."""
+        self.assertEqual(generate_corpus(1, 5, 10), generate_corpus(1, 5, 10))
+        self.assertNotEqual(generate_corpus(1, 5, 10), generate_corpus(2, 5, 10))
+
+
+class SentimentClientTest(TestCase):
+    """Test case for the pooled HTTP client and its circuit breaker."""
+
+    def setUp(self):
+        """Start a local stub of the sentiment service."""
+        self.server = StubSentimentServer()
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+
+    def test_http_backend_uses_shared_client(self):
+        """Test scoring through the configured HTTP backend."""
+        with override_settings(SENTIMENT_ANALYSIS_URL=self.server.url):
+            backend = HTTPBackend()
+            self.assertEqual(backend.analyze('Loved it'), 'positive')
+            self.assertEqual(backend.analyze_batch(['Loved it', 'Awful venue']), ['positive', 'negative'])
+            self.assertIs(backend.client, get_client())
+            self.assertEqual(get_client_stats()[self.server.url]['successes'], 2)
+
+    def test_blank_sentence_is_scored_like_in_process(self):
+        """Test that a blank comment scored through the HTTP backend gets the label of the in-process backend."""
+        with override_settings(SENTIMENT_ANALYSIS_URL=self.server.url):
+            backend = HTTPBackend()
+            expected = ['positive', LocalStubBackend().analyze('   '), 'negative']
+            self.assertEqual(backend.analyze_batch(['Loved it', '   ', 'Awful venue']), expected)
+            self.assertEqual(backend.client.stats()['circuit'], 'closed')
+
+    def test_rejected_sentence_fails_its_batch(self):
+        """Test that no label is made up for a sentence the service could not score."""
+        client = SentimentClient(self.server.url, retries=0)
+        with self.assertRaisesMessage(SentimentBackendError, 'could not score sentence 1'):
+            client.analyze_batch(['Loved it', None])
+        self.assertEqual(client.stats()['circuit'], 'closed')
+
+    def test_server_errors_open_the_circuit(self):
+        """Test that a 500, e.g. from a missing model file, counts as a failure of the service and is not retried."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        client = SentimentClient(self.server.url, retries=2, backoff=0, breaker=breaker)
+        self.server.fail_next(1, status=500)
+        with self.assertRaises(SentimentBackendError):
+            client.analyze('Loved it')
+        self.assertEqual(len(self.server.requests), 1)
+        with self.assertRaises(CircuitOpenError):
+            client.analyze('Loved it')
+
+    def test_client_errors_do_not_open_the_circuit(self):
+        """Test that a 400 is blamed on the request, not the service."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        client = SentimentClient(self.server.url, retries=2, backoff=0, breaker=breaker)
+        self.server.fail_next(1, status=400)
+        with self.assertRaises(SentimentBackendError):
+            client.analyze('Loved it')
+        self.assertEqual(client.analyze('Loved it'), 'positive')
+
+    def test_unexpected_error_releases_half_open_trial(self):
+        """Test that a trial call failing with an unexpected exception lets the next trial through."""
+        now = [10.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+        breaker.opened_at = 0.0
+        client = SentimentClient(self.server.url, retries=0, breaker=breaker)
+        with mock.patch.object(client.session, 'post', side_effect=TypeError('Unserializable payload')):
+            with self.assertRaises(TypeError):
+                client.analyze('Loved it')
+        self.assertEqual(client.analyze('Loved it'), 'positive')
+        self.assertEqual(client.stats()['circuit'], 'closed')
+
+    def test_transient_errors_are_retried(self):
+        """Test that 503 responses are retried within the retry budget."""
+        client = SentimentClient(self.server.url, retries=2, backoff=0)
+        self.server.fail_next(2)
+        self.assertEqual(client.analyze('Loved it'), 'positive')
+        self.assertEqual(client.stats()['retries'], 2)
+
+    def test_read_timeout_bounds_slow_service(self):
+        """Test that a slow response fails instead of hanging the caller."""
+        client = SentimentClient(self.server.url, read_timeout=0.05, retries=0)
+        self.server.delay = 0.5
+        with self.assertRaises(SentimentBackendError):
+            client.analyze('Loved it')
+
+    def test_circuit_opens_and_recovers(self):
+        """Test that an open circuit fails fast and lets a trial call through after the reset timeout."""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+        client = SentimentClient(self.server.url, retries=0, breaker=breaker)
+        self.server.fail_next(2)
+        for _ in range(2):
+            with self.assertRaises(SentimentBackendError):
+                client.analyze('Loved it')
+
+        with self.assertRaises(CircuitOpenError):
+            client.analyze('Loved it')
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(client.stats()['circuit'], 'open')
+
+        now[0] = 10
+        self.assertEqual(client.analyze('Loved it'), 'positive')
+        self.assertEqual(client.stats()['circuit'], 'closed')
@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import SentimentAnalysisView
+from .views import SentimentAnalysisView, SentimentBatchAnalysisView, SentimentReadinessView, SentimentStatsView
 
 urlpatterns = [
     path('analyze/', SentimentAnalysisView.as_view(), name='sentiment_analysis'),
+    path('analyze_batch/', SentimentBatchAnalysisView.as_view(), name='sentiment_analysis_batch'),
+    path('ready/', SentimentReadinessView.as_view(), name='sentiment_analysis_ready'),
+    path('stats/', SentimentStatsView.as_view(), name='sentiment_analysis_stats'),
 ]
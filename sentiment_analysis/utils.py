@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+from django.conf import settings
+from .cache import content_key, get_cache
+from .linear_model import LinearSentimentModel
+
+"""
+This module contains the prediction helpers shared by the sentiment analysis views.
+Text preprocessing lives in the preprocessing module.
+
+The model is not loaded at import time. It is loaded on first use by get_predictor(), or eagerly
+when the app starts if SENTIMENT_MODEL_EAGER_LOAD is set (see SentimentAnalysisConfig.ready).
+When the model file changes on disk the model is reloaded and cached results are invalidated; the
+file is checked at most every SENTIMENT_MODEL_CHECK_INTERVAL seconds, not on every prediction.
+"""
+
+logger = logging.getLogger(__name__)
+
+_predictor = None
+_predictor_fingerprint = None
+_predictor_path = None
+_predictor_checked_at = 0.0
+_predictor_lock = threading.Lock()
+
+
+def model_fingerprint():
+    """
+    Identify the current content of the model file by its modification time and size.
+    """
+    stat = os.stat(settings.MODEL_PATH)
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def load_model():
+    """
+    Load the trained model from settings.MODEL_PATH.
+
+    A .npz file is the compact format written by the export_sentiment_model command and is scored
+    with numpy alone. Any other file is a joblib pickle of the scikit-learn pipeline; its numpy
+    arrays are memory-mapped according to SENTIMENT_MODEL_MMAP_MODE so that forked workers share
+    the model pages instead of each holding a private copy.
+    """
+    if settings.MODEL_PATH.endswith('.npz'):
+        return LinearSentimentModel.load(settings.MODEL_PATH)
+    return load_pipeline(settings.MODEL_PATH)
+
+
+def load_pipeline(path):
+    """
+    Deserialize a joblib pickle of the scikit-learn pipeline.
+    """
+    import joblib
+    import sklearn.metrics._scorer
+
+    # Pipelines pickled with another scikit-learn version reference this private class
+    class _PassthroughScorer:
+        pass
+
+    sklearn.metrics._scorer._PassthroughScorer = _PassthroughScorer
+
+    mmap_mode = getattr(settings, 'SENTIMENT_MODEL_MMAP_MODE', 'r')
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+
+def get_predictor():
+    """
+    Return the trained model, loading it on first use or when the model file has changed.
+    """
+    global _predictor, _predictor_fingerprint, _predictor_path, _predictor_checked_at
+    path = settings.MODEL_PATH
+    now = time.monotonic()
+    interval = getattr(settings, 'SENTIMENT_MODEL_CHECK_INTERVAL', 5.0)
+    if _predictor is not None and path == _predictor_path and now - _predictor_checked_at < interval:
+        return _predictor
+    fingerprint = model_fingerprint()
+    with _predictor_lock:
+        if _predictor is None or path != _predictor_path or fingerprint != _predictor_fingerprint:
+            _predictor = load_model()
+            _predictor_fingerprint = fingerprint
+            _predictor_path = path
+        _predictor_checked_at = now
+    return _predictor
+
+
+def is_model_ready():
+    """
+    Report whether the model has been loaded in this process.
+    """
+    return _predictor is not None
+
+
+def warm_up():
+    """
+    Load the model and run one prediction so the first request does not pay for it.
+    """
+    predictor = get_predictor()
+    predictor.predict([''])
+    logger.info('Sentiment model loaded from %s', settings.MODEL_PATH)
+
+
+def label_for(prediction):
+    """
+    Map a raw model prediction to its sentiment label.
+
+    Args:
+        prediction: Class predicted by the model (1 for positive).
+
+    Returns:
+        'positive' or 'negative'.
+    """
+    return 'positive' if prediction == 1 else 'negative'
+
+
+def predict_sentiments(filtered_sentences):
+    """
+    Run a single vectorized prediction over already preprocessed sentences.
+
+    Sentences found in the sentiment cache are not sent to the model.
+
+    Args:
+        filtered_sentences: List of sentences returned by preprocessing.preprocess.
+
+    Returns:
+        A list of sentiment labels, one per input sentence, in the same order.
+    """
+    if not filtered_sentences:
+        return []
+    predictor = get_predictor()
+    cache = get_cache()
+    if cache is None:
+        return [label_for(prediction) for prediction in predictor.predict(filtered_sentences)]
+
+    fingerprint = _predictor_fingerprint
+    digests = [content_key(sentence) for sentence in filtered_sentences]
+    labels = cache.get_many(fingerprint, digests)
+
+    # Predict each distinct missing sentence once
+    missing = {}
+    for digest, sentence in zip(digests, filtered_sentences):
+        if digest not in labels:
+            missing.setdefault(digest, sentence)
+    if missing:
+        predictions = predictor.predict(list(missing.values()))
+        fresh = {digest: label_for(prediction) for digest, prediction in zip(missing, predictions)}
+        cache.set_many(fingerprint, fresh)
+        labels.update(fresh)
+    return [labels[digest] for digest in digests]
@@ -1,33 +1,15 @@
- 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.views import View
-import joblib
-from bs4 import BeautifulSoup
-from nltk.tokenize import word_tokenize
-from nltk.stem import PorterStemmer
-import string
-from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+from django.contrib.auth.decorators import user_passes_test
 import json
-import sklearn 
 from django.conf import settings
-# Initialize the PorterStemmer
-stemmer = PorterStemmer()
+from .preprocessing import preprocess
+from .cache import get_cache
+from .client import get_client_stats
+from .utils import predict_sentiments, is_model_ready
 
-class _PassthroughScorer:
-    pass
-
-sklearn.metrics._scorer._PassthroughScorer = _PassthroughScorer
-
-# Load the trained model
-model_path = settings.MODEL_PATH
-predictor = joblib.load(model_path)
-
-# Define stop words and punctuation
-stop_words = ENGLISH_STOP_WORDS
-punctuation_chars = string.punctuation + '-'
-table = str.maketrans('', '', punctuation_chars)
 
 class SentimentAnalysisView(View):
     @method_decorator(csrf_exempt)
@@ -38,23 +20,84 @@ class SentimentAnalysisView(View):
         try:
             data = json.loads(request.body)
             sentence = data.get('sentence', '')
-            
+
             if not sentence.strip():
                 return JsonResponse({'error': 'The sentence cannot be empty.'}, status=400)
-            
-            if isinstance(sentence, str):
-                soup = BeautifulSoup(sentence, 'html.parser')
-                sentence = soup.get_text()
-                words = word_tokenize(sentence)
-                words = [word for word in words if word.lower() not in stop_words]
-                filtered_sentence = " ".join([stemmer.stem(word).translate(table) for word in words])
-            else:
-                filtered_sentence = ""
-            
-            prediction = predictor.predict([filtered_sentence])
-            sentiment = 'positive' if prediction[0] == 1 else 'negative'
-            
+
+            filtered_sentence = preprocess(sentence)
+            sentiment = predict_sentiments([filtered_sentence])[0]
+
             return JsonResponse({'sentiment': sentiment})
         except Exception as e:
             return JsonResponse({'error': str(e)}, status=500)
 
+
+class SentimentBatchAnalysisView(View):
+    """
+    Score a list of sentences with a single vectorized prediction.
+
+    The request body is a JSON object with a 'sentences' list. The response is a stream of
+    JSON lines, one per input sentence, each holding the input 'index' and either its
+    'sentiment' or an 'error' when that sentence is not a string. Blank sentences are scored
+    by the model, as the in-process backend does.
+    """
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, *args, **kwargs):
+        return super().dispatch(*args, **kwargs)
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+            sentences = data.get('sentences')
+
+            if not isinstance(sentences, list) or not sentences:
+                return JsonResponse({'error': 'The sentences must be a non-empty list.'}, status=400)
+
+            max_size = getattr(settings, 'SENTIMENT_BATCH_MAX_SIZE', 1000)
+            if len(sentences) > max_size:
+                return JsonResponse({'error': f'A batch cannot contain more than {max_size} sentences.'}, status=400)
+
+            results = [None] * len(sentences)
+            indexes = []
+            filtered_sentences = []
+            for index, sentence in enumerate(sentences):
+                if not isinstance(sentence, str):
+                    results[index] = {'index': index, 'error': 'The sentence must be a string.'}
+                    continue
+                indexes.append(index)
+                filtered_sentences.append(preprocess(sentence))
+
+            for index, sentiment in zip(indexes, predict_sentiments(filtered_sentences)):
+                results[index] = {'index': index, 'sentiment': sentiment}
+
+            lines = (json.dumps(result) + '\n' for result in results)
+            return StreamingHttpResponse(lines, content_type='application/x-ndjson')
+        except Exception as e:
+            return JsonResponse({'error': str(e)}, status=500)
+
+
+class SentimentReadinessView(View):
+    """
+    Report whether the sentiment model is loaded in this worker.
+
+    Responds with 200 once the model is warm and 503 before, so it can back a readiness probe.
+    """
+
+    def get(self, request):
+        ready = is_model_ready()
+        return JsonResponse({'ready': ready}, status=200 if ready else 503)
+
+
+@method_decorator(user_passes_test(lambda u: u.is_superuser, login_url='login'), name='dispatch')
+class SentimentStatsView(View):
+    """
+    Report the sentiment cache and HTTP client counters of this worker, to superusers only.
+    """
+
+    def get(self, request):
+        cache = get_cache()
+        return JsonResponse({
+            'cache': cache.stats() if cache is not None else None,
+            'http_clients': get_client_stats(),
+        })
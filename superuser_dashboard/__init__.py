@@ -0,0 +1 @@
+default_app_config = 'superuser_dashboard.apps.SuperuserDashboardConfig'
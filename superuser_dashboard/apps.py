@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class SuperuserDashboardConfig(AppConfig):
     name = 'superuser_dashboard'
+
+    def ready(self):
+        from . import signals  # noqa: F401 Connects the read model signal handlers
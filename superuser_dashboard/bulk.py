@@ -0,0 +1,108 @@
+import datetime
+from django.core.exceptions import ValidationError
+from django.db import router, transaction
+from django.db.models import F
+from user_dashboard.models import Registration, Feedback
+from .models import Category, Event, EventSentimentSummary, RegistrationDailyRollup
+from .widgets import bump_versions
+
+"""
+This module contains the bulk operations on events of the manage events page.
+
+Every operation runs in one transaction with set-based queries whose cost does not depend on the
+number of events. Deleted events, their registrations and feedback, and the read models derived
+from them are removed with one DELETE statement per table rather than through a cascading delete,
+which would load every row and send its signals, and the dashboard caches are invalidated once at
+the end.
+"""
+
+ACTIONS = ('delete', 'set_category', 'shift_dates')
+
+
+def _raw_delete(queryset):
+    # QuerySet.delete() would load every row to send post_delete; this is the single DELETE
+    # Django itself issues for models without signal receivers
+    return queryset._raw_delete(router.db_for_write(queryset.model))
+
+
+def delete_events(events):
+    """
+    Delete events with their registrations and feedback.
+
+    Returns:
+        A dict with the number of deleted events, registrations and feedback.
+    """
+    event_ids = events.values('id')
+    with transaction.atomic():
+        counts = {
+            'registrations': _raw_delete(Registration.objects.filter(event__in=event_ids)),
+            'feedback': _raw_delete(Feedback.objects.filter(event__in=event_ids)),
+        }
+        _raw_delete(RegistrationDailyRollup.objects.filter(event__in=event_ids))
+        _raw_delete(EventSentimentSummary.objects.filter(event__in=event_ids))
+        counts['events'] = _raw_delete(Event.objects.filter(pk__in=event_ids))
+    bump_versions('event', 'registration', 'feedback')
+    return counts
+
+
+def set_category(events, category):
+    """
+    Move events to a category (None removes their category).
+
+    Returns:
+        A dict with the number of updated events.
+    """
+    with transaction.atomic():
+        updated = events.update(category=category)
+    bump_versions('event')
+    return {'events': updated}
+
+
+def shift_dates(events, delta):
+    """
+    Move the start and end dates of events by a time delta.
+
+    Returns:
+        A dict with the number of updated events.
+    """
+    with transaction.atomic():
+        updated = events.update(start_date=F('start_date') + delta, end_date=F('end_date') + delta)
+    bump_versions('event')
+    return {'events': updated}
+
+
+def run_bulk_action(action, events, params):
+    """
+    Validate the parameters of a bulk action and run it.
+
+    Args:
+        action: One of ACTIONS.
+        events: Queryset of the selected events.
+        params: QueryDict or dict with 'target_category' (an id, or empty for none) for set_category,
+            and 'days' and 'hours' for shift_dates.
+
+    Returns:
+        A dict with the number of rows touched, per kind of row.
+
+    Raises:
+        ValidationError: If the action or its parameters are invalid.
+    """
+    if action == 'delete':
+        return delete_events(events)
+    if action == 'set_category':
+        category = None
+        if params.get('target_category'):
+            try:
+                category = Category.objects.get(pk=int(params['target_category']))
+            except (ValueError, Category.DoesNotExist):
+                raise ValidationError(f"Unknown category: {params['target_category']}")
+        return set_category(events, category)
+    if action == 'shift_dates':
+        try:
+            delta = datetime.timedelta(days=int(params.get('days') or 0), hours=int(params.get('hours') or 0))
+        except ValueError:
+            raise ValidationError('The shift must be a whole number of days and hours.')
+        if not delta:
+            raise ValidationError('The shift must not be zero.')
+        return shift_dates(events, delta)
+    raise ValidationError(f'Unknown action: {action}')
@@ -0,0 +1,147 @@
+import datetime
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+"""
+This module contains the filters shared by the registration listing, its exports and the
+autocomplete endpoints of its filter form, and the event filters of the bulk event operations.
+"""
+
+
+def _parse_id(value, name):
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError(f'Invalid {name}: {value}')
+
+
+def start_of_day(value, name):
+    """
+    Parse a YYYY-MM-DD value into the aware datetime of the start of that day.
+
+    Raises:
+        ValidationError: If the value is not a valid date.
+    """
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValidationError(f'Invalid {name}: {value}')
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def filter_registrations(registrations, params):
+    """
+    Apply the event, user and date filters of a request to a registration queryset.
+
+    The date filter is applied as a range on registration_datetime, rather than on its date part,
+    so that the database can use the registration_datetime index.
+
+    Args:
+        registrations: Registration queryset.
+        params: QueryDict or dict with optional 'event', 'user' and 'date' (YYYY-MM-DD) values.
+
+    Returns:
+        The filtered queryset.
+
+    Raises:
+        ValidationError: If a filter value is malformed.
+    """
+    event_filter = params.get('event')
+    user_filter = params.get('user')
+    date_filter = params.get('date')
+
+    if event_filter:
+        registrations = registrations.filter(event_id=_parse_id(event_filter, 'event'))
+    if user_filter:
+        registrations = registrations.filter(user_id=_parse_id(user_filter, 'user'))
+    if date_filter:
+        start = start_of_day(date_filter, 'date')
+        registrations = registrations.filter(
+            registration_datetime__gte=start,
+            registration_datetime__lt=start + datetime.timedelta(days=1),
+        )
+    return registrations
+
+
+def prefix_range(field, prefix):
+    """
+    Build an index-friendly lookup of the values of field starting with prefix.
+
+    Unlike istartswith, which SQLite and PostgreSQL run as a LIKE that cannot use a plain b-tree
+    index, a half-open range on the column is answered by an index seek.
+
+    Args:
+        field: Name of the field.
+        prefix: Non-empty prefix.
+
+    Returns:
+        A Q object.
+    """
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': upper})
+
+
+def prefix_search(queryset, fields, term, limit):
+    """
+    Return the rows of a queryset having one of fields starting with term.
+
+    Ranges are case sensitive, so the term is also searched lowercased and capitalized, which covers
+    how names and emails are usually typed.
+
+    Args:
+        queryset: Queryset to search, ordered as the results should be.
+        fields: Names of the indexed fields to search.
+        term: Text typed by the user.
+        limit: Maximum number of rows returned.
+
+    Returns:
+        A sliced queryset, empty when term is blank.
+    """
+    term = term.strip()
+    if not term:
+        return queryset.none()
+    condition = Q()
+    for field in fields:
+        for prefix in {term, term.lower(), term.capitalize()}:
+            condition |= prefix_range(field, prefix)
+    return queryset.filter(condition)[:limit]
+
+
+EVENT_FILTERS = ('category', 'start_from', 'start_to')
+
+
+def filter_events(events, params, required=False):
+    """
+    Apply the category and start date filters of a request to an event queryset.
+
+    Args:
+        events: Event queryset.
+        params: QueryDict or dict with optional 'category' (an id, or 'none' for uncategorized events),
+            'start_from' and 'start_to' (YYYY-MM-DD, both inclusive) values.
+        required: Refuse params without any filter value, which would match every event.
+
+    Returns:
+        The filtered queryset.
+
+    Raises:
+        ValidationError: If a filter value is malformed, or no filter is set when one is required.
+    """
+    if required and not any(params.get(name) for name in EVENT_FILTERS):
+        raise ValidationError('Set at least one filter to apply an action to the matching events.')
+    category_filter = params.get('category')
+    start_from = params.get('start_from')
+    start_to = params.get('start_to')
+
+    if category_filter == 'none':
+        events = events.filter(category__isnull=True)
+    elif category_filter:
+        events = events.filter(category_id=_parse_id(category_filter, 'category'))
+    if start_from:
+        events = events.filter(start_date__gte=start_of_day(start_from, 'start date'))
+    if start_to:
+        events = events.filter(start_date__lt=start_of_day(start_to, 'end date') + datetime.timedelta(days=1))
+    return events
@@ -1,3 +1,37 @@
 from django import forms
 from user_dashboard.forms import EventForm, CategoryForm
- 
\ No newline at end of file
+
+
+class EventImportForm(EventForm):
+    """
+    EventForm validating one imported row, with the category given by name.
+
+    Categories are resolved against a map loaded once per import instead of one query per row.
+    """
+
+    category = forms.CharField()
+    start_date = forms.DateTimeField(input_formats=['%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S'])
+    end_date = forms.DateTimeField(input_formats=['%Y-%m-%dT%H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d %H:%M:%S'])
+
+    def __init__(self, *args, categories, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.categories = categories
+
+    def clean_category(self):
+        name = self.cleaned_data['category']
+        try:
+            return self.categories[name.strip().casefold()]
+        except KeyError:
+            raise forms.ValidationError(f'Unknown category: {name}')
+
+    def _get_validation_exclusions(self):
+        # The category comes from the preloaded map, checking that it exists would query per row
+        return super()._get_validation_exclusions() + ['category']
+
+
+class EventUploadForm(forms.Form):
+    file = forms.FileField(widget=forms.ClearableFileInput(attrs={'class': 'form-control-file'}))
+    format = forms.ChoiceField(
+        choices=[('', 'From the file extension'), ('csv', 'CSV'), ('jsonl', 'JSON Lines')], required=False,
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
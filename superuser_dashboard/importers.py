@@ -0,0 +1,166 @@
+import csv
+import io
+import json
+import os
+from django.db import transaction
+from .forms import EventImportForm
+from .models import Category, Event
+from .widgets import bump_versions
+
+"""
+This module contains the bulk importer of events from CSV or JSON Lines files.
+
+Each row is validated with the rules of EventForm, categories are resolved by name against a map
+loaded once, and valid rows are inserted with bulk_create in batches, each in its own transaction.
+Invalid rows are reported with their line number and skipped; they never abort the import.
+
+CSV files have a header row naming the columns; JSON Lines files hold one object per line. Both
+use the EventForm field names: title, description, category, start_date, end_date, location.
+"""
+
+FORMATS = ('csv', 'jsonl')
+
+
+class ImportResult:
+    """
+    Outcome of an import.
+
+    Attributes:
+        created: Number of events inserted (or that would be, in a dry run).
+        errors: List of (line number, message) pairs of the rejected rows.
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    @property
+    def rejected(self):
+        return len(self.errors)
+
+
+def detect_format(filename):
+    """
+    Return the import format matching a file name, or None.
+    """
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    return {'csv': 'csv', 'jsonl': 'jsonl', 'ndjson': 'jsonl'}.get(extension)
+
+
+def read_rows(stream, file_format):
+    """
+    Read the rows of a text stream one at a time.
+
+    Args:
+        stream: Text file object.
+        file_format: 'csv' or 'jsonl'.
+
+    Yields:
+        (line number, row dict or None, error message or None) tuples.
+    """
+    if file_format == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(row, dict):
+            yield number, None, 'Expected a JSON object'
+            continue
+        yield number, row, None
+
+
+def format_errors(form):
+    return '; '.join(f"{field}: {' '.join(errors)}" for field, errors in form.errors.items())
+
+
+class EventImporter:
+    """
+    Validate and insert events in batches.
+
+    Args:
+        organizer: User set as the organizer of every imported event.
+        batch_size: Number of events inserted per bulk_create and transaction.
+        dry_run: Validate the rows without inserting anything.
+    """
+
+    def __init__(self, organizer, batch_size=500, dry_run=False):
+        self.organizer = organizer
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.categories = {category.name.casefold(): category for category in Category.objects.all()}
+
+    def import_file(self, file, file_format):
+        """
+        Import an uploaded or opened binary file.
+
+        Args:
+            file: Binary file object, decoded as UTF-8.
+            file_format: 'csv' or 'jsonl'.
+
+        Returns:
+            An ImportResult.
+        """
+        stream = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        try:
+            return self.import_rows(read_rows(stream, file_format))
+        finally:
+            # Leave the underlying file open for its owner
+            stream.detach()
+
+    def import_rows(self, rows):
+        """
+        Import rows as yielded by read_rows.
+
+        Returns:
+            An ImportResult.
+        """
+        result = ImportResult()
+        batch = []
+        for number, row, error in rows:
+            if error is None:
+                event, error = self.build_event(row)
+            if error is not None:
+                result.errors.append((number, error))
+                continue
+            batch.append(event)
+            if len(batch) >= self.batch_size:
+                result.created += self.insert(batch)
+                batch = []
+        if batch:
+            result.created += self.insert(batch)
+        if result.created and not self.dry_run:
+            # bulk_create does not send post_save, so the dashboard caches are invalidated here
+            bump_versions('event')
+        return result
+
+    def build_event(self, row):
+        """
+        Validate one row.
+
+        Returns:
+            (Event, None) for a valid row, (None, error message) otherwise.
+        """
+        form = EventImportForm(
+            {field: (value.strip() if isinstance(value, str) else value) for field, value in row.items() if field},
+            categories=self.categories,
+        )
+        if not form.is_valid():
+            return None, format_errors(form)
+        event = form.save(commit=False)
+        event.organizer = self.organizer
+        return event, None
+
+    def insert(self, batch):
+        if self.dry_run:
+            return len(batch)
+        with transaction.atomic():
+            Event.objects.bulk_create(batch, batch_size=self.batch_size)
+        return len(batch)
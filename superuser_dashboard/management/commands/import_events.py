@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from ...importers import FORMATS, EventImporter, detect_format
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import events from a CSV or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--format', choices=FORMATS,
+                            help='File format, guessed from the extension by default')
+        parser.add_argument('--organizer', required=True,
+                            help='Username of the organizer of the imported events')
+        parser.add_argument('--batch-size', type=int, default=settings.EVENT_IMPORT_BATCH_SIZE,
+                            help='Number of events inserted per transaction')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate the file without importing anything')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or detect_format(options['path'])
+        if file_format is None:
+            raise CommandError('Cannot guess the file format, use --format.')
+        try:
+            organizer = User.objects.get(username=options['organizer'])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown organizer: {options['organizer']}")
+
+        importer = EventImporter(organizer, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        try:
+            with open(options['path'], 'rb') as f:
+                result = importer.import_file(f, file_format)
+        except (OSError, UnicodeDecodeError) as e:
+            raise CommandError(f"Cannot read {options['path']}: {e}")
+
+        for number, error in result.errors:
+            self.stderr.write(f'Line {number}: {error}')
+        verb = 'Would import' if options['dry_run'] else 'Successfully imported'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {result.created} events, rejected {result.rejected} rows'))
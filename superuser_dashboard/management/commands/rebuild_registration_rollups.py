@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from ...summaries import rebuild_registration_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily registration rollups from the registration table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, action='append', dest='events',
+                            help='Only rebuild the rollups of this event id (repeatable)')
+
+    def handle(self, *args, **options):
+        count = rebuild_registration_rollups(options['events'])
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {count} daily registration rollups'))
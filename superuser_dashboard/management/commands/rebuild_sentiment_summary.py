@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from ...summaries import rebuild_sentiment_summaries
+from ...widgets import bump_versions
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-event feedback sentiment summaries from the feedback table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', type=int, action='append', dest='events',
+                            help='Only rebuild the summary of this event id (repeatable)')
+
+    def handle(self, *args, **options):
+        count = rebuild_sentiment_summaries(options['events'])
+        bump_versions('feedback')
+        self.stdout.write(self.style.SUCCESS(f'Successfully rebuilt {count} sentiment summaries'))
@@ -0,0 +1,40 @@
+# Generated by Django 3.0.7 on 2026-10-18 17:56
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_sentiment_summaries(apps, schema_editor):
+    Feedback = apps.get_model('user_dashboard', 'Feedback')
+    EventSentimentSummary = apps.get_model('superuser_dashboard', 'EventSentimentSummary')
+    counts = (
+        Feedback.objects.order_by()
+        .values('event_id')
+        .annotate(
+            total=models.Count('id'),
+            positive=models.Count('id', filter=models.Q(sentiment='positive')),
+            negative=models.Count('id', filter=models.Q(sentiment='negative')),
+        )
+    )
+    EventSentimentSummary.objects.bulk_create([EventSentimentSummary(**row) for row in counts], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('superuser_dashboard', '0001_initial'),
+        ('user_dashboard', '0005_feedback_pending_sentiment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSentimentSummary',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sentiment_summary', serialize=False, to='superuser_dashboard.Event')),
+                ('positive', models.PositiveIntegerField(default=0)),
+                ('negative', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_sentiment_summaries, migrations.RunPython.noop),
+    ]
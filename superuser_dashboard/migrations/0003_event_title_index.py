@@ -0,0 +1,18 @@
+# Generated by Django 3.0.7 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('superuser_dashboard', '0002_event_sentiment_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='event',
+            name='title',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+    ]
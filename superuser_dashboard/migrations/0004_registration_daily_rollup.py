@@ -0,0 +1,46 @@
+# Generated by Django 3.0.7 on 2026-10-18 18:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models.functions import TruncDate
+
+
+def backfill_registration_rollups(apps, schema_editor):
+    Registration = apps.get_model('user_dashboard', 'Registration')
+    RegistrationDailyRollup = apps.get_model('superuser_dashboard', 'RegistrationDailyRollup')
+    counts = (
+        Registration.objects.order_by()
+        .annotate(day=TruncDate('registration_datetime'))
+        .values('event_id', 'day')
+        .annotate(count=models.Count('id'))
+    )
+    RegistrationDailyRollup.objects.bulk_create([RegistrationDailyRollup(**row) for row in counts], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('superuser_dashboard', '0003_event_title_index'),
+        ('user_dashboard', '0006_registration_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistrationDailyRollup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='registration_rollups', to='superuser_dashboard.Event')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='registrationdailyrollup',
+            index=models.Index(fields=['day', 'event'], name='registration_rollup_day_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='registrationdailyrollup',
+            constraint=models.UniqueConstraint(fields=('event', 'day'), name='registration_rollup_event_day'),
+        ),
+        migrations.RunPython(backfill_registration_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.0.7 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('superuser_dashboard', '0004_registration_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['start_date', 'id'], name='event_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['category', 'start_date', 'id'], name='event_category_start_idx'),
+        ),
+    ]
@@ -10,7 +10,7 @@ class Category(models.Model):
         return self.name
     
 class Event(models.Model):
-    title = models.CharField(max_length=255)
+    title = models.CharField(max_length=255, db_index=True)  # Indexed for prefix (autocomplete) search
     description = models.TextField()
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)  # Link to Category model (if applicable)
     start_date = models.DateTimeField()
@@ -18,5 +18,47 @@ class Event(models.Model):
     location = models.CharField(max_length=255)
     organizer = models.ForeignKey(User, on_delete=models.CASCADE)  # User who created the event
 
+    class Meta:
+        indexes = [
+            # Browsing by start date, with or without a category filter
+            models.Index(fields=['start_date', 'id'], name='event_start_idx'),
+            models.Index(fields=['category', 'start_date', 'id'], name='event_category_start_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class EventSentimentSummary(models.Model):
+    """Per-event feedback sentiment counts, kept current incrementally (see superuser_dashboard.summaries)"""
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='sentiment_summary')
+    positive = models.PositiveIntegerField(default=0)
+    negative = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)  # All feedback, including feedback not scored yet
+
+    @property
+    def positive_percentage(self):
+        scored = self.positive + self.negative
+        return int((self.positive / scored) * 100) if scored else None
+
+    def __str__(self):
+        return f"Sentiment summary for {self.event.title}"
+
+
+class RegistrationDailyRollup(models.Model):
+    """Number of registrations per event and day, kept current incrementally (see superuser_dashboard.summaries)"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='registration_rollups')
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'day'], name='registration_rollup_event_day'),
+        ]
+        indexes = [
+            # Dashboard charts read every event over a range of days
+            models.Index(fields=['day', 'event'], name='registration_rollup_day_idx'),
+        ]
+
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.count} registrations for {self.event.title} on {self.day}"
@@ -0,0 +1,118 @@
+import base64
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+"""
+This module contains keyset (cursor) pagination for listings ordered by a datetime.
+
+Instead of an OFFSET, which makes the database walk every skipped row, each page is selected with
+a WHERE clause continuing from the last (datetime, id) pair of the previous page. With an index on
+those columns every page costs the same, however deep it is.
+"""
+
+
+def encode_cursor(value, pk):
+    """
+    Encode a (datetime, id) position as an opaque URL-safe cursor.
+    """
+    payload = json.dumps([value.isoformat(), pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor built by encode_cursor.
+
+    Raises:
+        ValidationError: If the cursor is malformed.
+    """
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        value = parse_datetime(value)
+        if value is None:
+            raise ValueError('invalid datetime')
+        return value, int(pk)
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValidationError(f'Invalid page cursor: {e}')
+
+
+class KeysetPage:
+    """
+    One page of a keyset paginated listing.
+
+    Attributes:
+        object_list: The rows of the page, in listing order.
+        next_cursor: Cursor of the following page, or None on the last page.
+        previous_cursor: Cursor of the preceding page, or None on the first page.
+    """
+
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+
+def keyset_paginate(queryset, field, page_size, after=None, before=None, descending=True):
+    """
+    Return one page of a queryset ordered on (field, id).
+
+    Args:
+        queryset: Queryset to paginate.
+        field: Name of the datetime field the rows are ordered by.
+        page_size: Number of rows per page.
+        after: Cursor of the row the page starts after.
+        before: Cursor of the row the page ends before.
+        descending: List the newest rows first, otherwise the oldest.
+
+    Returns:
+        A KeysetPage.
+
+    Raises:
+        ValidationError: If a cursor is malformed.
+    """
+    forward, backward = ('lt', 'gt') if descending else ('gt', 'lt')
+    ascending_order, descending_order = (field, 'id'), (f'-{field}', '-id')
+    order, reverse_order = (descending_order, ascending_order) if descending else (ascending_order, descending_order)
+
+    def beyond(cursor, lookup):
+        value, pk = decode_cursor(cursor)
+        return Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'id__{lookup}': pk})
+
+    if before:
+        rows = list(queryset.filter(beyond(before, backward)).order_by(*reverse_order)[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size][::-1]
+        # A previous page was requested from a following one, so the following one exists
+        has_following = True
+    else:
+        if after:
+            queryset = queryset.filter(beyond(after, forward))
+        rows = list(queryset.order_by(*order)[:page_size + 1])
+        has_following = len(rows) > page_size
+        rows = rows[:page_size]
+        has_more = bool(after)
+
+    def cursor(row):
+        return encode_cursor(getattr(row, field), row.pk)
+
+    return KeysetPage(
+        rows,
+        next_cursor=cursor(rows[-1]) if rows and has_following else None,
+        previous_cursor=cursor(rows[0]) if rows and has_more else None,
+    )
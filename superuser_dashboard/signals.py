@@ -0,0 +1,106 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from user_dashboard.home import registration_version_name
+from user_dashboard.models import Registration, Feedback
+from .models import Event
+from .summaries import apply_feedback, apply_registration
+from .widgets import bump_versions
+
+"""
+This module contains the signal handlers keeping the dashboard read models current.
+"""
+
+
+@receiver(pre_save, sender=Feedback)
+def remember_previous_feedback(sender, instance, **kwargs):
+    """
+    Record the event and sentiment a feedback had before it is updated.
+    """
+    instance._previous_summary_key = None
+    if instance.pk:
+        instance._previous_summary_key = (
+            Feedback.objects.filter(pk=instance.pk).values_list('event_id', 'sentiment').first()
+        )
+
+
+@receiver(post_save, sender=Feedback)
+def update_sentiment_summary(sender, instance, created, **kwargs):
+    """
+    Apply a created or updated feedback to the sentiment summary of its event.
+    """
+    current = (instance.event_id, instance.sentiment)
+    previous = None if created else getattr(instance, '_previous_summary_key', None)
+    if previous == current:
+        return
+    if previous:
+        apply_feedback(*previous, delta=-1)
+    apply_feedback(*current, delta=1)
+
+
+@receiver(post_delete, sender=Feedback)
+def remove_from_sentiment_summary(sender, instance, **kwargs):
+    """
+    Remove a deleted feedback from the sentiment summary of its event.
+    """
+    apply_feedback(instance.event_id, instance.sentiment, delta=-1)
+
+
+def registration_key(event_id, registration_datetime):
+    return (event_id, timezone.localdate(registration_datetime))
+
+
+@receiver(pre_save, sender=Registration)
+def remember_previous_registration(sender, instance, **kwargs):
+    """
+    Record the event and day a registration had before it is updated.
+    """
+    instance._previous_rollup_key = None
+    if instance.pk:
+        previous = Registration.objects.filter(pk=instance.pk).values_list('event_id', 'registration_datetime').first()
+        if previous:
+            instance._previous_rollup_key = registration_key(*previous)
+
+
+@receiver(post_save, sender=Registration)
+def update_registration_rollup(sender, instance, created, **kwargs):
+    """
+    Apply a created or updated registration to the daily rollup of its event.
+    """
+    current = registration_key(instance.event_id, instance.registration_datetime)
+    previous = None if created else getattr(instance, '_previous_rollup_key', None)
+    if previous == current:
+        return
+    if previous:
+        apply_registration(*previous, delta=-1)
+    apply_registration(*current, delta=1)
+
+
+@receiver(post_delete, sender=Registration)
+def remove_from_registration_rollup(sender, instance, **kwargs):
+    """
+    Remove a deleted registration from the daily rollup of its event.
+    """
+    apply_registration(*registration_key(instance.event_id, instance.registration_datetime), delta=-1)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Registration)
+@receiver(post_delete, sender=Registration)
+@receiver(post_save, sender=Feedback)
+@receiver(post_delete, sender=Feedback)
+def invalidate_dashboard_widgets(sender, **kwargs):
+    """
+    Invalidate the dashboard widgets reading the saved or deleted model.
+    """
+    bump_versions(sender._meta.model_name)
+
+
+@receiver(post_save, sender=Registration)
+@receiver(post_delete, sender=Registration)
+def invalidate_user_home(sender, instance, **kwargs):
+    """
+    Invalidate the cached home dashboard of the user of the saved or deleted registration.
+    """
+    bump_versions(registration_version_name(instance.user_id))
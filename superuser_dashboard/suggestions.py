@@ -0,0 +1,206 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from functools import lru_cache
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+"""
+This module contains the event description suggestion service and its pluggable backends.
+
+The service sits between the add event form and the text generation backend chosen with the
+SUGGESTION_BACKEND setting. It keeps suggestions per normalized title in a bounded LRU with a
+time to live, lets concurrent requests for the same title share a single upstream call, and
+never waits longer than SUGGESTION_DEADLINE seconds: a late call keeps running in the background
+and its result is cached for the next request.
+"""
+
+
+class SuggestionBackendError(Exception):
+    """Raised when a backend cannot generate suggestions."""
+
+
+class SuggestionTimeout(SuggestionBackendError):
+    """Raised when suggestions are not ready before the deadline."""
+
+
+class BaseSuggestionBackend:
+    """
+    Interface shared by all suggestion backends.
+    """
+
+    def generate(self, event_title):
+        """
+        Generate description suggestions for an event.
+
+        Args:
+            event_title: The title of the event.
+
+        Returns:
+            A list of description suggestions (strings).
+        """
+        raise NotImplementedError
+
+
+class GeminiBackend(BaseSuggestionBackend):
+    """
+    Generate suggestions with Gemini.
+
+    The client is configured and the model built once, on first use; google.generativeai is only
+    imported then, so it is not needed when another backend is configured.
+    """
+
+    model_name = 'gemini-1.5-flash'
+    max_suggestions = 2
+
+    def __init__(self):
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        with self._lock:
+            if self._model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=getattr(settings, 'GEMINI_API_KEY', ''))
+                self._model = genai.GenerativeModel(self.model_name)
+            return self._model
+
+    def generate(self, event_title):
+        prompts = [
+            f"Write a concise description for the event titled '{event_title}' in a captivating way.",
+        ]
+        suggestions = []
+        try:
+            for prompt in prompts[:self.max_suggestions]:
+                response = self.model.generate_content(
+                    prompt, request_options={'timeout': getattr(settings, 'SUGGESTION_DEADLINE', 8.0)},
+                )
+                suggestions.append(response.text)
+        except Exception as e:
+            raise SuggestionBackendError(str(e)) from e
+        return suggestions
+
+
+class LocalSuggestionBackend(BaseSuggestionBackend):
+    """
+    Generate deterministic suggestions from templates, for offline development and tests.
+    """
+
+    templates = [
+        "Join us for {title}, an event you will not want to miss.",
+        "{title}: meet, learn and share with people who care about the same things as you.",
+        "Save the date for {title} and be part of something memorable.",
+    ]
+
+    def generate(self, event_title):
+        title = event_title.strip()
+        start = int(hashlib.sha256(title.lower().encode('utf-8')).hexdigest(), 16) % len(self.templates)
+        return [self.templates[(start + i) % len(self.templates)].format(title=title) for i in range(2)]
+
+
+def normalize_title(event_title):
+    """
+    Collapse whitespace and case, so that titles differing only in those share a cache entry.
+    """
+    return " ".join(event_title.split()).casefold()
+
+
+class SuggestionService:
+    """
+    Cached, deduplicated and time-bounded access to a suggestion backend.
+
+    Args:
+        backend: The BaseSuggestionBackend generating suggestions.
+        max_entries: Maximum number of titles kept in the cache.
+        ttl: Seconds a cached suggestion stays valid.
+        deadline: Seconds a caller waits for suggestions.
+        workers: Maximum number of concurrent upstream calls.
+        clock: Function returning the current time, in seconds.
+    """
+
+    def __init__(self, backend, max_entries=1000, ttl=3600, deadline=8.0, workers=4, clock=time.monotonic):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.deadline = deadline
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='suggestions')
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        # Reentrant: a call finishing before its done callback is added runs the callback right away
+        self._lock = threading.RLock()
+        self.counters = {'hits': 0, 'misses': 0, 'shared': 0, 'timeouts': 0, 'errors': 0}
+
+    def suggest(self, event_title):
+        """
+        Return description suggestions for an event title.
+
+        Raises:
+            SuggestionTimeout: If the suggestions are not ready before the deadline.
+            SuggestionBackendError: If the backend failed.
+        """
+        key = normalize_title(event_title)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return list(entry[1])
+            future = self._in_flight.get(key)
+            if future is None:
+                self.counters['misses'] += 1
+                future = self._executor.submit(self.backend.generate, event_title)
+                self._in_flight[key] = future
+                future.add_done_callback(lambda done: self._store(key, done))
+            else:
+                self.counters['shared'] += 1
+
+        try:
+            return list(future.result(timeout=self.deadline))
+        except FutureTimeoutError:
+            with self._lock:
+                self.counters['timeouts'] += 1
+            raise SuggestionTimeout(f'No suggestions within {self.deadline} seconds, please try again.')
+        except SuggestionBackendError:
+            raise
+        except Exception as e:
+            raise SuggestionBackendError(str(e)) from e
+
+    def _store(self, key, future):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if future.exception() is not None:
+                self.counters['errors'] += 1
+                return
+            self._entries[key] = (self.clock() + self.ttl, future.result())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Return the counters and cache size of this process.
+        """
+        with self._lock:
+            return dict(self.counters, size=len(self._entries), in_flight=len(self._in_flight))
+
+
+@lru_cache(maxsize=None)
+def _build_service(backend_path, max_entries, ttl, deadline, workers):
+    return SuggestionService(import_string(backend_path)(), max_entries, ttl, deadline, workers)
+
+
+def get_suggestion_service():
+    """
+    Return the process-wide suggestion service configured by the SUGGESTION_* settings.
+    """
+    return _build_service(
+        getattr(settings, 'SUGGESTION_BACKEND', 'superuser_dashboard.suggestions.GeminiBackend'),
+        getattr(settings, 'SUGGESTION_CACHE_SIZE', 1000),
+        getattr(settings, 'SUGGESTION_CACHE_TTL', 3600),
+        getattr(settings, 'SUGGESTION_DEADLINE', 8.0),
+        getattr(settings, 'SUGGESTION_WORKERS', 4),
+    )
@@ -0,0 +1,131 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from .models import EventSentimentSummary, RegistrationDailyRollup
+
+"""
+This module keeps the read models of the dashboard in step with the rows they summarize:
+EventSentimentSummary with Feedback, and RegistrationDailyRollup with Registration.
+
+Single rows are applied incrementally by the signal handlers in signals.py. Code that writes
+feedback or registrations in bulk (bulk_update, queryset update) bypasses signals and calls the
+matching rebuild function for the events it touched instead.
+"""
+
+
+def apply_feedback(event_id, sentiment, delta):
+    """
+    Add (delta=1) or remove (delta=-1) one feedback from the summary of its event.
+
+    Args:
+        event_id: ID of the event the feedback belongs to.
+        sentiment: Sentiment of the feedback.
+        delta: +1 or -1.
+    """
+    changes = {'total': F('total') + delta}
+    if sentiment in ('positive', 'negative'):
+        changes[sentiment] = F(sentiment) + delta
+    if EventSentimentSummary.objects.filter(event_id=event_id).update(**changes) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            EventSentimentSummary.objects.create(
+                event_id=event_id, total=1,
+                positive=int(sentiment == 'positive'), negative=int(sentiment == 'negative'),
+            )
+    except IntegrityError:
+        # Another request created the summary first
+        EventSentimentSummary.objects.filter(event_id=event_id).update(**changes)
+
+
+def rebuild_sentiment_summaries(event_ids=None):
+    """
+    Recompute summaries from Feedback with one grouped aggregate query.
+
+    Args:
+        event_ids: Events to recompute, or None to recompute every event.
+
+    Returns:
+        The number of summaries written.
+    """
+    from user_dashboard.models import Feedback
+
+    feedback = Feedback.objects.all()
+    summaries = EventSentimentSummary.objects.all()
+    if event_ids is not None:
+        event_ids = list(event_ids)
+        feedback = feedback.filter(event_id__in=event_ids)
+        summaries = summaries.filter(event_id__in=event_ids)
+
+    counts = (
+        feedback.order_by()
+        .values('event_id')
+        .annotate(
+            total=Count('id'),
+            positive=Count('id', filter=Q(sentiment='positive')),
+            negative=Count('id', filter=Q(sentiment='negative')),
+        )
+    )
+    with transaction.atomic():
+        summaries.delete()
+        return len(EventSentimentSummary.objects.bulk_create(
+            [EventSentimentSummary(**row) for row in counts], batch_size=500,
+        ))
+
+
+def apply_registration(event_id, day, delta):
+    """
+    Add (delta=1) or remove (delta=-1) one registration from the daily rollup of its event.
+
+    Args:
+        event_id: ID of the event the registration belongs to.
+        day: Date of the registration, in the current time zone.
+        delta: +1 or -1.
+    """
+    rollups = RegistrationDailyRollup.objects.filter(event_id=event_id, day=day)
+    if rollups.update(count=F('count') + delta) or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            RegistrationDailyRollup.objects.create(event_id=event_id, day=day, count=1)
+    except IntegrityError:
+        # Another request created the rollup first
+        rollups.update(count=F('count') + delta)
+
+
+def registration_day_counts(registrations):
+    """
+    Group a Registration queryset into (event_id, day, count) rows with one aggregate query.
+    """
+    return (
+        registrations.order_by()
+        .annotate(day=TruncDate('registration_datetime'))
+        .values('event_id', 'day')
+        .annotate(count=Count('id'))
+    )
+
+
+def rebuild_registration_rollups(event_ids=None):
+    """
+    Recompute daily registration rollups from Registration with one grouped aggregate query.
+
+    Args:
+        event_ids: Events to recompute, or None to recompute every event.
+
+    Returns:
+        The number of rollups written.
+    """
+    from user_dashboard.models import Registration
+
+    registrations = Registration.objects.all()
+    rollups = RegistrationDailyRollup.objects.all()
+    if event_ids is not None:
+        event_ids = list(event_ids)
+        registrations = registrations.filter(event_id__in=event_ids)
+        rollups = rollups.filter(event_id__in=event_ids)
+
+    with transaction.atomic():
+        rollups.delete()
+        return len(RegistrationDailyRollup.objects.bulk_create(
+            [RegistrationDailyRollup(**row) for row in registration_day_counts(registrations)], batch_size=500,
+        ))
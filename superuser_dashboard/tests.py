@@ -1,3 +1,588 @@
-from django.test import TestCase
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from user_dashboard.models import Registration, Feedback, User
+from .models import Category, Event, EventSentimentSummary, RegistrationDailyRollup
+from .bulk import delete_events
+from .importers import EventImporter
+from .summaries import rebuild_sentiment_summaries
+from .suggestions import BaseSuggestionBackend, SuggestionService, SuggestionTimeout
+from .widgets import DashboardCache, _build_cache, get_dashboard_cache, upcoming_events
+import datetime
+import json
+import os
+import tempfile
+import threading
+
+
+class EventSentimentSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='attendee', email='attendee@example.com', password='12345')
+        self.event = Event.objects.create(
+            title='Test Event', description='Test description', location='Hall',
+            start_date=timezone.now(), end_date=timezone.now(), organizer=self.user,
+        )
+        self.other_event = Event.objects.create(
+            title='Other Event', description='Test description', location='Hall',
+            start_date=timezone.now(), end_date=timezone.now(), organizer=self.user,
+        )
+
+    def summary(self, event):
+        summary = EventSentimentSummary.objects.get(event=event)
+        return summary.positive, summary.negative, summary.total
+
+    def test_signals_keep_summary_current(self):
+        feedback = Feedback.objects.create(user=self.user, event=self.event, rating=4, comments='Nice')
+        self.assertEqual(self.summary(self.event), (0, 0, 1))
+
+        feedback.sentiment = 'positive'
+        feedback.save()
+        Feedback.objects.create(user=self.user, event=self.event, rating=1, comments='Bad', sentiment='negative')
+        self.assertEqual(self.summary(self.event), (1, 1, 2))
+
+        feedback.event = self.other_event
+        feedback.save()
+        self.assertEqual(self.summary(self.event), (0, 1, 1))
+        self.assertEqual(self.summary(self.other_event), (1, 0, 1))
+
+        feedback.delete()
+        self.assertEqual(self.summary(self.other_event), (0, 0, 0))
+
+    def test_rebuild_matches_feedback(self):
+        for sentiment in ['positive', 'positive', 'negative', 'pending']:
+            Feedback.objects.create(user=self.user, event=self.event, rating=3, comments='Ok', sentiment=sentiment)
+        Feedback.objects.filter(sentiment='pending').update(sentiment='positive')
+        EventSentimentSummary.objects.filter(event=self.event).update(positive=0, negative=0, total=0)
+
+        self.assertEqual(rebuild_sentiment_summaries([self.event.id]), 1)
+        self.assertEqual(self.summary(self.event), (3, 1, 4))
+
+        EventSentimentSummary.objects.all().delete()
+        call_command('rebuild_sentiment_summary', stdout=StringIO())
+        self.assertEqual(self.summary(self.event), (3, 1, 4))
+        self.assertFalse(EventSentimentSummary.objects.filter(event=self.other_event).exists())
+
+    def test_dashboard_reads_percentages_from_summaries(self):
+        get_dashboard_cache().cache.clear()
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='12345')
+        client = Client()
+        client.login(username='admin', password='12345')
+        for sentiment in ['positive', 'positive', 'positive', 'negative', 'pending']:
+            Feedback.objects.create(user=self.user, event=self.event, rating=3, comments='Ok', sentiment=sentiment)
+        Feedback.objects.create(user=self.user, event=self.other_event, rating=3, comments='Ok')
+
+        response = client.get(reverse('super_home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['sentiment_data'], {'Test Event': 75})
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        get_dashboard_cache().cache.clear()
+        get_dashboard_cache().hits = get_dashboard_cache().misses = 0
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='12345')
+        self.client = Client()
+        self.client.login(username='admin', password='12345')
+        self.event = Event.objects.create(
+            title='Future Event', description='Test description', location='Hall',
+            start_date=timezone.now() + datetime.timedelta(days=1),
+            end_date=timezone.now() + datetime.timedelta(days=2), organizer=self.admin,
+        )
+
+    def test_widgets_are_cached_until_a_model_changes(self):
+        response = self.client.get(reverse('super_home'))
+        self.assertEqual(list(response.context['upcoming_events']), [self.event])
+        self.assertEqual(get_dashboard_cache().stats()['misses'], 4)
+
+        response = self.client.get(reverse('super_home'))
+        self.assertEqual(list(response.context['recent_registrations']), [])
+        self.assertEqual(get_dashboard_cache().stats()['hits'], 4)
+
+        registration = Registration.objects.create(user=self.admin, event=self.event)
+        response = self.client.get(reverse('super_home'))
+        self.assertEqual(list(response.context['recent_registrations']), [registration])
+        stats = get_dashboard_cache().stats()
+        # Only the registrations widget was rebuilt
+        self.assertEqual((stats['hits'], stats['misses']), (7, 5))
+        self.assertEqual(stats['hit_ratio'], 7 / 12)
+
+        self.event.delete()
+        response = self.client.get(reverse('super_home'))
+        self.assertEqual(list(response.context['upcoming_events']), [])
+        self.assertEqual(list(response.context['recent_registrations']), [])
+
+    @override_settings(SUPERUSER_DASHBOARD_CACHE_ENABLED=False)
+    def test_cache_can_be_disabled(self):
+        self.client.get(reverse('super_home'))
+        Event.objects.filter(pk=self.event.pk).update(title='Renamed Event')
+        response = self.client.get(reverse('super_home'))
+        self.assertEqual(response.context['upcoming_events'][0].title, 'Renamed Event')
+        response = self.client.get(reverse('dashboard_cache_stats'))
+        self.assertEqual(response.json(), {'cache': None})
+
+    def test_versions_live_in_a_cache_shared_between_processes(self):
+        self.assertTrue(get_dashboard_cache().shared)
+        # Another process reads the same versions from the database
+        other_process = DashboardCache('dashboard')
+        before = other_process.versions(['feedback'])['feedback']
+        call_command('rebuild_sentiment_summary', stdout=StringIO())
+        self.assertNotEqual(other_process.versions(['feedback'])['feedback'], before)
+
+    def test_local_memory_cache_is_reported(self):
+        _build_cache.cache_clear()
+        with self.assertLogs('superuser_dashboard.widgets', 'WARNING') as logs:
+            with override_settings(SUPERUSER_DASHBOARD_CACHE_ALIAS='default'):
+                self.assertFalse(get_dashboard_cache().shared)
+        self.assertIn('local to each process', logs.output[0])
+
+    def test_upcoming_events_expire_when_the_first_event_starts(self):
+        events, timeout = upcoming_events()
+        self.assertEqual(events, [self.event])
+        self.assertAlmostEqual(timeout, 24 * 60 * 60, delta=5)
+
+
+@override_settings(REGISTRATIONS_PAGE_SIZE=2)
+class ViewRegistrationsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='12345')
+        self.client = Client()
+        self.client.login(username='admin', password='12345')
+        self.event = Event.objects.create(
+            title='Test Event', description='Test description', location='Hall',
+            start_date=timezone.now(), end_date=timezone.now(), organizer=self.admin,
+        )
+        self.other_event = Event.objects.create(
+            title='Other Event', description='Test description', location='Hall',
+            start_date=timezone.now(), end_date=timezone.now(), organizer=self.admin,
+        )
+        # Registrations sharing a timestamp are ordered by id
+        moment = timezone.now()
+        self.registrations = []
+        for i in range(5):
+            user = User.objects.create_user(username=f'attendee{i}', email=f'attendee{i}@example.com', password='12345')
+            registration = Registration.objects.create(user=user, event=self.event)
+            self.registrations.append(registration)
+        Registration.objects.filter(pk__in=[r.pk for r in self.registrations[1:3]]).update(registration_datetime=moment)
+        Registration.objects.create(user=self.admin, event=self.other_event)
+
+    def get(self, **params):
+        return self.client.get(reverse('view_registrations'), params)
+
+    def test_pages_walk_every_registration_once(self):
+        expected = list(
+            Registration.objects.filter(event=self.event).order_by('-registration_datetime', '-id').values_list('id', flat=True)
+        )
+        seen = []
+        response = self.get(event=self.event.id)
+        pages = [response.context['page']]
+        while pages[-1].has_next:
+            response = self.get(event=self.event.id, after=pages[-1].next_cursor)
+            pages.append(response.context['page'])
+        for page in pages:
+            seen.extend(registration.id for registration in page)
+        self.assertEqual(seen, expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertFalse(pages[0].has_previous)
+
+        response = self.get(event=self.event.id, before=pages[2].previous_cursor)
+        self.assertEqual([r.id for r in response.context['page']], expected[2:4])
+        self.assertContains(response, f'event={self.event.id}&after=')
+
+    def test_page_queries_do_not_grow_with_depth(self):
+        first = self.get()
+        with self.assertNumQueries(3):
+            response = self.get(after=first.context['page'].next_cursor)
+        self.assertEqual(len(response.context['page']), 2)
+
+    def test_invalid_filters_are_reported(self):
+        response = self.get(after='not-a-cursor')
+        self.assertContains(response, 'Invalid page cursor')
+        response = self.get(date='2024-13-45')
+        self.assertContains(response, 'Invalid date')
+
+    def export(self, **params):
+        response = self.client.get(reverse('export_registrations'), params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_export_streams_filtered_csv(self):
+        lines = self.export(event=self.event.id, format='csv').splitlines()
+        self.assertEqual(lines[0], 'Event,User,Registration Date & Time')
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(all(line.startswith('Test Event,attendee') for line in lines[1:]))
+
+    def test_export_streams_json_lines(self):
+        rows = [json.loads(line) for line in self.export(user=self.admin.id, format='jsonl').splitlines()]
+        self.assertEqual([(row['event'], row['user']) for row in rows], [('Other Event', 'admin')])
+
+    def test_export_rejects_unknown_format(self):
+        response = self.client.get(reverse('export_registrations'), {'format': 'xml'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_filter_form_does_not_list_every_user_and_event(self):
+        response = self.get(event=self.event.id)
+        self.assertNotIn('users', response.context)
+        self.assertEqual(response.context['selected_event'], self.event)
+        self.assertContains(response, 'value="Test Event"')
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='root@example.com', password='12345')
+        self.client = Client()
+        self.client.login(username='admin', password='12345')
+        User.objects.create_user(username='Alice', email='alice@example.com', password='12345')
+        User.objects.create_user(username='bob', email='adams@example.com', password='12345')
+        for title in ['Annual Gala', 'annual meeting', 'Board Review']:
+            Event.objects.create(
+                title=title, description='Test description', location='Hall',
+                start_date=timezone.now(), end_date=timezone.now(), organizer=self.admin,
+            )
+
+    def results(self, name, q):
+        response = self.client.get(reverse(name), {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [result['label'] for result in response.json()['results']]
+
+    def test_users_match_username_or_email_prefix(self):
+        self.assertEqual(self.results('autocomplete_users', 'a'), [
+            'Alice (alice@example.com)', 'admin (root@example.com)', 'bob (adams@example.com)',
+        ])
+        self.assertEqual(self.results('autocomplete_users', 'ALI'), ['Alice (alice@example.com)'])
+        self.assertEqual(self.results('autocomplete_users', 'ad'), ['admin (root@example.com)', 'bob (adams@example.com)'])
+        self.assertEqual(self.results('autocomplete_users', ''), [])
+
+    @override_settings(AUTOCOMPLETE_LIMIT=1)
+    def test_events_match_title_prefix_with_limit(self):
+        self.assertEqual(self.results('autocomplete_events', 'ann'), ['Annual Gala'])
+
+    def test_events_match_title_prefix(self):
+        self.assertEqual(self.results('autocomplete_events', 'annual'), ['Annual Gala', 'annual meeting'])
+        self.assertEqual(self.results('autocomplete_events', 'Review'), [])
+
+
+class SlowSuggestionBackend(BaseSuggestionBackend):
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def generate(self, event_title):
+        self.calls += 1
+        self.release.wait(5)
+        return [f'About {event_title}']
+
+
+class SuggestionServiceTests(TestCase):
+    def test_suggestions_are_cached_per_normalized_title_until_they_expire(self):
+        now = [0.0]
+        backend = SlowSuggestionBackend()
+        backend.release.set()
+        service = SuggestionService(backend, ttl=60, clock=lambda: now[0])
+        self.assertEqual(service.suggest('Tech  Talk'), ['About Tech  Talk'])
+        self.assertEqual(service.suggest('tech talk '), ['About Tech  Talk'])
+        self.assertEqual(backend.calls, 1)
+        now[0] = 61
+        service.suggest('tech talk')
+        self.assertEqual(backend.calls, 2)
+
+    def test_least_recently_used_titles_are_evicted(self):
+        backend = SlowSuggestionBackend()
+        backend.release.set()
+        service = SuggestionService(backend, max_entries=2)
+        for title in ['a', 'b', 'a', 'c', 'a']:
+            service.suggest(title)
+        self.assertEqual(backend.calls, 3)
+        self.assertEqual(service.stats()['size'], 2)
+
+    def test_concurrent_requests_share_one_call(self):
+        backend = SlowSuggestionBackend()
+        service = SuggestionService(backend, deadline=5)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(service.suggest('Gala'))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        backend.release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [['About Gala']] * 4)
+        self.assertEqual(backend.calls, 1)
+
+    def test_deadline_bounds_the_wait_and_late_results_are_kept(self):
+        backend = SlowSuggestionBackend()
+        service = SuggestionService(backend, deadline=0.05)
+        with self.assertRaises(SuggestionTimeout):
+            service.suggest('Gala')
+        backend.release.set()
+        service._executor.shutdown(wait=True)
+        self.assertEqual(service.suggest('Gala'), ['About Gala'])
+        self.assertEqual(backend.calls, 1)
+
+    @override_settings(SUGGESTION_BACKEND='superuser_dashboard.suggestions.LocalSuggestionBackend')
+    def test_view_uses_configured_backend(self):
+        response = self.client.get(reverse('generate_suggestions'), {'title': 'Spring Fair'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 2)
+        self.assertTrue(all('Spring Fair' in suggestion for suggestion in response.json()))
+
+
+@override_settings(EVENTS_PAGE_SIZE=2)
+class ManageEventsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='12345')
+        self.client = Client()
+        self.client.login(username='admin', password='12345')
+        self.category = Category.objects.create(name='Music')
+        now = timezone.now()
+        self.events = [
+            Event.objects.create(
+                title=f'Event {i}', description='Test description', location='Hall', category=self.category,
+                start_date=now + datetime.timedelta(days=i), end_date=now + datetime.timedelta(days=i), organizer=self.admin,
+            )
+            for i in range(3)
+        ]
+        attendee = User.objects.create_user(username='attendee', email='attendee@example.com', password='12345')
+        for user in [self.admin, attendee]:
+            Registration.objects.create(user=user, event=self.events[2])
+        for sentiment in ['positive', 'negative', 'positive']:
+            Feedback.objects.create(user=attendee, event=self.events[2], rating=4, comments='Ok', sentiment=sentiment)
+
+    def test_events_are_paginated_with_counts_in_one_query(self):
+        # Session, user, event count, categories and the page of events
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('manage_events'))
+        events = list(response.context['events'])
+        self.assertEqual([event.title for event in events], ['Event 2', 'Event 1'])
+        self.assertEqual((events[0].registration_count, events[0].feedback_count), (2, 3))
+        self.assertEqual((events[1].registration_count, events[1].feedback_count), (0, 0))
+        self.assertContains(response, 'Music')
+
+        response = self.client.get(reverse('manage_events'), {'page': 2})
+        self.assertEqual([event.title for event in response.context['events']], ['Event 0'])
+
+    def test_add_event_redirects_without_rendering_the_list(self):
+        response = self.client.post(reverse('add_event'), {
+            'title': 'New Event', 'description': 'Test description', 'location': 'Hall',
+            'category': self.category.id, 'start_date': '2030-01-01T10:00', 'end_date': '2030-01-01T12:00',
+        })
+        self.assertRedirects(response, reverse('manage_events'), fetch_redirect_response=False)
+        self.assertTrue(Event.objects.filter(title='New Event', organizer=self.admin).exists())
+
+        response = self.client.post(reverse('add_event'), {'title': 'Broken Event'})
+        self.assertRedirects(response, reverse('manage_events'), fetch_redirect_response=False)
+        self.assertFalse(Event.objects.filter(title='Broken Event').exists())
+
+
+class ImportEventsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='12345')
+        Category.objects.create(name='Music')
+        Category.objects.create(name='Tech')
+
+    def test_importer_validates_rows_and_inserts_in_batches(self):
+        rows = [
+            {'title': f'Concert {i}', 'description': 'Live music', 'category': 'music',
+             'start_date': '2030-01-01T20:00', 'end_date': '2030-01-01 23:00:00', 'location': 'Arena'}
+            for i in range(5)
+        ]
+        rows[1]['category'] = 'Sports'
+        rows[3]['start_date'] = 'tomorrow'
+        lines = [json.dumps(row) for row in rows] + ['{not json']
+        stream = BytesIO('\n'.join(lines).encode('utf-8'))
+
+        # One query for the categories, one bulk insert (in a transaction) per batch of two, and
+        # bumping the event version in the database cache
+        with self.assertNumQueries(1 + 2 * 3 + 6):
+            result = EventImporter(self.admin, batch_size=2).import_file(stream, 'jsonl')
+        self.assertEqual(result.created, 3)
+        self.assertEqual([number for number, error in result.errors], [2, 4, 6])
+        self.assertIn('Unknown category: Sports', result.errors[0][1])
+        self.assertIn('start_date', result.errors[1][1])
+        self.assertEqual(
+            list(Event.objects.order_by('title').values_list('title', 'category__name', 'organizer__username')),
+            [('Concert 0', 'Music', 'admin'), ('Concert 2', 'Music', 'admin'), ('Concert 4', 'Music', 'admin')],
+        )
+
+    def test_command_imports_csv(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('title,description,category,start_date,end_date,location\n')
+            f.write('Meetup,Talks,Tech,2030-02-01T18:00,2030-02-01T20:00,Hub\n')
+            f.write('Broken,,Tech,2030-02-01T18:00,2030-02-01T20:00,Hub\n')
+        self.addCleanup(os.remove, f.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_events', f.name, '--organizer', 'admin', stdout=out, stderr=err)
+        self.assertIn('Successfully imported 1 events, rejected 1 rows', out.getvalue())
+        self.assertIn('Line 3: description', err.getvalue())
+        self.assertTrue(Event.objects.filter(title='Meetup', category__name='Tech').exists())
+
+    def test_upload_view_reports_results(self):
+        client = Client()
+        client.login(username='admin', password='12345')
+        upload = SimpleUploadedFile('events.jsonl', json.dumps({
+            'title': 'Hackathon', 'description': 'Build things', 'category': 'Tech',
+            'start_date': '2030-03-01T09:00', 'end_date': '2030-03-02T09:00', 'location': 'Lab',
+        }).encode('utf-8'))
+        response = client.post(reverse('import_events'), {'file': upload}, follow=True)
+        self.assertContains(response, 'Imported 1 events, rejected 0 rows.')
+        self.assertTrue(Event.objects.filter(title='Hackathon', organizer=self.admin).exists())
+
+    def test_load_random_events_uses_current_fields(self):
+        call_command('load_random_events', '--count', '3', stdout=StringIO())
+        self.assertEqual(Event.objects.filter(organizer=self.admin).count(), 3)
+
+
+class BulkEventsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='12345')
+        self.client = Client()
+        self.client.login(username='admin', password='12345')
+        self.music = Category.objects.create(name='Music')
+        self.tech = Category.objects.create(name='Tech')
+        self.start = timezone.now().replace(microsecond=0)
+        self.events = [
+            Event.objects.create(
+                title=f'Event {i}', description='Test description', location='Hall', category=self.music,
+                start_date=self.start + datetime.timedelta(days=i), end_date=self.start + datetime.timedelta(days=i, hours=2),
+                organizer=self.admin,
+            )
+            for i in range(3)
+        ]
+        for event in self.events[:2]:
+            Registration.objects.create(user=self.admin, event=event)
+            Feedback.objects.create(user=self.admin, event=event, rating=4, comments='Ok', sentiment='positive')
+
+    def post(self, **data):
+        return self.client.post(reverse('bulk_events'), data, follow=True)
+
+    def test_delete_selected_events_with_their_rows(self):
+        response = self.post(action='delete', events=[self.events[0].id, self.events[1].id])
+        self.assertContains(response, 'Bulk action completed: 2 registrations, 2 feedback, 2 events affected.')
+        self.assertEqual(list(Event.objects.values_list('title', flat=True)), ['Event 2'])
+        self.assertFalse(Registration.objects.exists())
+        self.assertFalse(Feedback.objects.exists())
+        self.assertFalse(EventSentimentSummary.objects.exists())
+        self.assertFalse(RegistrationDailyRollup.objects.exists())
+
+    def test_delete_cost_does_not_depend_on_the_number_of_events(self):
+        attendee = User.objects.create_user(username='attendee', email='attendee@example.com', password='12345')
+        for count in (2, 20):
+            events = [
+                Event.objects.create(
+                    title=f'Bulk {i}', description='Test description', location='Hall',
+                    start_date=self.start, end_date=self.start, organizer=self.admin,
+                )
+                for i in range(count)
+            ]
+            for event in events:
+                Registration.objects.create(user=attendee, event=event)
+                Feedback.objects.create(user=attendee, event=event, rating=2, comments='Meh', sentiment='negative')
+            # One DELETE per table in a savepoint, and bumping three versions in the database cache
+            with self.assertNumQueries(7 + 3 * 6):
+                counts = delete_events(Event.objects.filter(title__startswith='Bulk'))
+            self.assertEqual(counts, {'registrations': count, 'feedback': count, 'events': count})
+        self.assertEqual(Event.objects.count(), 3)
+
+    def test_set_category_of_filtered_events(self):
+        day = (self.start + datetime.timedelta(days=1)).date().isoformat()
+        # Session, user, target category, one UPDATE in a transaction and bumping the event version
+        # in the database cache
+        with self.assertNumQueries(6 + 6):
+            set_category_response = self.client.post(reverse('bulk_events'), {
+                'action': 'set_category', 'scope': 'filter', 'category': self.music.id,
+                'start_from': day, 'target_category': self.tech.id,
+            })
+        self.assertEqual(set_category_response.status_code, 302)
+        self.assertEqual(
+            list(Event.objects.order_by('id').values_list('category__name', flat=True)), ['Music', 'Tech', 'Tech'],
+        )
+
+    def test_shift_dates_of_selected_events(self):
+        response = self.post(action='shift_dates', events=[self.events[2].id], days=1, hours=-1)
+        self.assertContains(response, '1 events affected')
+        self.events[2].refresh_from_db()
+        self.assertEqual(self.events[2].start_date, self.start + datetime.timedelta(days=3, hours=-1))
+        self.assertEqual(self.events[2].end_date, self.start + datetime.timedelta(days=3, hours=1))
+
+    def test_invalid_requests_are_reported(self):
+        self.assertContains(self.post(action='delete'), 'Select at least one event.')
+        self.assertContains(self.post(action='explode', events=[self.events[0].id]), 'Unknown action: explode')
+        self.assertContains(self.post(action='shift_dates', events=[self.events[0].id]), 'The shift must not be zero.')
+        self.assertContains(
+            self.post(action='delete', scope='filter', category='', start_from='', start_to=''),
+            'Set at least one filter to apply an action to the matching events.',
+        )
+        self.assertEqual(Event.objects.count(), 3)
+
+
+class RegistrationRollupTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='12345')
+        self.client = Client()
+        self.client.login(username='admin', password='12345')
+        self.events = [
+            Event.objects.create(
+                title=title, description='Test description', location='Hall',
+                start_date=timezone.now(), end_date=timezone.now(), organizer=self.admin,
+            )
+            for title in ['Gala', 'Meetup']
+        ]
+        self.today = timezone.localdate()
+        self.attendees = [
+            User.objects.create_user(username=f'attendee{i}', email=f'attendee{i}@example.com', password='12345')
+            for i in range(3)
+        ]
+
+    def rollups(self):
+        return set(RegistrationDailyRollup.objects.values_list('event__title', 'day', 'count'))
+
+    def register(self, user, event, days_ago=0):
+        registration = Registration.objects.create(user=user, event=event)
+        if days_ago:
+            # registration_datetime is auto_now_add, so move it with save() to go through the signals
+            registration.registration_datetime -= datetime.timedelta(days=days_ago)
+            registration.save()
+        return registration
+
+    def test_signals_keep_rollups_current(self):
+        first = self.register(self.attendees[0], self.events[0])
+        self.register(self.attendees[1], self.events[0])
+        moved = self.register(self.attendees[2], self.events[0], days_ago=2)
+        self.assertEqual(self.rollups(), {
+            ('Gala', self.today, 2), ('Gala', self.today - datetime.timedelta(days=2), 1),
+        })
+        first.delete()
+        moved.event = self.events[1]
+        moved.save()
+        self.assertEqual(self.rollups(), {
+            ('Gala', self.today, 1), ('Gala', self.today - datetime.timedelta(days=2), 0),
+            ('Meetup', self.today - datetime.timedelta(days=2), 1),
+        })
+
+    def test_rebuild_command_backfills_with_one_aggregate(self):
+        self.register(self.attendees[0], self.events[0])
+        self.register(self.attendees[1], self.events[1], days_ago=1)
+        RegistrationDailyRollup.objects.all().delete()
+        call_command('rebuild_registration_rollups', stdout=StringIO())
+        self.assertEqual(self.rollups(), {
+            ('Gala', self.today, 1), ('Meetup', self.today - datetime.timedelta(days=1), 1),
+        })
+
+    def test_chart_endpoint_reads_the_rollups(self):
+        for attendee in self.attendees:
+            self.register(attendee, self.events[1])
+        self.register(self.attendees[0], self.events[0], days_ago=1)
+        self.register(self.attendees[0], self.events[0], days_ago=5)
+
+        response = self.client.get(reverse('registrations_per_day'), {'days': 3})
+        data = response.json()
+        self.assertEqual(data['days'][-1], self.today.isoformat())
+        self.assertEqual(len(data['days']), 3)
+        self.assertEqual(
+            [(event['title'], event['counts']) for event in data['events']],
+            [('Meetup', [0, 0, 3]), ('Gala', [0, 1, 0])],
+        )
+        response = self.client.get(reverse('registrations_per_day'), {'event': self.events[0].id, 'days': 'x'})
+        self.assertEqual(response.status_code, 400)
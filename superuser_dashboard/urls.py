@@ -4,16 +4,23 @@ from . import views
 
 urlpatterns = [
     path('', views.superuser_dashboard, name='super_home'),
+    path('cache-stats/', views.dashboard_cache_stats, name='dashboard_cache_stats'),
+    path('api/registrations-per-day/', views.registrations_per_day, name='registrations_per_day'),
     path('manage-events/', views.manage_events, name='manage_events'),
     path('add-event/', views.add_event, name='add_event'),
+    path('import-events/', views.import_events, name='import_events'),
     path('edit-event/<int:event_id>/', views.edit_event, name='edit_event'),
     path('delete-event/<int:event_id>/', views.delete_event, name='delete_event'),
+    path('bulk-events/', views.bulk_events, name='bulk_events'),
     path('manage-categories/', views.manage_categories, name='manage_categories'),
     path('add-category/', views.add_category, name='add_category'),
     path('edit-category/<int:category_id>/', views.edit_category, name='edit_category'),
     path('delete-category/<int:category_id>/', views.delete_category, name='delete_category'),
     path('view_registrations/', views.view_registrations, name='view_registrations'),
+    path('view_registrations/export/', views.export_registrations, name='export_registrations'),
     path('api/generate_suggestions/', views.generate_suggestions, name='generate_suggestions'),
+    path('api/autocomplete/users/', views.autocomplete_users, name='autocomplete_users'),
+    path('api/autocomplete/events/', views.autocomplete_events, name='autocomplete_events'),
 ]
 
 
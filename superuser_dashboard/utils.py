@@ -1,6 +1,5 @@
-import google.generativeai as genai
+from .suggestions import get_suggestion_service
 
-YOUR_API_KEY=""
 
 def generate_suggestions_function(event_title):
     """
@@ -10,29 +9,10 @@ def generate_suggestions_function(event_title):
         event_title: The title of the event (string).
 
     Returns:
-        A list of concise description suggestions generated by Gemini (strings).
-    """
-
-    # Replace 'YOUR_API_KEY' with your actual API key
-    genai.configure(api_key=YOUR_API_KEY)
-
-    # Craft concise prompts for event descriptions
-    prompts = [
-        f"Write a concise description for the event titled '{event_title}' in a captivating way.",
-    ]
-
-    max_suggestions = 2  # Adjust the number of suggestions as needed
-    suggestions = []
+        A list of concise description suggestions generated by the configured backend (strings).
 
-    for prompt in prompts:
-        # Send the request to Gemini using the 'gemini-1.5-flash' model
-        response = genai.GenerativeModel('gemini-1.5-flash').generate_content(prompt)
-
-        # Extract and append the generated suggestion
-        suggestions.append(response.text)
-    
-        # Limit the number of suggestions
-        if len(suggestions) >= max_suggestions:
-            break
-
-    return suggestions
+    Raises:
+        SuggestionTimeout: If the suggestions are not ready before SUGGESTION_DEADLINE.
+        SuggestionBackendError: If the backend failed.
+    """
+    return get_suggestion_service().suggest(event_title)
@@ -1,19 +1,36 @@
+import csv
+import datetime
+import itertools
+import json
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
 from user_dashboard.models import  User, Registration, Feedback
-from .models import Category, Event
-from .forms import EventForm, CategoryForm
+from .models import Category, Event, RegistrationDailyRollup
+from .forms import EventForm, CategoryForm, EventUploadForm
+from .importers import EventImporter, detect_format
+from .bulk import run_bulk_action
+from .filters import filter_events, filter_registrations, prefix_search
+from .pagination import keyset_paginate
+from .suggestions import SuggestionBackendError, SuggestionTimeout
 from .utils import generate_suggestions_function
+from .widgets import get_widgets, get_dashboard_cache
 
 """
 This module contains views for managing events, categories, and user registrations in the event management system.
 It handles CRUD operations for events and categories, displays user registrations, and provides description suggestions for events.
 """
 
+# Number of rejected rows of an event import listed on the page
+IMPORT_ERRORS_SHOWN = 20
+
 def generate_suggestions(request):
     """
     Generate description suggestions for an event based on its title.
@@ -31,6 +48,10 @@ def generate_suggestions(request):
             return JsonResponse(suggestions, safe=False)
         else:
             return JsonResponse({'error': 'Invalid request'}, status=400)
+    except SuggestionTimeout as e:
+        return JsonResponse({'error': str(e)}, status=504)
+    except SuggestionBackendError as e:
+        return JsonResponse({'error': f'Suggestions are unavailable: {e}'}, status=502)
     except Exception as e:
         return JsonResponse({'error': f'An unexpected error occurred: {e}'}, status=500)
 
@@ -59,30 +80,68 @@ def superuser_dashboard(request):
         HttpResponse object with rendered superuser dashboard template.
     """
     try:
-        upcoming_events = Event.objects.filter(start_date__gte=timezone.now()).order_by('start_date')[:2]
-        recent_registrations = Registration.objects.select_related('user', 'event').order_by('-registration_datetime')[:2]
-        recent_feedback = Feedback.objects.select_related('user', 'event').order_by('-feedback_datetime')[:2]
-
-        feedbacks = Feedback.objects.all()
-        sentiment_data = {}
-        for event in Event.objects.all():
-            feedbacks_for_event = feedbacks.filter(event=event)
-            if feedbacks_for_event.exists():
-                positive_feedbacks = feedbacks_for_event.filter(sentiment='positive').count()
-                total_feedbacks = feedbacks_for_event.count()
-                sentiment_data[event.title] = int((positive_feedbacks / total_feedbacks) * 100)
-
-        context = {
-            'upcoming_events': upcoming_events,
-            'recent_registrations': recent_registrations,
-            'recent_feedback': recent_feedback,
-            'sentiment_data': sentiment_data,
-        }
+        context = get_widgets()
         return render(request, 'superuser_dashboard.html', context)
     except Exception as e:
         messages.error(request, f'An unexpected error occurred: {e}')
         return render(request, 'superuser_dashboard.html')
 
+@superuser_required
+def dashboard_cache_stats(request):
+    """
+    Report the dashboard cache counters of this worker.
+
+    Args:
+        request: HttpRequest object.
+
+    Returns:
+        JsonResponse object with the hit and miss counters, or null when the cache is disabled.
+    """
+    cache = get_dashboard_cache()
+    return JsonResponse({'cache': cache.stats() if cache is not None else None})
+
+@superuser_required
+def registrations_per_day(request):
+    """
+    Report the registrations per day of each event over the last days, read from the daily rollups.
+
+    Args:
+        request: HttpRequest object with optional 'event' (an id) and 'days' GET parameters.
+
+    Returns:
+        JsonResponse object with the list of days and, for each event, its count on each day.
+    """
+    try:
+        days = min(int(request.GET.get('days', settings.REGISTRATION_ANALYTICS_DAYS)), settings.REGISTRATION_ANALYTICS_MAX_DAYS)
+        if days < 1:
+            return JsonResponse({'error': 'days must be positive'}, status=400)
+        end = timezone.localdate()
+        start = end - datetime.timedelta(days=days - 1)
+        rollups = RegistrationDailyRollup.objects.filter(day__gte=start, day__lte=end)
+        if request.GET.get('event'):
+            rollups = rollups.filter(event_id=int(request.GET['event']))
+        else:
+            # Chart the busiest events only
+            top_events = (
+                rollups.values('event_id').annotate(total=Sum('count'))
+                .order_by('-total', 'event_id').values_list('event_id', flat=True)[:settings.REGISTRATION_ANALYTICS_TOP_EVENTS]
+            )
+            rollups = rollups.filter(event_id__in=list(top_events))
+
+        day_list = [start + datetime.timedelta(days=offset) for offset in range(days)]
+        series = {}
+        for event_id, title, day, count in rollups.values_list('event_id', 'event__title', 'day', 'count').order_by('event_id', 'day'):
+            counts = series.setdefault(event_id, {'id': event_id, 'title': title, 'counts': [0] * days})['counts']
+            counts[(day - start).days] = count
+        return JsonResponse({
+            'days': [day.isoformat() for day in day_list],
+            'events': sorted(series.values(), key=lambda event: -sum(event['counts'])),
+        })
+    except ValueError:
+        return JsonResponse({'error': 'Invalid parameters'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': f'An unexpected error occurred: {e}'}, status=500)
+
 @superuser_required
 def add_event(request):
     """
@@ -92,10 +151,10 @@ def add_event(request):
         request: HttpRequest object.
 
     Returns:
-        HttpResponse object with rendered add event template.
+        HttpResponse object redirecting to the manage events page.
     """
     try:
-        form = EventForm() 
+        form = EventForm()
         if request.method == 'POST':
             form = EventForm(request.POST)
             if form.is_valid():
@@ -108,16 +167,9 @@ def add_event(request):
                 for field, errors in form.errors.items():
                     for error in errors:
                         messages.error(request, f"{field}: {error}")
-                form = EventForm()  # Re-initialize form to display errors in the template
 
-        categories = Category.objects.all()
-        events = Event.objects.all()
-        context = {
-            'form': form,
-            'categories': categories,
-            'events': events,
-        }
-        return render(request, 'manage_events.html', context)
+        # The event list is only rendered by manage_events, errors are shown there as messages
+        return redirect('manage_events')
     except ValidationError as e:
         messages.error(request, f"Validation error: {e}")
         return render(request, 'manage_events.html', {'form': form})
@@ -180,10 +232,68 @@ def delete_event(request, event_id):
         messages.error(request, f'An unexpected error occurred: {e}')
         return redirect('manage_events')
 
+@superuser_required
+def bulk_events(request):
+    """
+    Apply a bulk action to the selected events, or to every event matching the filters.
+
+    Args:
+        request: HttpRequest object with the 'action', its parameters, and either the selected
+            'events' ids or scope='filter' with the category and start date filters.
+
+    Returns:
+        HttpResponse object redirecting to manage events page.
+    """
+    try:
+        if request.method != 'POST':
+            return redirect('manage_events')
+        if request.POST.get('scope') == 'filter':
+            # Blank filters would match, and a delete would wipe, the whole catalogue
+            events = filter_events(Event.objects.all(), request.POST, required=True)
+        else:
+            event_ids = request.POST.getlist('events')
+            if not event_ids:
+                messages.error(request, 'Select at least one event.')
+                return redirect('manage_events')
+            events = Event.objects.filter(id__in=[int(event_id) for event_id in event_ids])
+        counts = run_bulk_action(request.POST.get('action'), events, request.POST)
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        messages.success(request, f'Bulk action completed: {summary} affected.')
+        return redirect('manage_events')
+    except ValueError:
+        messages.error(request, 'Invalid event selection.')
+        return redirect('manage_events')
+    except ValidationError as e:
+        messages.error(request, e.message)
+        return redirect('manage_events')
+    except Exception as e:
+        messages.error(request, f'An unexpected error occurred: {e}')
+        return redirect('manage_events')
+
+def events_with_counts():
+    """
+    Return the events with their category, organizer and registration and feedback counts.
+
+    The counts are correlated subqueries rather than joined Counts, which would multiply
+    registrations by feedback, so the whole page is loaded with a single query.
+
+    Returns:
+        An Event queryset, most recent first, annotated with registration_count and feedback_count.
+    """
+    def count(model):
+        counts = model.objects.filter(event=OuterRef('pk')).order_by().values('event').annotate(count=Count('id')).values('count')
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    return (
+        Event.objects.select_related('category', 'organizer')
+        .annotate(registration_count=count(Registration), feedback_count=count(Feedback))
+        .order_by('-start_date', '-id')
+    )
+
 @superuser_required
 def manage_events(request):
     """
-    Display all events and categories for management.
+    Display a page of events, with their registration and feedback counts, and the categories for management.
 
     Args:
         request: HttpRequest object.
@@ -192,7 +302,10 @@ def manage_events(request):
         HttpResponse object with rendered manage events template.
     """
     try:
-        events = Event.objects.all()
+        paginator = Paginator(events_with_counts(), settings.EVENTS_PAGE_SIZE)
+        # Count the plain table, the paginator would otherwise run both count subqueries for every event
+        paginator.count = Event.objects.count()
+        events = paginator.get_page(request.GET.get('page'))
         categories = Category.objects.all()
         context = {
             'events': events,
@@ -203,6 +316,47 @@ def manage_events(request):
         messages.error(request, f'An unexpected error occurred: {e}')
         return render(request, 'manage_events.html')
 
+@superuser_required
+def import_events(request):
+    """
+    Handle a bulk import of events from an uploaded CSV or JSON Lines file.
+
+    Args:
+        request: HttpRequest object.
+
+    Returns:
+        HttpResponse object with rendered import events template.
+    """
+    form = EventUploadForm()
+    try:
+        if request.method == 'POST':
+            form = EventUploadForm(request.POST, request.FILES)
+            if form.is_valid():
+                upload = form.cleaned_data['file']
+                file_format = form.cleaned_data['format'] or detect_format(upload.name)
+                if file_format is None:
+                    messages.error(request, 'Cannot guess the file format, please choose one.')
+                else:
+                    importer = EventImporter(request.user, batch_size=settings.EVENT_IMPORT_BATCH_SIZE)
+                    result = importer.import_file(upload.file, file_format)
+                    messages.success(request, f'Imported {result.created} events, rejected {result.rejected} rows.')
+                    for number, error in result.errors[:IMPORT_ERRORS_SHOWN]:
+                        messages.error(request, f'Line {number}: {error}')
+                    if result.rejected > IMPORT_ERRORS_SHOWN:
+                        messages.error(request, f'{result.rejected - IMPORT_ERRORS_SHOWN} more rows were rejected.')
+                    return redirect('import_events')
+            else:
+                for field, errors in form.errors.items():
+                    for error in errors:
+                        messages.error(request, f"{field}: {error}")
+        return render(request, 'import_events.html', {'form': form})
+    except UnicodeDecodeError:
+        messages.error(request, 'The file must be UTF-8 encoded.')
+        return render(request, 'import_events.html', {'form': form})
+    except Exception as e:
+        messages.error(request, f'An unexpected error occurred: {e}')
+        return render(request, 'import_events.html', {'form': form})
+
 @superuser_required
 def add_category(request):
     """
@@ -324,7 +478,10 @@ def manage_categories(request):
 @superuser_required
 def view_registrations(request):
     """
-    Display all user registrations with optional filters for event, user, and date.
+    Display user registrations, newest first, with optional filters for event, user, and date.
+
+    Registrations are paginated with cursors on (registration_datetime, id), so every page costs
+    the same whatever its depth.
     Args:
     request: HttpRequest object.
 
@@ -332,27 +489,127 @@ def view_registrations(request):
         HttpResponse object with rendered view registrations template.
     """
     try:
-        events = Event.objects.all()
-        users = User.objects.all()
-        registrations = Registration.objects.all()
-
+        registrations = filter_registrations(
+            Registration.objects.select_related('event', 'user').only(
+                'id', 'registration_datetime', 'event__title', 'user__username'
+            ),
+            request.GET,
+        )
+        page = keyset_paginate(
+            registrations, 'registration_datetime', settings.REGISTRATIONS_PAGE_SIZE,
+            after=request.GET.get('after'), before=request.GET.get('before'),
+        )
+
+        filters = request.GET.copy()
+        filters.pop('after', None)
+        filters.pop('before', None)
+        # The filter form only needs the labels of the selected event and user, the choices are
+        # looked up through the autocomplete endpoints
         event_filter = request.GET.get('event')
         user_filter = request.GET.get('user')
-        date_filter = request.GET.get('date')
-
-        if event_filter:
-            registrations = registrations.filter(event_id=event_filter)
-        if user_filter:
-            registrations = registrations.filter(user_id=user_filter)
-        if date_filter:
-            registrations = registrations.filter(registration_datetime__date=date_filter)
-
         context = {
-            'events': events,
-            'users': users,
-            'registrations': registrations,
+            'selected_event': Event.objects.only('id', 'title').filter(pk=event_filter).first() if event_filter else None,
+            'selected_user': User.objects.only('id', 'username').filter(pk=user_filter).first() if user_filter else None,
+            'registrations': page,
+            'page': page,
+            'filter_query': filters.urlencode(),
         }
         return render(request, 'view_registrations.html', context)
+    except ValidationError as e:
+        messages.error(request, e.message)
+        return render(request, 'view_registrations.html')
     except Exception as e:
         messages.error(request, f'An unexpected error occurred: {e}')
         return render(request, 'view_registrations.html')
+
+def autocomplete_response(request, queryset, fields, label):
+    """
+    Answer an autocomplete request with the rows whose fields start with the 'q' parameter.
+
+    Args:
+        request: HttpRequest object with the typed text in the 'q' GET parameter.
+        queryset: Queryset to search.
+        fields: Names of the indexed fields matched against the typed text.
+        label: Function returning the label displayed for a row.
+
+    Returns:
+        JsonResponse object with a list of {'id', 'label'} results.
+    """
+    try:
+        rows = prefix_search(queryset, fields, request.GET.get('q', ''), settings.AUTOCOMPLETE_LIMIT)
+        return JsonResponse({'results': [{'id': row.id, 'label': label(row)} for row in rows]})
+    except Exception as e:
+        return JsonResponse({'error': f'An unexpected error occurred: {e}'}, status=500)
+
+@superuser_required
+def autocomplete_users(request):
+    """
+    Suggest users whose username or email starts with the typed text.
+    """
+    return autocomplete_response(
+        request, User.objects.only('id', 'username', 'email').order_by('username'), ['username', 'email'],
+        lambda user: f"{user.username} ({user.email})",
+    )
+
+@superuser_required
+def autocomplete_events(request):
+    """
+    Suggest events whose title starts with the typed text.
+    """
+    return autocomplete_response(
+        request, Event.objects.only('id', 'title').order_by('title'), ['title'], lambda event: event.title,
+    )
+
+class Echo:
+    """
+    Pseudo-buffer handing back what the csv writer writes, so rows can be streamed one at a time.
+    """
+
+    def write(self, value):
+        return value
+
+@superuser_required
+def export_registrations(request):
+    """
+    Stream the registrations matching the listing filters as CSV or JSON Lines.
+
+    Rows are read in chunks as tuples, so memory use stays constant whatever the size of the export.
+    Args:
+    request: HttpRequest object with the listing filters and an optional 'format' ('csv' or 'jsonl').
+
+    Returns:
+        StreamingHttpResponse object with the export, or JsonResponse object with an error.
+    """
+    try:
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in ('csv', 'jsonl'):
+            return JsonResponse({'error': f'Unsupported export format: {export_format}'}, status=400)
+        rows = (
+            filter_registrations(Registration.objects.all(), request.GET)
+            .order_by('-registration_datetime', '-id')
+            .values_list('event__title', 'user__username', 'registration_datetime')
+            .iterator(chunk_size=settings.REGISTRATIONS_EXPORT_CHUNK_SIZE)
+        )
+
+        if export_format == 'csv':
+            writer = csv.writer(Echo())
+            header = ['Event', 'User', 'Registration Date & Time']
+            lines = itertools.chain(
+                [writer.writerow(header)],
+                (writer.writerow([title, username, registered.isoformat()]) for title, username, registered in rows),
+            )
+            content_type = 'text/csv'
+        else:
+            lines = (
+                json.dumps({'event': title, 'user': username, 'registration_datetime': registered.isoformat()}) + '\n'
+                for title, username, registered in rows
+            )
+            content_type = 'application/x-ndjson'
+
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="registrations.{export_format}"'
+        return response
+    except ValidationError as e:
+        return JsonResponse({'error': e.message}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': f'An unexpected error occurred: {e}'}, status=500)
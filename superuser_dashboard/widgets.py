@@ -0,0 +1,221 @@
+import logging
+import threading
+import time
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from user_dashboard.models import Registration, Feedback
+from .models import Event, EventSentimentSummary
+
+"""
+This module contains the data of the superuser dashboard widgets and the cache in front of it.
+
+Every widget is cached under a key built from the versions of the models it reads. Saving or
+deleting an Event, Registration or Feedback bumps that model's version (see signals.py), so the
+next page view misses and rebuilds only the widgets depending on it; stale entries are never read
+again and simply expire. Code writing those models in bulk bypasses signals and calls
+bump_versions itself. The versions only reach every web worker and management command when the
+cache is shared between processes, which a local-memory cache is not.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Models whose changes invalidate each widget
+WIDGET_DEPENDENCIES = {
+    'upcoming_events': ('event',),
+    'recent_registrations': ('event', 'registration'),
+    'recent_feedback': ('event', 'feedback'),
+    'sentiment_data': ('event', 'feedback'),
+}
+
+
+def upcoming_events():
+    """
+    Return the next two events, and the seconds until the first of them starts.
+
+    The entry expires when that event starts, since it then stops being upcoming.
+    """
+    events = list(Event.objects.filter(start_date__gte=timezone.now()).order_by('start_date')[:2])
+    timeout = None
+    if events:
+        timeout = max(1, int((events[0].start_date - timezone.now()).total_seconds()))
+    return events, timeout
+
+
+def recent_registrations():
+    return list(Registration.objects.select_related('user', 'event').order_by('-registration_datetime')[:2]), None
+
+
+def recent_feedback():
+    return list(Feedback.objects.select_related('user', 'event').order_by('-feedback_datetime')[:2]), None
+
+
+def sentiment_data():
+    """
+    Return the percentage of positive scored feedback per event, read from the sentiment summaries.
+    """
+    summaries = (
+        EventSentimentSummary.objects.filter(Q(positive__gt=0) | Q(negative__gt=0))
+        .select_related('event')
+        .only('positive', 'negative', 'event__title')
+    )
+    return {summary.event.title: summary.positive_percentage for summary in summaries}, None
+
+
+WIDGETS = {
+    'upcoming_events': upcoming_events,
+    'recent_registrations': recent_registrations,
+    'recent_feedback': recent_feedback,
+    'sentiment_data': sentiment_data,
+}
+
+
+class DashboardCache:
+    """
+    Versioned cache of dashboard widgets with hit and miss counters.
+
+    Args:
+        cache_alias: Name of the Django cache holding the widgets and the model versions.
+        timeout: Default expiry, in seconds, of cached widgets.
+    """
+
+    def __init__(self, cache_alias='default', timeout=None):
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    @property
+    def shared(self):
+        """
+        Whether the cache is shared between processes, so every process sees the same versions.
+        """
+        return not isinstance(self.cache, LocMemCache)
+
+    def _version_key(self, name):
+        return f"dashboard:version:{name}"
+
+    def versions(self, names):
+        """
+        Return the current version of each model name.
+        """
+        keys = {self._version_key(name): name for name in names}
+        found = self.cache.get_many(list(keys))
+        versions = {}
+        for key, name in keys.items():
+            if key not in found:
+                # Start from the clock rather than 1 so that a version evicted from the cache
+                # never comes back with a value older entries were stored under
+                self.cache.add(key, time.time_ns(), timeout=None)
+                found[key] = self.cache.get(key)
+            versions[name] = found[key]
+        return versions
+
+    def bump(self, *names):
+        """
+        Invalidate the widgets depending on the given model names.
+        """
+        for name in names:
+            key = self._version_key(name)
+            try:
+                self.cache.incr(key)
+            except ValueError:
+                self.cache.add(key, time.time_ns(), timeout=None)
+
+    def get_widgets(self, widgets):
+        """
+        Return the data of each widget, building and caching the missing ones.
+
+        Args:
+            widgets: Dict mapping widget names to functions returning (data, timeout or None).
+
+        Returns:
+            A dict mapping widget names to their data.
+        """
+        versions = self.versions({name for widget in widgets for name in WIDGET_DEPENDENCIES[widget]})
+        keys = {
+            widget: "dashboard:widget:{}:{}".format(
+                widget, ':'.join(str(versions[name]) for name in WIDGET_DEPENDENCIES[widget])
+            )
+            for widget in widgets
+        }
+        cached = self.cache.get_many(list(keys.values()))
+        data = {}
+        for widget, build in widgets.items():
+            if keys[widget] in cached:
+                data[widget] = cached[keys[widget]]
+                continue
+            data[widget], timeout = build()
+            self.cache.set(keys[widget], data[widget], timeout=timeout or self.timeout)
+        with self._lock:
+            self.hits += sum(1 for key in keys.values() if key in cached)
+            self.misses += sum(1 for key in keys.values() if key not in cached)
+        return data
+
+    def stats(self):
+        """
+        Return the hit and miss counters of this process.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
+
+
+@lru_cache(maxsize=None)
+def _build_cache(cache_alias, timeout):
+    dashboard_cache = DashboardCache(cache_alias=cache_alias, timeout=timeout)
+    if not dashboard_cache.shared:
+        logger.warning(
+            "The dashboard cache '%s' is local to each process: changes made by other workers and "
+            "by management commands will not invalidate it until its entries expire.", cache_alias,
+        )
+    return dashboard_cache
+
+
+def get_dashboard_cache():
+    """
+    Return the dashboard cache configured by the SUPERUSER_DASHBOARD_CACHE_* settings, or None when disabled.
+    """
+    if not getattr(settings, 'SUPERUSER_DASHBOARD_CACHE_ENABLED', True):
+        return None
+    return _build_cache(
+        getattr(settings, 'SUPERUSER_DASHBOARD_CACHE_ALIAS', 'default'),
+        getattr(settings, 'SUPERUSER_DASHBOARD_CACHE_TIMEOUT', None),
+    )
+
+
+def get_widgets():
+    """
+    Return the data of every dashboard widget, from the cache when it is enabled.
+    """
+    cache = get_dashboard_cache()
+    if cache is None:
+        return {widget: build()[0] for widget, build in WIDGETS.items()}
+    return cache.get_widgets(WIDGETS)
+
+
+def bump_versions(*names):
+    """
+    Invalidate the widgets depending on the given model names ('event', 'registration', 'feedback').
+
+    The versions are bumped right away and again when the current transaction commits, so a page
+    rendered by another request before the commit cannot keep stale data cached.
+    """
+    cache = get_dashboard_cache()
+    if cache is None:
+        return
+    cache.bump(*names)
+    transaction.on_commit(lambda: cache.bump(*names))
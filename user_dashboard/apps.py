@@ -1,5 +1,20 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def ensure_event_search(using, **kwargs):
+    """
+    Restore the event search table and triggers after a migration rebuilt the event table.
+    """
+    from .fts import ensure_search_index, fts5_available
+    connection = connections[using]
+    if fts5_available(connection):
+        ensure_search_index(connection)
 
 
 class UserDashboardConfig(AppConfig):
     name = 'user_dashboard'
+
+    def ready(self):
+        post_migrate.connect(ensure_event_search, sender=self)
@@ -0,0 +1,58 @@
+import datetime
+from django.core.exceptions import ValidationError
+from superuser_dashboard.filters import start_of_day
+from .models import Event, Category
+
+"""
+This module contains the filter engine of the browse events page.
+
+Every filter translates to a condition the (start_date, id) and (category, start_date, id) indexes
+of Event can answer: dates become half-open start_date ranges rather than date casts, and the
+category name is resolved to its id first, so the events query never joins to filter.
+"""
+
+
+def browse_filters(params):
+    """
+    Validate the browse filters of a request.
+
+    Args:
+        params: QueryDict or dict with optional 'date', 'date_from', 'date_to' (YYYY-MM-DD) and
+            'category' (a category name) values.
+
+    Returns:
+        A dict of lookups to apply to the Event queryset.
+
+    Raises:
+        ValidationError: If a filter value is malformed or names an unknown category.
+    """
+    lookups = {}
+    lower, upper = [], []
+    if params.get('date'):
+        start = start_of_day(params['date'], 'date')
+        lower.append(start)
+        upper.append(start + datetime.timedelta(days=1))
+    if params.get('date_from'):
+        lower.append(start_of_day(params['date_from'], 'start date'))
+    if params.get('date_to'):
+        upper.append(start_of_day(params['date_to'], 'end date') + datetime.timedelta(days=1))
+    if lower:
+        lookups['start_date__gte'] = max(lower)
+    if upper:
+        lookups['start_date__lt'] = min(upper)
+    if params.get('category'):
+        category_id = Category.objects.filter(name=params['category']).values_list('id', flat=True).first()
+        if category_id is None:
+            raise ValidationError(f"Unknown category: {params['category']}")
+        lookups['category_id'] = category_id
+    return lookups
+
+
+def browse_events_queryset(params):
+    """
+    Return the events matching the browse filters of a request, with their category loaded.
+
+    Raises:
+        ValidationError: If a filter value is malformed.
+    """
+    return Event.objects.select_related('category').filter(**browse_filters(params))
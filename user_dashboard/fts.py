@@ -0,0 +1,106 @@
+"""
+This module contains the SQLite FTS5 schema behind event search.
+
+event_search is an external content FTS5 table over the title, description and location of
+superuser_dashboard_event: it stores only the index, and triggers on the event table keep it in
+sync with every write, including bulk inserts, queryset updates and raw deletes.
+
+Rebuilding the event table (as Django migrations do on SQLite to alter a column) drops its
+triggers, so ensure_search_index runs after every migrate (see UserDashboardConfig.ready) and
+recreates them; the rebuild_event_search command also recreates a missing table on demand.
+"""
+
+EVENT_TABLE = 'superuser_dashboard_event'
+SEARCH_TABLE = 'event_search'
+
+CREATE_STATEMENTS = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        title, description, location,
+        content='{EVENT_TABLE}', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON {EVENT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON {EVENT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update AFTER UPDATE ON {EVENT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, description, location)
+        VALUES ('delete', old.id, old.title, old.description, old.location);
+        INSERT INTO {SEARCH_TABLE}(rowid, title, description, location)
+        VALUES (new.id, new.title, new.description, new.location);
+    END""",
+]
+
+DROP_STATEMENTS = [
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_insert',
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_delete',
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_update',
+    f'DROP TABLE IF EXISTS {SEARCH_TABLE}',
+]
+
+
+def fts5_available(connection):
+    """
+    Return whether the database behind a connection supports FTS5.
+    """
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if cursor.fetchone()[0]:
+            return True
+        # Builds may also load FTS5 as an extension, so try to use it
+        try:
+            cursor.execute('CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(content)')
+            cursor.execute('DROP TABLE temp.fts5_probe')
+            return True
+        except Exception:
+            return False
+
+
+def search_table_exists(connection):
+    """
+    Return whether the event_search table exists.
+    """
+    return SEARCH_TABLE in connection.introspection.table_names()
+
+
+def create_search_index(connection):
+    """
+    Create the event_search table and its triggers if missing, and index every event.
+    """
+    with connection.cursor() as cursor:
+        for statement in CREATE_STATEMENTS:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+
+
+def ensure_search_index(connection):
+    """
+    Recreate the triggers of the event_search table if any is missing, and then reindex every event.
+
+    Nothing is created when the event_search table itself does not exist, e.g. before its
+    migration is applied or after it is unapplied.
+
+    Returns:
+        Whether a trigger was missing and the index was rebuilt.
+    """
+    triggers = {f'{SEARCH_TABLE}_insert', f'{SEARCH_TABLE}_delete', f'{SEARCH_TABLE}_update'}
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {row[0] for row in cursor.fetchall()}
+    if not {SEARCH_TABLE, EVENT_TABLE} <= existing or triggers <= existing:
+        return False
+    # Events written while a trigger was missing are not indexed, so reindex them all
+    create_search_index(connection)
+    return True
+
+
+def drop_search_index(connection):
+    with connection.cursor() as cursor:
+        for statement in DROP_STATEMENTS:
+            cursor.execute(statement)
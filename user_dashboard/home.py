@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from superuser_dashboard.widgets import get_dashboard_cache
+from .models import Event, Registration
+
+"""
+This module contains the data of the user home dashboard and the per-user cache in front of it.
+
+The context of each user is cached under a key built from two versions kept by the dashboard
+cache: the event catalogue version ('event'), bumped by every event write, and a version of the
+user's own registrations, bumped when one of them is saved or deleted (see
+superuser_dashboard.signals). Registering or cancelling therefore invalidates only that user's
+entry, while changing an event invalidates every entry, since any of them may show it. Nothing
+is cached when those versions are local to each process.
+"""
+
+HOME_EVENTS_SHOWN = 2
+
+
+def registration_version_name(user_id):
+    """
+    Return the name of the dashboard cache version of a user's registrations.
+    """
+    return f'registration:user:{user_id}'
+
+
+def build_home_context(user):
+    """
+    Return the home dashboard context of a user, and the seconds until it expires (or None).
+
+    My events lists the registered events not over yet. The entry expires when one of the listed
+    events ends or, for upcoming events, starts, since the lists then change.
+    """
+    now = timezone.now()
+    my_events = list(
+        Event.objects.filter(registration__user=user, end_date__gte=now).order_by('start_date', 'id')[:HOME_EVENTS_SHOWN]
+    )
+    # A correlated NOT EXISTS lets the database walk events by start date and stop after a few
+    # rows, instead of anti-joining the whole registration table
+    registered = Registration.objects.filter(user=user, event=OuterRef('pk'))
+    upcoming_events = list(
+        Event.objects.filter(~Exists(registered), start_date__gte=now).order_by('start_date', 'id')[:HOME_EVENTS_SHOWN]
+    )
+    changes = [event.end_date for event in my_events] + [event.start_date for event in upcoming_events]
+    timeout = max(1, int((min(changes) - now).total_seconds())) if changes else None
+    return {'my_events': my_events, 'upcoming_events': upcoming_events}, timeout
+
+
+def get_home_context(user):
+    """
+    Return the home dashboard context of a user, from the cache when it is enabled.
+
+    The page is rendered uncached unless the versions live in a cache shared between processes:
+    a registration made through one worker would otherwise not invalidate the entry another
+    worker serves right after the redirect.
+    """
+    dashboard_cache = get_dashboard_cache()
+    if (dashboard_cache is None or not dashboard_cache.shared
+            or not getattr(settings, 'USER_DASHBOARD_CACHE_ENABLED', True)):
+        return build_home_context(user)[0]
+    user_version = registration_version_name(user.pk)
+    versions = dashboard_cache.versions(['event', user_version])
+    key = f"home:{user.pk}:{versions['event']}:{versions[user_version]}"
+    context = dashboard_cache.cache.get(key)
+    if context is None:
+        context, timeout = build_home_context(user)
+        dashboard_cache.cache.set(key, context, timeout=timeout or dashboard_cache.timeout)
+    return context
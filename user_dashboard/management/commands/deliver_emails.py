@@ -0,0 +1,34 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from ...outbox import deliver_due_emails
+
+
+class Command(BaseCommand):
+    help = 'Deliver the queued emails of the outbox in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 100),
+                            help='Maximum number of emails sent over one mail connection')
+        parser.add_argument('--poll-interval', type=float, default=getattr(settings, 'EMAIL_OUTBOX_POLL_INTERVAL', 5.0),
+                            help='Seconds to wait when no email is due')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once no email is due instead of polling for new emails')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        while True:
+            counts = deliver_due_emails(batch_size)
+            for key in totals:
+                totals[key] += counts[key]
+            if counts['retried'] or counts['failed']:
+                self.stderr.write(f"{counts['retried']} emails will be retried, {counts['failed']} failed for good")
+            if counts['claimed'] < batch_size:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Successfully sent {totals['sent']} emails ({totals['retried']} to retry, {totals['failed']} failed)"
+        ))
@@ -1,32 +1,36 @@
 # events/management/commands/load_random_events.py
 
-from django.core.management.base import BaseCommand
-from ...models import Event
+from django.core.management.base import BaseCommand, CommandError
+from ...models import Event, Category
 from django.contrib.auth import get_user_model
 from faker import Faker
+from superuser_dashboard.widgets import bump_versions
 import random
 from datetime import timedelta
+from django.utils import timezone
 
 fake = Faker()
 User = get_user_model()
 
 def generate_random_events(num_events):
     events = []
-    users = list(User.objects.all())  # Fetch all users to assign as creators
+    users = list(User.objects.all())  # Fetch all users to assign as organizers
+    categories = list(Category.objects.all()) or [None]
     for _ in range(num_events):
         title = fake.catch_phrase()
         description = fake.paragraph()
         location = fake.address()
-        start_datetime = fake.date_time_between(start_date='+1d', end_date='+30d')
-        end_datetime = start_datetime + timedelta(hours=random.randint(1, 6))
-        created_by = random.choice(users)  # Assign a random user as the creator
+        start_date = fake.date_time_between(start_date='+1d', end_date='+30d', tzinfo=timezone.utc)
+        end_date = start_date + timedelta(hours=random.randint(1, 6))
+        organizer = random.choice(users)  # Assign a random user as the organizer
         event = Event(
             title=title,
             description=description,
+            category=random.choice(categories),
             location=location,
-            start_datetime=start_datetime,
-            end_datetime=end_datetime,
-            created_by=created_by
+            start_date=start_date,
+            end_date=end_date,
+            organizer=organizer
         )
         events.append(event)
     return events
@@ -34,8 +38,14 @@ def generate_random_events(num_events):
 class Command(BaseCommand):
     help = 'Generate and load random events into the database'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20, help='Number of random events to generate')
+
     def handle(self, *args, **kwargs):
-        num_events = 20  # Number of random events to generate
+        num_events = kwargs['count']
+        if not User.objects.exists():
+            raise CommandError('Create a user first, events need an organizer.')
         random_events = generate_random_events(num_events)
         Event.objects.bulk_create(random_events)
+        bump_versions('event')
         self.stdout.write(self.style.SUCCESS(f'Successfully loaded {num_events} random events'))
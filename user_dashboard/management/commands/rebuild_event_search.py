@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from ...fts import create_search_index, fts5_available
+
+
+class Command(BaseCommand):
+    help = 'Recreate the event search FTS5 table and its triggers if missing, and reindex every event'
+
+    def handle(self, *args, **options):
+        if not fts5_available(connection):
+            self.stdout.write(self.style.WARNING(
+                'The database does not support FTS5; events are searched with an in-process index built on demand'
+            ))
+            return
+        create_search_index(connection)
+        self.stdout.write(self.style.SUCCESS('Successfully rebuilt the event search index'))
@@ -0,0 +1,117 @@
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from sentiment_analysis.preprocessing import preprocess
+from sentiment_analysis.utils import predict_sentiments
+from superuser_dashboard.summaries import rebuild_sentiment_summaries
+from superuser_dashboard.widgets import bump_versions
+from ...models import Feedback
+
+
+def _init_worker():
+    # Worker processes started with 'spawn' need the app registry before preprocessing
+    django.setup()
+
+
+def iter_chunks(rows, size):
+    """
+    Group an iterator of rows into lists of at most size rows.
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = 'Recompute the sentiment of every feedback with the current model'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Number of feedback rows read, predicted and written at a time')
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help='Preprocessing processes (0 preprocesses in this process)')
+        parser.add_argument('--checkpoint', default='rescore_feedback.checkpoint.json',
+                            help='File recording the last rescored feedback id')
+        parser.add_argument('--resume', action='store_true',
+                            help='Continue after the feedback id recorded in the checkpoint')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report the sentiment changes without saving them')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        checkpoint = options['checkpoint']
+        dry_run = options['dry_run']
+        last_pk = self.read_checkpoint(checkpoint) if options['resume'] else 0
+
+        rows = (
+            Feedback.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'event_id', 'comments', 'sentiment')
+            .iterator(chunk_size=chunk_size)
+        )
+        changes = Counter()
+        processed = 0
+        executor = None
+        if options['workers']:
+            executor = ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker)
+        try:
+            for chunk in iter_chunks(rows, chunk_size):
+                pks, event_ids, comments, old_sentiments = zip(*chunk)
+                if executor is not None:
+                    filtered = list(executor.map(preprocess, comments, chunksize=max(1, len(comments) // (4 * options['workers']))))
+                else:
+                    filtered = [preprocess(comment) for comment in comments]
+                new_sentiments = predict_sentiments(filtered)
+
+                updated = []
+                changed_events = set()
+                for pk, event_id, old, new in zip(pks, event_ids, old_sentiments, new_sentiments):
+                    if old != new:
+                        changes[(old, new)] += 1
+                        updated.append(Feedback(pk=pk, sentiment=new))
+                        changed_events.add(event_id)
+                        if options['verbosity'] >= 2:
+                            self.stdout.write(f'Feedback {pk}: {old} -> {new}')
+
+                processed += len(chunk)
+                if not dry_run:
+                    with transaction.atomic():
+                        Feedback.objects.bulk_update(updated, ['sentiment'])
+                        if changed_events:
+                            rebuild_sentiment_summaries(changed_events)
+                            bump_versions('feedback')
+                    self.write_checkpoint(checkpoint, pks[-1])
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        for (old, new), count in sorted(changes.items()):
+            self.stdout.write(f'{old} -> {new}: {count}')
+        verb = 'would change' if dry_run else 'changed'
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully rescored {processed} feedback rows, {verb} {sum(changes.values())}'
+        ))
+
+    def read_checkpoint(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)['last_pk']
+        except FileNotFoundError:
+            return 0
+        except (ValueError, KeyError) as e:
+            raise CommandError(f'Invalid checkpoint file {path}: {e}')
+
+    def write_checkpoint(self, path, last_pk):
+        # Write then rename so an interrupted run never leaves a truncated checkpoint
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'last_pk': last_pk}, f)
+        os.replace(tmp_path, path)
@@ -0,0 +1,44 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from sentiment_analysis.backends import SentimentBackendError
+from ...scoring import score_pending_feedback
+
+
+class Command(BaseCommand):
+    help = 'Score pending feedback sentiment in micro-batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'FEEDBACK_SCORING_BATCH_SIZE', 64),
+                            help='Maximum number of feedback rows scored per prediction')
+        parser.add_argument('--poll-interval', type=float, default=getattr(settings, 'FEEDBACK_SCORING_POLL_INTERVAL', 2.0),
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of polling for new feedback')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        poll_interval = options['poll_interval']
+        failures = 0
+        total = 0
+        while True:
+            try:
+                scored = score_pending_feedback(batch_size)
+                failures = 0
+            except SentimentBackendError as e:
+                # Leave the batch pending and back off while the backend is unhealthy
+                if options['once']:
+                    raise CommandError(f'Scoring failed after {total} feedback rows: {e}')
+                failures += 1
+                delay = min(poll_interval * 2 ** failures, 60)
+                self.stderr.write(f'Scoring failed, retrying in {delay:.0f}s: {e}')
+                time.sleep(delay)
+                continue
+
+            total += len(scored)
+            if len(scored) < batch_size:
+                if options['once']:
+                    break
+                time.sleep(poll_interval)
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully scored {total} feedback rows'))
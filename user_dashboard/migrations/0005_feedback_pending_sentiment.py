@@ -0,0 +1,25 @@
+# Generated by Django 3.0.7 on 2026-10-18 17:49
+
+from django.db import migrations, models
+
+
+def requeue_unscored_feedback(apps, schema_editor):
+    # Feedback whose scoring failed was stored as 'neutral', which is not a valid choice
+    Feedback = apps.get_model('user_dashboard', 'Feedback')
+    Feedback.objects.exclude(sentiment__in=['positive', 'negative']).update(sentiment='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_dashboard', '0004_auto_20240710_0125'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='feedback',
+            name='sentiment',
+            field=models.CharField(choices=[('pending', 'Pending'), ('positive', 'Positive'), ('negative', 'Negative')], default='pending', max_length=10),
+        ),
+        migrations.RunPython(requeue_unscored_feedback, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.0.7 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_dashboard', '0005_feedback_pending_sentiment'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['registration_datetime', 'id'], name='registration_datetime_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registration',
+            index=models.Index(fields=['event', 'registration_datetime', 'id'], name='registration_event_dt_idx'),
+        ),
+    ]
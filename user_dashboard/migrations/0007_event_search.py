@@ -0,0 +1,25 @@
+from django.db import migrations
+from user_dashboard.fts import create_search_index, drop_search_index, fts5_available
+
+
+def create_event_search(apps, schema_editor):
+    # Databases without FTS5 search events with the in-process index of user_dashboard.search
+    if fts5_available(schema_editor.connection):
+        create_search_index(schema_editor.connection)
+
+
+def drop_event_search(apps, schema_editor):
+    if fts5_available(schema_editor.connection):
+        drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_dashboard', '0006_registration_keyset_indexes'),
+        ('superuser_dashboard', '0005_event_start_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_event_search, drop_event_search),
+    ]
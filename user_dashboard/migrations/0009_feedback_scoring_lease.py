@@ -0,0 +1,22 @@
+# Generated by Django 3.0.7 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_dashboard', '0008_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedback',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='feedback',
+            index=models.Index(fields=['sentiment', 'id'], name='feedback_queue_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from superuser_dashboard.models import Event, Category
 User = get_user_model()
 
@@ -8,6 +9,13 @@ class Registration(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     registration_datetime = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the registrations listing, filtered by event or not
+            models.Index(fields=['registration_datetime', 'id'], name='registration_datetime_idx'),
+            models.Index(fields=['event', 'registration_datetime', 'id'], name='registration_event_dt_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} registered for {self.event.title}"
 
@@ -17,6 +25,38 @@ class Feedback(models.Model):
     rating = models.IntegerField()
     comments = models.TextField()
     feedback_datetime = models.DateTimeField(auto_now_add=True)
-    sentiment = models.CharField(max_length=10, default='positive', choices=[('positive', 'Positive'), ('negative', 'Negative')])
+    sentiment = models.CharField(max_length=10, default='pending', choices=[('pending', 'Pending'), ('positive', 'Positive'), ('negative', 'Negative')])
+    # End of the lease of the scoring worker that claimed the pending feedback (see user_dashboard.scoring)
+    claimed_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The scoring worker claims the oldest pending feedback
+            models.Index(fields=['sentiment', 'id'], name='feedback_queue_idx'),
+        ]
+
     def __str__(self):
         return f"Feedback for {self.event.title} by {self.user.username}"
+
+
+class EmailOutbox(models.Model):
+    """Email queued in the transaction of the change it reports, delivered by the deliver_emails command (see user_dashboard.outbox)"""
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to_email = models.EmailField()
+    status = models.CharField(max_length=10, default='pending', choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')])
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The delivery worker claims the pending emails that are due, oldest first
+            models.Index(fields=['status', 'next_attempt_at', 'id'], name='email_outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {self.to_email} ({self.status})"
@@ -0,0 +1,142 @@
+import datetime
+import logging
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import EmailOutbox
+
+"""
+This module contains the transactional email outbox.
+
+Views queue emails with queue_email inside the transaction of the change they report, so an email
+exists exactly when its change was committed, and the request never waits for the mail server.
+The deliver_emails management command drains the outbox in batches over one mail connection per
+batch. Claimed emails are leased by moving their next attempt forward, so the claiming transaction
+is short and a crashed worker's emails become due again once the lease runs out. Failed emails are
+retried with exponential backoff until EMAIL_OUTBOX_MAX_ATTEMPTS, then marked failed.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(subject, body, to_email, from_email=None):
+    """
+    Queue an email for delivery by the deliver_emails command.
+
+    Call it inside the transaction writing the change the email reports.
+
+    Returns:
+        The created EmailOutbox row.
+    """
+    return EmailOutbox.objects.create(
+        subject=subject, body=body, to_email=to_email, from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+    )
+
+
+def queue_registration_email(registration):
+    """
+    Queue the confirmation email of an event registration.
+
+    Returns:
+        The created EmailOutbox row, or None when the user has no email address.
+    """
+    if not registration.user.email:
+        return None
+    return queue_email(
+        'Event Registration Confirmation',
+        f'Hello,\n\nYou have successfully registered for the event: {registration.event.title}.\n\nThank you!',
+        registration.user.email,
+    )
+
+
+def retry_delay(attempts):
+    """
+    Return the delay before the next delivery attempt of an email that failed attempts times.
+    """
+    base = getattr(settings, 'EMAIL_OUTBOX_BACKOFF', 30)
+    return datetime.timedelta(seconds=min(base * 2 ** (attempts - 1), getattr(settings, 'EMAIL_OUTBOX_MAX_BACKOFF', 3600)))
+
+
+def claim_due_emails(batch_size, lease):
+    """
+    Select the oldest pending emails that are due, and lease them to the caller.
+
+    Rows are locked where the database supports it, so that concurrent workers skip each other's
+    batches, and their next attempt is moved to the end of the lease before the transaction ends.
+
+    Args:
+        batch_size: Maximum number of emails to return.
+        lease: Seconds the emails stay claimed.
+
+    Returns:
+        A list of EmailOutbox objects.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = EmailOutbox.objects.filter(status='pending', next_attempt_at__lte=now).order_by('next_attempt_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        batch = list(due[:batch_size])
+        if batch:
+            EmailOutbox.objects.filter(pk__in=[email.pk for email in batch]).update(
+                next_attempt_at=now + datetime.timedelta(seconds=lease)
+            )
+    return batch
+
+
+def deliver_due_emails(batch_size, lease=None):
+    """
+    Deliver one batch of due emails over a single mail connection.
+
+    Args:
+        batch_size: Maximum number of emails to deliver.
+        lease: Seconds the batch stays claimed, defaults to EMAIL_OUTBOX_LEASE.
+
+    Returns:
+        A dict with the number of emails claimed, sent, retried later and failed for good.
+    """
+    if lease is None:
+        lease = getattr(settings, 'EMAIL_OUTBOX_LEASE', 300)
+    batch = claim_due_emails(batch_size, lease)
+    counts = {'claimed': len(batch), 'sent': 0, 'retried': 0, 'failed': 0}
+    if not batch:
+        return counts
+
+    errors = {}
+    mail_connection = get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+    except Exception as e:
+        # Without a connection every email of the batch counts as a failed attempt
+        errors = {email.pk: e for email in batch}
+    else:
+        try:
+            for email in batch:
+                message = EmailMessage(email.subject, email.body, email.from_email, [email.to_email], connection=mail_connection)
+                try:
+                    message.send()
+                except Exception as e:
+                    errors[email.pk] = e
+        finally:
+            mail_connection.close()
+
+    now = timezone.now()
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5)
+    for email in batch:
+        email.attempts += 1
+        error = errors.get(email.pk)
+        if error is None:
+            email.status, email.sent_at, email.last_error = 'sent', now, ''
+            counts['sent'] += 1
+        elif email.attempts >= max_attempts:
+            email.status, email.last_error = 'failed', str(error)
+            counts['failed'] += 1
+        else:
+            email.next_attempt_at, email.last_error = now + retry_delay(email.attempts), str(error)
+            counts['retried'] += 1
+    EmailOutbox.objects.bulk_update(batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at'])
+    if errors:
+        logger.warning('Failed to deliver %d of %d emails: %s', len(errors), len(batch), next(iter(errors.values())))
+    logger.info('Delivered %d emails', counts['sent'])
+    return counts
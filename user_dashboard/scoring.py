@@ -0,0 +1,91 @@
+import datetime
+import logging
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from sentiment_analysis.backends import get_backend
+from superuser_dashboard.summaries import rebuild_sentiment_summaries
+from superuser_dashboard.widgets import bump_versions
+from .models import Feedback
+
+"""
+This module contains the feedback scoring queue.
+
+Feedback is saved with a 'pending' sentiment and the pending rows themselves form the queue.
+The score_feedback management command drains it in micro-batches, scoring each batch with a
+single backend call and writing the results back with one bulk update. A batch is claimed in a
+short transaction that leases its rows by setting their claimed_until, so the backend call, which
+may wait on a remote service, holds no database lock, and a crashed worker's rows become due again
+once the lease runs out. Bulk updates do not send signals, so the sentiment summaries of the
+batch's events are rebuilt and the dashboard widgets invalidated explicitly.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def claim_pending_feedback(batch_size, lease):
+    """
+    Select the oldest pending feedback rows that are not claimed, and lease them to the caller.
+
+    Rows are locked where the database supports it, so that concurrent workers skip each other's
+    batches, and their claimed_until is moved to the end of the lease before the transaction ends.
+
+    Args:
+        batch_size: Maximum number of rows to return.
+        lease: Seconds the rows stay claimed.
+
+    Returns:
+        A list of Feedback objects with only their id, event and comments loaded.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        pending = (
+            Feedback.objects.filter(Q(claimed_until__isnull=True) | Q(claimed_until__lte=now), sentiment='pending')
+            .order_by('id').only('id', 'event_id', 'comments')
+        )
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        batch = list(pending[:batch_size])
+        if batch:
+            Feedback.objects.filter(pk__in=[feedback.pk for feedback in batch]).update(
+                claimed_until=now + datetime.timedelta(seconds=lease)
+            )
+    return batch
+
+
+def score_pending_feedback(batch_size, backend=None, lease=None):
+    """
+    Score one micro-batch of pending feedback.
+
+    Args:
+        batch_size: Maximum number of feedback rows to score.
+        backend: Sentiment backend to use, defaults to the configured one.
+        lease: Seconds the batch stays claimed, defaults to FEEDBACK_SCORING_LEASE.
+
+    Returns:
+        The list of scored Feedback objects (empty when the queue is empty).
+
+    Raises:
+        SentimentBackendError: If the backend cannot score the batch; the rows stay pending.
+    """
+    backend = backend or get_backend()
+    if lease is None:
+        lease = getattr(settings, 'FEEDBACK_SCORING_LEASE', 300)
+    batch = claim_pending_feedback(batch_size, lease)
+    if not batch:
+        return []
+    try:
+        sentiments = backend.analyze_batch([feedback.comments for feedback in batch])
+    except Exception:
+        # Release the batch so that it is retried on the next poll rather than when the lease ends
+        Feedback.objects.filter(pk__in=[feedback.pk for feedback in batch]).update(claimed_until=None)
+        raise
+    for feedback, sentiment in zip(batch, sentiments):
+        feedback.sentiment, feedback.claimed_until = sentiment, None
+    with transaction.atomic():
+        Feedback.objects.bulk_update(batch, ['sentiment', 'claimed_until'])
+        rebuild_sentiment_summaries({feedback.event_id for feedback in batch})
+    bump_versions('feedback')
+    logger.info('Scored %d feedback rows', len(batch))
+    return batch
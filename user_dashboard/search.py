@@ -0,0 +1,215 @@
+import bisect
+import re
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from django.conf import settings
+from django.db import connection
+from superuser_dashboard.widgets import get_dashboard_cache
+from .fts import SEARCH_TABLE, fts5_available, search_table_exists
+from .models import Event
+
+"""
+This module contains the full-text search over the title, description and location of events.
+
+On SQLite with FTS5 the events are matched and ranked (bm25) by the event_search table, which
+triggers keep in sync (see user_dashboard.fts). Elsewhere an inverted index of the events is held
+in process, scored with the same field weights (without stemming), and rebuilt whenever the dashboard
+version of the events changes (every event write bumps it) and at least every SEARCH_INDEX_TTL
+seconds, which bounds staleness when that version is unavailable or not shared between processes.
+Every query term matches as a prefix, and an event must match all of them.
+"""
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Relevance weight of a match in each field, in FTS5 column order
+FIELD_WEIGHTS = {'title': 10.0, 'description': 1.0, 'location': 3.0}
+
+
+def tokenize(text):
+    """
+    Split a text into lowercase word tokens.
+    """
+    return TOKEN_RE.findall((text or '').lower())
+
+
+class SearchPage:
+    """
+    One page of ranked search results.
+
+    Attributes:
+        object_list: The events of the page, most relevant first.
+        number: Page number, starting at 1.
+    """
+
+    def __init__(self, object_list, number, has_next):
+        self.object_list = object_list
+        self.number = number
+        self.has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    @property
+    def has_previous(self):
+        return self.number > 1
+
+    @property
+    def next_page_number(self):
+        return self.number + 1
+
+    @property
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class FTS5SearchBackend:
+    """
+    Search backend querying the event_search FTS5 table.
+    """
+
+    def search(self, terms, limit, offset=0):
+        """
+        Return the ids of the events matching every term, most relevant first.
+        """
+        # Each term is a quoted prefix token, so no user input is parsed as FTS5 syntax
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in FIELD_WEIGHTS.values())
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s '
+                f'ORDER BY bm25({SEARCH_TABLE}, {weights}), rowid LIMIT %s OFFSET %s',
+                [match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class InvertedIndex:
+    """
+    In-memory inverted index of events.
+
+    Args:
+        rows: Iterable of (id, title, description, location) tuples.
+    """
+
+    def __init__(self, rows):
+        self.postings = defaultdict(dict)
+        count = 0
+        for row in rows:
+            count += 1
+            event_id = row[0]
+            for weight, text in zip(FIELD_WEIGHTS.values(), row[1:]):
+                for token in tokenize(text):
+                    postings = self.postings[token]
+                    postings[event_id] = postings.get(event_id, 0.0) + weight
+        self.size = count
+        self.vocabulary = sorted(self.postings)
+
+    def _expand(self, term):
+        # Every indexed token starting with the term, found by bisecting the sorted vocabulary
+        start = bisect.bisect_left(self.vocabulary, term)
+        end = start
+        while end < len(self.vocabulary) and self.vocabulary[end].startswith(term):
+            end += 1
+        return self.vocabulary[start:end]
+
+    def search(self, terms):
+        """
+        Return the ids of the events matching every term, most relevant first.
+        """
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for token in self._expand(term):
+                postings = self.postings[token]
+                # Rarer tokens weigh more, as in bm25
+                idf = 1.0 + max(0.0, (self.size - len(postings) + 0.5) / (len(postings) + 0.5))
+                for event_id, weight in postings.items():
+                    term_scores[event_id] = term_scores.get(event_id, 0.0) + weight * idf
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {event_id: score + term_scores[event_id] for event_id, score in scores.items() if event_id in term_scores}
+            if not scores:
+                return []
+        return sorted(scores, key=lambda event_id: (-scores[event_id], event_id))
+
+
+class InvertedIndexSearchBackend:
+    """
+    Search backend for databases without FTS5, searching an in-process inverted index.
+
+    Args:
+        ttl: Age, in seconds, after which the index is rebuilt even if the event version did not change.
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index = None
+        self._version = None
+        self._built_at = 0.0
+
+    def _current_version(self):
+        dashboard_cache = get_dashboard_cache()
+        return dashboard_cache.versions(['event'])['event'] if dashboard_cache else None
+
+    def index(self):
+        """
+        Return the inverted index, rebuilding it if events changed since it was built.
+        """
+        version = self._current_version()
+        with self._lock:
+            stale = (
+                self._index is None or version != self._version
+                or time.monotonic() - self._built_at > self.ttl
+            )
+            if stale:
+                rows = Event.objects.values_list('id', *FIELD_WEIGHTS).iterator()
+                self._index = InvertedIndex(rows)
+                self._version = version
+                self._built_at = time.monotonic()
+            return self._index
+
+    def search(self, terms, limit, offset=0):
+        return self.index().search(terms)[offset:offset + limit]
+
+
+@lru_cache(maxsize=None)
+def _build_backend(ttl):
+    # Checked once per process: the table is created by a migration, before the site serves
+    if fts5_available(connection) and search_table_exists(connection):
+        return FTS5SearchBackend()
+    return InvertedIndexSearchBackend(ttl)
+
+
+def get_search_backend():
+    """
+    Return the FTS5 backend when the database has the event_search table, else the in-process one.
+    """
+    return _build_backend(getattr(settings, 'SEARCH_INDEX_TTL', 60))
+
+
+def search_events(query, page=1, page_size=20):
+    """
+    Return one page of the events matching a search query, most relevant first.
+
+    Args:
+        query: Search text; events must contain every word of it, or a word starting with it.
+        page: Page number, starting at 1.
+        page_size: Number of events per page.
+
+    Returns:
+        A SearchPage, empty when the query has no words.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return SearchPage([], page, False)
+    ids = get_search_backend().search(terms, page_size + 1, (page - 1) * page_size)
+    events = Event.objects.select_related('category').in_bulk(ids[:page_size])
+    # in_bulk does not keep the ranking, and an event deleted meanwhile is skipped
+    return SearchPage([events[event_id] for event_id in ids[:page_size] if event_id in events], page, len(ids) > page_size)
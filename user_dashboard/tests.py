@@ -1,11 +1,29 @@
 from django.test import TestCase
 
 # Create your tests here.
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.db import connection
+from django.core.management.sql import emit_post_migrate_signal
+from django.utils import timezone
+from django.core.management import call_command, CommandError
+from sentiment_analysis.backends import SentimentBackendError
+from sentiment_analysis.testing import StubSentimentServer
+from io import StringIO
+from unittest import mock
+import json
+import os
+import tempfile
+import datetime
  
-from .models import Event, Registration, Category, Feedback, User
+from .models import Event, Registration, Category, Feedback, User, EmailOutbox
 from .views import *
+from .scoring import claim_pending_feedback, score_pending_feedback
+from superuser_dashboard.widgets import _build_cache, get_dashboard_cache
+from .search import FTS5SearchBackend, InvertedIndexSearchBackend
+from .outbox import deliver_due_emails, queue_email
 
 class UserDashboardTests(TestCase):
     def setUp(self):
@@ -35,3 +53,447 @@ class UserDashboardTests(TestCase):
     
 #     # Add more tests for models, forms, etc. as needed
 
+
+@override_settings(SENTIMENT_BACKEND='sentiment_analysis.backends.LocalStubBackend')
+class ProvideFeedbackTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='attendee', email='attendee@example.com', password='12345')
+        self.client.login(username='attendee', password='12345')
+        self.event = Event.objects.create(
+            title='Test Event', description='Test description', location='Hall',
+            start_date=timezone.now(), end_date=timezone.now(), organizer=self.user,
+        )
+
+    def test_feedback_is_saved_pending_and_scored_by_worker(self):
+        url = reverse('provide_feedback', args=[self.event.id])
+        response = self.client.post(url, {'rating': 2, 'comments': 'A terrible, boring event.'})
+        self.assertRedirects(response, reverse('home'), fetch_redirect_response=False)
+        self.assertEqual(Feedback.objects.get().sentiment, 'pending')
+
+        call_command('score_feedback', '--once', stdout=StringIO())
+        self.assertEqual(Feedback.objects.get().sentiment, 'negative')
+
+    def test_worker_scores_in_micro_batches(self):
+        for comments in ['Loved it', 'Awful venue', 'Great talks']:
+            Feedback.objects.create(user=self.user, event=self.event, rating=3, comments=comments)
+        # Claiming and leasing the batch in one savepoint (4), saving its scores and summaries in
+        # another (8), and bumping the feedback version in the database cache (6)
+        with self.assertNumQueries(4 + 8 + 6):
+            scored = score_pending_feedback(batch_size=2)
+        self.assertEqual([feedback.sentiment for feedback in scored], ['positive', 'negative'])
+        self.assertEqual(Feedback.objects.filter(sentiment='pending').count(), 1)
+
+    def test_backend_is_called_outside_the_claiming_transaction(self):
+        Feedback.objects.create(user=self.user, event=self.event, rating=3, comments='Loved it')
+        outer_blocks = len(connection.savepoint_ids)
+
+        def analyze_batch(comments):
+            self.assertEqual(len(connection.savepoint_ids), outer_blocks)
+            return ['positive'] * len(comments)
+
+        backend = mock.Mock(analyze_batch=analyze_batch)
+        self.assertEqual(len(score_pending_feedback(batch_size=10, backend=backend)), 1)
+        self.assertEqual(list(Feedback.objects.values_list('sentiment', 'claimed_until')), [('positive', None)])
+
+    def test_claimed_feedback_is_skipped_until_its_lease_ends(self):
+        feedback = Feedback.objects.create(user=self.user, event=self.event, rating=3, comments='Loved it')
+        self.assertEqual(claim_pending_feedback(10, lease=60), [feedback])
+        self.assertEqual(claim_pending_feedback(10, lease=60), [])
+        Feedback.objects.update(claimed_until=timezone.now() - datetime.timedelta(seconds=1))
+        self.assertEqual(claim_pending_feedback(10, lease=60), [feedback])
+
+    def test_failed_batch_is_released(self):
+        Feedback.objects.create(user=self.user, event=self.event, rating=3, comments='Loved it')
+        backend = mock.Mock()
+        backend.analyze_batch.side_effect = SentimentBackendError('unavailable')
+        with self.assertRaises(SentimentBackendError):
+            score_pending_feedback(batch_size=10, backend=backend)
+        self.assertEqual(list(Feedback.objects.values_list('sentiment', 'claimed_until')), [('pending', None)])
+
+
+class RescoreFeedbackTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='attendee', email='attendee@example.com', password='12345')
+        self.event = Event.objects.create(
+            title='Test Event', description='Test description', location='Hall',
+            start_date=timezone.now(), end_date=timezone.now(), organizer=self.user,
+        )
+        self.positive = Feedback.objects.create(user=self.user, event=self.event, rating=5,
+                                                comments='Well done that was amazing', sentiment='negative')
+        self.negative = Feedback.objects.create(user=self.user, event=self.event, rating=1,
+                                                comments='That was a terrible event, the food was not great', sentiment='negative')
+        checkpoint_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(checkpoint_dir.cleanup)
+        self.checkpoint = os.path.join(checkpoint_dir.name, 'checkpoint.json')
+
+    def rescore(self, *args):
+        out = StringIO()
+        call_command('rescore_feedback', '--workers', '0', '--chunk-size', '1', '--checkpoint', self.checkpoint, *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_reports_diff_without_saving(self):
+        output = self.rescore('--dry-run')
+        self.assertIn('negative -> positive: 1', output)
+        self.positive.refresh_from_db()
+        self.assertEqual(self.positive.sentiment, 'negative')
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_rescore_updates_changed_rows_and_records_checkpoint(self):
+        self.rescore()
+        self.positive.refresh_from_db()
+        self.assertEqual(self.positive.sentiment, 'positive')
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f), {'last_pk': self.negative.pk})
+
+    def test_resume_skips_rows_before_checkpoint(self):
+        with open(self.checkpoint, 'w') as f:
+            json.dump({'last_pk': self.positive.pk}, f)
+        output = self.rescore('--resume')
+        self.assertIn('Successfully rescored 1 feedback rows', output)
+        self.positive.refresh_from_db()
+        self.assertEqual(self.positive.sentiment, 'negative')
+
+
+@override_settings(SENTIMENT_BACKEND='sentiment_analysis.backends.HTTPBackend')
+class DeferredScoringTests(TestCase):
+    def test_feedback_stays_pending_while_service_is_unhealthy(self):
+        user = User.objects.create_user(username='attendee', email='attendee@example.com', password='12345')
+        event = Event.objects.create(title='Test Event', description='Test description', location='Hall',
+                                     start_date=timezone.now(), end_date=timezone.now(), organizer=user)
+        Feedback.objects.create(user=user, event=event, rating=4, comments='Loved it')
+        with StubSentimentServer() as server, override_settings(SENTIMENT_ANALYSIS_URL=server.url,
+                                                                SENTIMENT_HTTP_RETRIES=0,
+                                                                SENTIMENT_CIRCUIT_FAILURE_THRESHOLD=1):
+            server.fail_next(1)
+            with self.assertRaises(CommandError):
+                call_command('score_feedback', '--once', stdout=StringIO())
+            with self.assertRaises(CommandError):
+                call_command('score_feedback', '--once', stdout=StringIO())
+            self.assertEqual(len(server.requests), 1)
+        self.assertEqual(Feedback.objects.get().sentiment, 'pending')
+
+
+@override_settings(BROWSE_EVENTS_PAGE_SIZE=2)
+class BrowseEventsTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='attendee', email='attendee@example.com', password='12345')
+        self.client.login(username='attendee', password='12345')
+        self.music = Category.objects.create(name='Music')
+        self.tech = Category.objects.create(name='Tech')
+        start = timezone.make_aware(datetime.datetime(2030, 5, 1, 18, 0))
+        self.events = [
+            Event.objects.create(
+                title=f'Event {i}', description='Test description', location='Hall',
+                category=self.music if i % 2 else self.tech,
+                start_date=start + datetime.timedelta(days=i), end_date=start + datetime.timedelta(days=i, hours=2),
+                organizer=self.user,
+            )
+            for i in range(5)
+        ]
+
+    def titles(self, response):
+        return [event.title for event in response.context['events']]
+
+    def test_events_are_paginated_by_start_date(self):
+        response = self.client.get(reverse('browse_events'))
+        self.assertEqual(self.titles(response), ['Event 0', 'Event 1'])
+        page = response.context['page']
+        response = self.client.get(reverse('browse_events'), {'after': page.next_cursor})
+        self.assertEqual(self.titles(response), ['Event 2', 'Event 3'])
+        response = self.client.get(reverse('browse_events'), {'before': response.context['page'].previous_cursor})
+        self.assertEqual(self.titles(response), ['Event 0', 'Event 1'])
+
+    def test_date_range_and_category_filters(self):
+        response = self.client.get(reverse('browse_events'), {'date_from': '2030-05-02', 'date_to': '2030-05-04', 'category': 'Music'})
+        self.assertEqual(self.titles(response), ['Event 1', 'Event 3'])
+        response = self.client.get(reverse('browse_events'), {'date': '2030-05-03'})
+        self.assertEqual(self.titles(response), ['Event 2'])
+        self.assertEqual(response.context['filter_query'], 'date=2030-05-03')
+
+    def test_page_is_loaded_with_category_in_one_query(self):
+        # Session, user, category choices, category filter and the page of events
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('browse_events'), {'category': 'Tech'})
+        self.assertEqual(self.titles(response), ['Event 0', 'Event 2'])
+        self.assertContains(response, 'Category:</strong> Tech')
+
+    def test_invalid_filters_are_reported(self):
+        self.assertContains(self.client.get(reverse('browse_events'), {'category': 'Sports'}), 'Unknown category: Sports')
+        self.assertContains(self.client.get(reverse('browse_events'), {'date_from': 'soon'}), 'Invalid start date: soon')
+
+
+class SearchEventsTests(TestCase):
+    def setUp(self):
+        get_dashboard_cache().cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='attendee', email='attendee@example.com', password='12345')
+        self.client.login(username='attendee', password='12345')
+        start = timezone.make_aware(datetime.datetime(2030, 5, 1, 18, 0))
+
+        def create(title, description, location):
+            return Event.objects.create(
+                title=title, description=description, location=location,
+                start_date=start, end_date=start + datetime.timedelta(hours=2), organizer=self.user,
+            )
+
+        self.jazz_night = create('Jazz Night', 'Live music downtown', 'Blue Note Club')
+        self.workshop = create('Python Workshop', 'Hands-on session, jazz playlist included', 'Library')
+        self.festival = create('Summer Festival', 'Food and music', 'Jazzland Park')
+
+    def titles(self, response):
+        return [event.title for event in response.context['events']]
+
+    def test_results_are_ranked_title_then_location_then_description(self):
+        response = self.client.get(reverse('search_events'), {'q': 'jazz'})
+        self.assertEqual(self.titles(response), ['Jazz Night', 'Summer Festival', 'Python Workshop'])
+
+    def test_every_word_must_match_as_a_prefix(self):
+        response = self.client.get(reverse('search_events'), {'q': 'mus down'})
+        self.assertEqual(self.titles(response), ['Jazz Night'])
+
+    def test_search_syntax_in_the_query_is_ignored(self):
+        response = self.client.get(reverse('search_events'), {'q': 'python" (*'})
+        self.assertEqual(self.titles(response), ['Python Workshop'])
+        self.assertEqual(self.titles(self.client.get(reverse('search_events'), {'q': '***'})), [])
+
+    def test_index_follows_bulk_updates_and_deletes(self):
+        Event.objects.filter(pk=self.workshop.pk).update(title='Rust Workshop')
+        Event.objects.filter(pk=self.jazz_night.pk).delete()
+        self.assertEqual(self.titles(self.client.get(reverse('search_events'), {'q': 'jazz'})), ['Summer Festival', 'Rust Workshop'])
+        self.assertEqual(self.titles(self.client.get(reverse('search_events'), {'q': 'python'})), [])
+
+    @override_settings(SEARCH_PAGE_SIZE=2)
+    def test_results_are_paginated(self):
+        response = self.client.get(reverse('search_events'), {'q': 'jazz'})
+        self.assertTrue(response.context['page'].has_next)
+        response = self.client.get(reverse('search_events'), {'q': 'jazz', 'page': 2})
+        self.assertEqual(self.titles(response), ['Python Workshop'])
+        self.assertFalse(response.context['page'].has_next)
+
+    def test_inverted_index_fallback_ranks_like_fts5(self):
+        backend = InvertedIndexSearchBackend()
+        fts5 = FTS5SearchBackend()
+        for terms in (['jazz'], ['mus', 'down'], ['nothing']):
+            self.assertEqual(backend.search(terms, 10), fts5.search(terms, 10))
+
+    def test_inverted_index_is_rebuilt_when_events_change(self):
+        backend = InvertedIndexSearchBackend()
+        self.assertEqual(backend.search(['rust'], 10), [])
+        self.workshop.title = 'Rust Workshop'
+        self.workshop.save()
+        self.assertEqual(backend.search(['rust'], 10), [self.workshop.pk])
+
+    def test_migrate_restores_triggers_dropped_by_a_table_rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER event_search_update')
+        Event.objects.filter(pk=self.workshop.pk).update(title='Rust Workshop')
+        emit_post_migrate_signal(verbosity=0, interactive=False, db='default')
+        self.assertEqual(self.titles(self.client.get(reverse('search_events'), {'q': 'rust'})), ['Rust Workshop'])
+        Event.objects.filter(pk=self.workshop.pk).update(title='Go Workshop')
+        self.assertEqual(self.titles(self.client.get(reverse('search_events'), {'q': 'go'})), ['Go Workshop'])
+
+    def test_inverted_index_expires_even_if_the_version_did_not_change(self):
+        backend = InvertedIndexSearchBackend(ttl=0)
+        self.assertEqual(backend.search(['rust'], 10), [])
+        # A write the version does not see, as from a process without the shared cache
+        Event.objects.filter(pk=self.workshop.pk).update(title='Rust Workshop')
+        self.assertEqual(backend.search(['rust'], 10), [self.workshop.pk])
+
+    def test_rebuild_command_restores_dropped_triggers(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER event_search_insert')
+        out = StringIO()
+        call_command('rebuild_event_search', stdout=out)
+        self.assertIn('Successfully rebuilt', out.getvalue())
+        Event.objects.create(
+            title='Opera Gala', description='Arias', location='Opera House',
+            start_date=timezone.now(), end_date=timezone.now(), organizer=self.user,
+        )
+        self.assertEqual(self.titles(self.client.get(reverse('search_events'), {'q': 'opera'})), ['Opera Gala'])
+
+
+class MyRegistrationsTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='attendee', email='attendee@example.com', password='12345')
+        self.client.login(username='attendee', password='12345')
+        now = timezone.now()
+        self.registrations = {}
+        for days in (-3, -2, -1, 1, 2, 3):
+            start = now + datetime.timedelta(days=days)
+            event = Event.objects.create(
+                title=f'Event {days}', description='Test description', location='Hall',
+                start_date=start, end_date=start + datetime.timedelta(hours=2), organizer=self.user,
+            )
+            self.registrations[days] = Registration.objects.create(user=self.user, event=event)
+        Feedback.objects.create(user=self.user, event=self.registrations[-2].event, rating=5, comments='Great')
+        other = User.objects.create_user(username='other', password='12345')
+        Registration.objects.create(user=other, event=self.registrations[-1].event)
+        Feedback.objects.create(user=other, event=self.registrations[-1].event, rating=1, comments='Bad')
+
+    def titles(self, page):
+        return [registration.event.title for registration in page]
+
+    @override_settings(MY_REGISTRATIONS_PAGE_SIZE=2)
+    def test_lists_are_split_ordered_and_paginated_in_the_database(self):
+        # Session, user, both counts, and one page of each list with its events and feedback flags
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('my_registrations'))
+            attended, current = response.context['attended_events'], response.context['current_events']
+            self.assertEqual(self.titles(attended), ['Event -1', 'Event -2'])
+            self.assertEqual(self.titles(current), ['Event 1', 'Event 2'])
+            self.assertEqual([registration.has_feedback for registration in attended], [False, True])
+        self.assertEqual((attended.paginator.count, current.paginator.count), (3, 3))
+
+        response = self.client.get(reverse('my_registrations'), {'attended_page': 2, 'current_page': 2})
+        self.assertEqual(self.titles(response.context['attended_events']), ['Event -3'])
+        self.assertEqual(self.titles(response.context['current_events']), ['Event 3'])
+        self.assertContains(response, 'Feedback submitted', count=0)
+        self.assertContains(response, 'attended_page=1&current_page=2')
+
+
+class HomeDashboardTests(TestCase):
+    def setUp(self):
+        get_dashboard_cache().cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user(username='attendee', email='attendee@example.com', password='12345')
+        self.other = User.objects.create_user(username='other', password='12345')
+        self.client.login(username='attendee', password='12345')
+        now = timezone.now()
+        self.events = [
+            Event.objects.create(
+                title=f'Event {days}', description='Test description', location='Hall',
+                start_date=now + datetime.timedelta(days=days), end_date=now + datetime.timedelta(days=days, hours=2),
+                organizer=self.other,
+            )
+            for days in (-1, 1, 2, 3)
+        ]
+        Registration.objects.create(user=self.user, event=self.events[0])
+        Registration.objects.create(user=self.user, event=self.events[2])
+
+    def titles(self, response, name):
+        return [event.title for event in response.context[name]]
+
+    def test_lists_registered_and_upcoming_events(self):
+        response = self.client.get(reverse('home'))
+        self.assertEqual(self.titles(response, 'my_events'), ['Event 2'])
+        self.assertEqual(self.titles(response, 'upcoming_events'), ['Event 1', 'Event 3'])
+
+    def test_context_is_cached_per_user(self):
+        self.client.get(reverse('home'))
+        # Session, user, then the versions and the entry from the database cache
+        with self.assertNumQueries(4):
+            self.client.get(reverse('home'))
+        # Another user's registration leaves this user's entry in place
+        Registration.objects.create(user=self.other, event=self.events[1])
+        with self.assertNumQueries(4):
+            self.client.get(reverse('home'))
+
+    def test_own_registration_invalidates_the_entry(self):
+        self.client.get(reverse('home'))
+        Registration.objects.create(user=self.user, event=self.events[1])
+        response = self.client.get(reverse('home'))
+        self.assertEqual(self.titles(response, 'my_events'), ['Event 1', 'Event 2'])
+        self.assertEqual(self.titles(response, 'upcoming_events'), ['Event 3'])
+
+    def test_event_change_invalidates_the_entry(self):
+        self.client.get(reverse('home'))
+        self.events[3].title = 'Renamed'
+        self.events[3].save()
+        self.assertEqual(self.titles(self.client.get(reverse('home')), 'upcoming_events'), ['Event 1', 'Renamed'])
+
+    @override_settings(SUPERUSER_DASHBOARD_CACHE_ALIAS='default')
+    def test_uncached_when_versions_are_local_to_the_process(self):
+        _build_cache.cache_clear()
+        with self.assertLogs('superuser_dashboard.widgets', 'WARNING'):
+            self.client.get(reverse('home'))
+        # Session, user, my events and upcoming events
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(self.titles(response, 'my_events'), ['Event 2'])
+
+    @override_settings(USER_DASHBOARD_CACHE_ENABLED=False)
+    def test_uncached_when_disabled(self):
+        self.client.get(reverse('home'))
+        # Session, user, my events and upcoming events
+        with self.assertNumQueries(4):
+            self.client.get(reverse('home'))
+
+
+class CountingEmailBackend(locmem.EmailBackend):
+    """Locmem backend counting the connections opened"""
+    opened = 0
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return True
+
+
+class FailingEmailBackend(locmem.EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('Mail server unavailable')
+
+
+class EmailOutboxTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='attendee', email='attendee@example.com', password='12345')
+        self.client.login(username='attendee', password='12345')
+        start = timezone.now() + datetime.timedelta(days=1)
+        self.event = Event.objects.create(
+            title='Jazz Night', description='Test description', location='Hall',
+            start_date=start, end_date=start + datetime.timedelta(hours=2), organizer=self.user,
+        )
+
+    def queue(self, count):
+        for i in range(count):
+            queue_email(f'Subject {i}', 'Body', f'user{i}@example.com')
+
+    def test_registration_queues_its_email_without_sending(self):
+        response = self.client.post(reverse('register_event', args=[self.event.id]))
+        self.assertRedirects(response, reverse('my_registrations'))
+        self.assertEqual(Registration.objects.filter(user=self.user, event=self.event).count(), 1)
+        email = EmailOutbox.objects.get()
+        self.assertEqual((email.to_email, email.status), ('attendee@example.com', 'pending'))
+        self.assertIn('Jazz Night', email.body)
+        self.assertEqual(mail.outbox, [])
+
+    @override_settings(EMAIL_BACKEND='user_dashboard.tests.CountingEmailBackend')
+    def test_batches_are_sent_over_one_connection(self):
+        self.queue(5)
+        CountingEmailBackend.opened = 0
+        out = StringIO()
+        call_command('deliver_emails', '--once', '--batch-size', '3', stdout=out)
+        self.assertEqual(CountingEmailBackend.opened, 2)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [f'user{i}@example.com' for i in range(5)])
+        self.assertEqual(EmailOutbox.objects.filter(status='sent', attempts=1).count(), 5)
+        self.assertIn('Successfully sent 5 emails', out.getvalue())
+
+    @override_settings(EMAIL_BACKEND='user_dashboard.tests.FailingEmailBackend', EMAIL_OUTBOX_BACKOFF=10, EMAIL_OUTBOX_MAX_ATTEMPTS=3)
+    def test_failures_are_retried_with_exponential_backoff(self):
+        self.queue(1)
+        delays = []
+        for attempt in range(3):
+            before = timezone.now()
+            with self.assertLogs('user_dashboard.outbox', 'WARNING'):
+                counts = deliver_due_emails(10)
+            email = EmailOutbox.objects.get()
+            delays.append(round((email.next_attempt_at - before).total_seconds()))
+            self.assertEqual(deliver_due_emails(10)['claimed'], 0)
+            EmailOutbox.objects.update(next_attempt_at=before)
+        self.assertEqual(delays[:2], [10, 20])
+        self.assertEqual(counts, {'claimed': 1, 'sent': 0, 'retried': 0, 'failed': 1})
+        self.assertEqual((email.status, email.attempts, email.last_error), ('failed', 3, 'Mail server unavailable'))
+
+    def test_file_backend_writes_the_messages(self):
+        self.queue(2)
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend', EMAIL_FILE_PATH=directory):
+                self.assertEqual(deliver_due_emails(10)['sent'], 2)
+            [path] = os.listdir(directory)
+            with open(os.path.join(directory, path)) as f:
+                content = f.read()
+        self.assertIn('To: user0@example.com', content)
+        self.assertIn('To: user1@example.com', content)
@@ -5,6 +5,7 @@ from . import views
 urlpatterns = [
     path('', views.user_dashboard, name='home'),
     path('browse-events/', views.browse_events, name='browse_events'),
+    path('search-events/', views.search_events, name='search_events'),
     path('event/<int:event_id>/', views.event_details, name='event_details'),
     path('my-registrations/', views.my_registrations, name='my_registrations'),
     path('cancel-registration/<int:registration_id>/', views.cancel_registration, name='cancel_registration'),
@@ -2,19 +2,27 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
 from textblob import TextBlob
 from .models import Event, Registration, Category, Feedback
 from .forms import FeedbackForm
-from django.core.mail import send_mail
+from .browsing import browse_events_queryset
+from .search import search_events as run_event_search
+from .home import get_home_context
+from .outbox import queue_registration_email
+from superuser_dashboard.pagination import keyset_paginate
+from django.core.exceptions import ValidationError
 from django.conf import settings
-import asyncio
-import requests
 
 @login_required
 def user_dashboard(request):
     """
     Display the user dashboard with events the user has registered for and upcoming events.
 
+    The context is cached per user and invalidated when the user's registrations or any event change.
+
     Args:
         request: HttpRequest object.
 
@@ -25,14 +33,8 @@ def user_dashboard(request):
         user = request.user
         if user.is_superuser:
             return redirect('super_home')
-        
-        my_events = Event.objects.filter(registration__user=user)[:2]
-        upcoming_events = Event.objects.exclude(registration__user=user).order_by('start_date')[:2]
-        
-        context = {
-            'my_events': my_events,
-            'upcoming_events': upcoming_events,
-        }
+
+        context = get_home_context(user)
         return render(request, 'user_dashboard.html', context)
     except Exception as e:
         messages.error(request, f'An unexpected error occurred: {e}')
@@ -41,7 +43,10 @@ def user_dashboard(request):
 @login_required
 def browse_events(request):
     """
-    Display all events with optional filtering by date, category, and type.
+    Display a page of events, ordered by start date, with optional filtering by date range and category.
+
+    Events are paginated with cursors on (start_date, id), so every page costs the same whatever
+    the size of the events table.
 
     Args:
         request: HttpRequest object.
@@ -50,35 +55,58 @@ def browse_events(request):
         HttpResponse object with rendered browse events template.
     """
     try:
-        events = Event.objects.all()
-        categories = Category.objects.all()
-
-        if 'date' in request.GET:
-            date = request.GET['date']
-            if date:
-                events = events.filter(start_date=date)
-        
-        if 'category' in request.GET:
-            category_name = request.GET['category']
-            category = get_object_or_404(Category, name=category_name)
-            if category:
-                events = events.filter(category=category)
-        
-        if 'type' in request.GET:
-            event_type = request.GET['type']
-            if event_type:
-                events = events.filter(type=event_type)
-        
+        categories = Category.objects.only('name').order_by('name')
+        page = keyset_paginate(
+            browse_events_queryset(request.GET), 'start_date', settings.BROWSE_EVENTS_PAGE_SIZE,
+            after=request.GET.get('after'), before=request.GET.get('before'), descending=False,
+        )
+        filters = request.GET.copy()
+        filters.pop('after', None)
+        filters.pop('before', None)
         context = {
-            'events': events,
+            'events': page,
+            'page': page,
             'categories': categories,
+            'filter_query': filters.urlencode(),
         }
-        
         return render(request, 'browse_events.html', context)
+    except ValidationError as e:
+        messages.error(request, e.message)
+        return render(request, 'browse_events.html')
     except Exception as e:
         messages.error(request, f'An unexpected error occurred: {e}')
         return render(request, 'browse_events.html')
 
+@login_required
+def search_events(request):
+    """
+    Display a page of the events matching a full-text search over their title, description and location.
+
+    Events are ranked by relevance, matches in the title first, then the location, then the description.
+
+    Args:
+        request: HttpRequest object.
+
+    Returns:
+        HttpResponse object with rendered search events template.
+    """
+    try:
+        query = request.GET.get('q', '').strip()
+        try:
+            number = max(1, int(request.GET.get('page') or 1))
+        except ValueError:
+            number = 1
+        page = run_event_search(query, number, settings.SEARCH_PAGE_SIZE)
+        context = {
+            'events': page,
+            'page': page,
+            'query': query,
+        }
+        return render(request, 'search_events.html', context)
+    except Exception as e:
+        messages.error(request, f'An unexpected error occurred: {e}')
+        return render(request, 'search_events.html')
+
 @login_required
 def event_details(request, event_id):
     """
@@ -101,11 +129,28 @@ def event_details(request, event_id):
         messages.error(request, f'An unexpected error occurred: {e}')
         return redirect('home')
 
+def registrations_with_feedback(user):
+    """
+    Return the registrations of a user with their event, and whether the user left feedback on it.
+
+    Returns:
+        A Registration queryset annotated with has_feedback.
+    """
+    feedback = Feedback.objects.filter(user=user, event=OuterRef('event_id'))
+    return (
+        Registration.objects.filter(user=user)
+        .select_related('event')
+        .annotate(has_feedback=Exists(feedback))
+    )
+
 @login_required
 def my_registrations(request):
     """
     Display registrations of the current user, categorized into attended and current events.
 
+    Both lists are filtered, ordered and paginated by the database: attended events most recently
+    ended first, current events soonest first, each with its own page parameter.
+
     Args:
         request: HttpRequest object.
 
@@ -114,22 +159,26 @@ def my_registrations(request):
     """
     try:
         user = request.user
-        registrations = Registration.objects.filter(user=user)
-        
-        attended_events = []
-        current_events = []
         now = timezone.now()
-        
-        for registration in registrations:
-            event = registration.event
-            if event.end_date < now:
-                attended_events.append(registration)
-            else:
-                current_events.append(registration)
-        
+        registrations = registrations_with_feedback(user)
+        attended = Paginator(
+            registrations.filter(event__end_date__lt=now).order_by('-event__end_date', '-id'),
+            settings.MY_REGISTRATIONS_PAGE_SIZE,
+        )
+        current = Paginator(
+            registrations.filter(event__end_date__gte=now).order_by('event__start_date', 'id'),
+            settings.MY_REGISTRATIONS_PAGE_SIZE,
+        )
+        # Count both lists with one query instead of one per paginator
+        counts = Registration.objects.filter(user=user).aggregate(
+            attended=Count('id', filter=Q(event__end_date__lt=now)),
+            current=Count('id', filter=Q(event__end_date__gte=now)),
+        )
+        attended.count, current.count = counts['attended'], counts['current']
+
         context = {
-            'attended_events': attended_events,
-            'current_events': current_events,
+            'attended_events': attended.get_page(request.GET.get('attended_page')),
+            'current_events': current.get_page(request.GET.get('current_page')),
         }
         return render(request, 'my_registrations.html', context)
     except Exception as e:
@@ -178,19 +227,8 @@ def provide_feedback(request, event_id):
                 feedback = form.save(commit=False)
                 feedback.user = request.user
                 feedback.event = event
-                
-                # Get sentiment analysis
-                response = requests.post(
-                    url=f"{settings.SENTIMENT_ANALYSIS_URL}/analyze/",
-                    json={'sentence': feedback.comments}
-                )
-
-                if response.status_code == 200:
-                    sentiment = response.json().get('sentiment', 'neutral')
-                    feedback.sentiment = sentiment
-                else:
-                    feedback.sentiment = 'neutral'
-                
+                # Sentiment is scored in the background by the score_feedback command
+                feedback.sentiment = 'pending'
                 feedback.save()
                 messages.success(request, 'Feedback submitted successfully!')
                 return redirect('home')
@@ -220,8 +258,10 @@ def register_event(request, event_id):
     try:
         event = get_object_or_404(Event, id=event_id)
         if request:
-            registration = Registration.objects.create(user=request.user, event=event)
-            asyncio.run(send_registration_email(request.user.email, event.title))
+            # The confirmation email is queued with the registration and sent by the deliver_emails command
+            with transaction.atomic():
+                registration = Registration.objects.create(user=request.user, event=event)
+                queue_registration_email(registration)
             messages.success(request, 'Event registration successful!')
             return redirect('my_registrations')
         
@@ -230,24 +270,3 @@ def register_event(request, event_id):
     except Exception as e:
         messages.error(request, f'An unexpected error occurred: {e}')
         return redirect('home')
-
-# Asynchronous function to send registration email
-async def send_registration_email(user_email, event_title):
-    """
-    Asynchronous function to send registration confirmation email.
-
-    Args:
-        user_email: Email address of the user to send the email to.
-        event_title: Title of the event the user registered for.
-    """
-    try:
-        subject = 'Event Registration Confirmation'
-        message = f'Hello,\n\nYou have successfully registered for the event: {event_title}.\n\nThank you!'
-        from_email = settings.DEFAULT_FROM_EMAIL
-        recipient_list = [user_email]
-        
-        await asyncio.sleep(1)  # Simulate some asynchronous task
-        
-        send_mail(subject, message, from_email, recipient_list)
-    except Exception as e:
-        print(f'Failed to send registration email: {e}')